@@ -8,28 +8,65 @@ Patterns:
   3. Content Optimization  - Self-Refine loop
 
 Usage:
-  python3 demo.py 1|2|3|all [--advanced] [--output json] [--save]
+  python3 demo.py 1|2|3|all [--advanced] [--output json] [--save] [--trace [PATH]]
   python3 demo.py all --advanced --save
   python3 demo.py 1 --output json
+  python3 demo.py all --advanced --async --max-in-flight 128
+  python3 demo.py all --advanced --progress
 
 Environment variables:
   BEDROCK_MODEL_ID  - Override model (default: global.anthropic.claude-sonnet-4-5-20250929-v1:0)
-  BEDROCK_REGION    - Override region (default: us-west-2)
+  BEDROCK_REGION    - Override region (default: us-west-2); a comma list such as
+                      "us-west-2:2,us-east-1" spreads calls over a weighted region pool
   COMPARE_MODELS    - Comma-separated model IDs for comparison mode
+  BEDROCK_HEDGE     - Set to 1 to enable hedged requests (same as --hedge)
+  SIM_CACHE_THRESHOLD - Enable the near-duplicate input cache at this similarity (same as --sim-cache)
+  BEDROCK_MODEL_ID_<ROLE>, BEDROCK_REGION_<ROLE>, BEDROCK_MAX_TOKENS_<ROLE>
+                    - Per-role overrides (ROLE: GENERATE, PERSONA, CRITIQUE, REFINE, JUDGE)
+  LLM_BACKEND       - bedrock (default), openai or fake (same as --backend)
+  BEDROCK_ASYNC_LIMIT - Concurrent calls allowed with --async (same as --max-in-flight, default 64)
+  PATTERNS_CATALOG  - Extra catalogue directories (os.pathsep-separated, same as --catalog)
 
 Bedrock Claude Sonnet 4.5 (Global Inference)
 """
 
 import argparse
+import asyncio
 import json
+import os
 import sys
 import time
 
-from patterns.bedrock import get_model_id, set_model_id
-from patterns.display import collector
-from patterns.style_transfer import demo_style_transfer
-from patterns.reverse_neutralization import demo_reverse_neutralization
-from patterns.content_optimization import demo_content_optimization
+from patterns.backends import BACKENDS
+from patterns.bedrock import (
+    close_async_clients,
+    enable_hedging,
+    get_backend,
+    get_model_id,
+    get_region_pool,
+    set_async_limit,
+    set_backend,
+    set_model_id,
+    set_regions,
+)
+from patterns.deadline import DeadlineExceeded, deadline_scope
+from patterns.events import emit
+from patterns.display import collector, print_call_summary, print_deadline_summary, print_region_summary
+from patterns.hedging import Hedger
+from patterns.profiling import RunProfiler
+from patterns.progress import ProgressDashboard
+from patterns.regions import parse_regions
+from patterns.registry import add_catalog
+from patterns.routing import describe_routing, load_role_config, parse_role_assignment, set_role_config
+from patterns.shard import build_matrix
+from patterns.simcache import enable_similarity_cache
+from patterns.stats import set_pricing, stats
+from patterns.columnar import DEFAULT_DIR as COLUMNAR_DIR
+from patterns.store import DEFAULT_DB_PATH, enable_store
+from patterns.style_transfer import ademo_style_transfer, demo_style_transfer
+from patterns.reverse_neutralization import ademo_reverse_neutralization, demo_reverse_neutralization
+from patterns.content_optimization import ademo_content_optimization, demo_content_optimization
+from patterns.tracing import JsonFileExporter, enable_tracing, shutdown_tracing, span
 
 
 DEMOS = {
@@ -37,10 +74,16 @@ DEMOS = {
     "2": ("Reverse Neutralization", demo_reverse_neutralization),
     "3": ("Content Optimization", demo_content_optimization),
 }
+ASYNC_DEMOS = {
+    "1": ademo_style_transfer,
+    "2": ademo_reverse_neutralization,
+    "3": ademo_content_optimization,
+}
 
 
-def run_demo(choice: str, advanced: bool, json_mode: bool) -> dict:
-    """Run selected demo(s) and return combined results."""
+def run_demo(choice: str, advanced: bool, json_mode: bool, incremental: bool = False,
+             use_async: bool = False) -> dict:
+    """Run selected demo(s) and return combined results (``use_async``: on one event loop)."""
     results = {}
 
     if choice == "all":
@@ -51,17 +94,37 @@ def run_demo(choice: str, advanced: bool, json_mode: bool) -> dict:
         print("Select 1, 2, 3, or all.", file=sys.stderr)
         sys.exit(1)
 
+    if use_async:
+        return asyncio.run(arun_demo(keys, advanced, json_mode, incremental))
+
     for key in keys:
         name, func = DEMOS[key]
         if not json_mode and key != keys[0]:
             print("\n")
-        result = func(advanced=advanced, json_mode=json_mode)
+        kwargs = {"incremental": incremental} if key == "3" else {}
+        result = func(advanced=advanced, json_mode=json_mode, **kwargs)
         results[name] = result
 
     return results
 
 
-def run_comparison(choice: str, advanced: bool, model_ids: list[str], json_mode: bool) -> dict:
+async def arun_demo(keys: list, advanced: bool, json_mode: bool, incremental: bool = False) -> dict:
+    """Async demos, one pattern after another; calls within a pattern run concurrently."""
+    results = {}
+    try:
+        for key in keys:
+            name = DEMOS[key][0]
+            if not json_mode and key != keys[0]:
+                print("\n")
+            kwargs = {"incremental": incremental} if key == "3" else {}
+            results[name] = await ASYNC_DEMOS[key](advanced=advanced, json_mode=json_mode, **kwargs)
+    finally:
+        await close_async_clients()
+    return results
+
+
+def run_comparison(choice: str, advanced: bool, model_ids: list[str], json_mode: bool,
+                   incremental: bool = False, use_async: bool = False) -> dict:
     """Run the same demo across multiple models for comparison."""
     comparison = {"models": {}}
 
@@ -72,7 +135,7 @@ def run_comparison(choice: str, advanced: bool, model_ids: list[str], json_mode:
             print(f"  Model: {model_id}")
             print(f"{'#' * 60}\n")
 
-        result = run_demo(choice, advanced, json_mode)
+        result = run_demo(choice, advanced, json_mode, incremental, use_async)
         comparison["models"][model_id] = result
 
     return comparison
@@ -89,6 +152,7 @@ examples:
   python3 demo.py 2 --output json      # JSON output
   python3 demo.py 1 --save             # Save results to results/
   COMPARE_MODELS=model-a,model-b python3 demo.py 1 --advanced
+  python3 demo.py 1 --advanced --role-model judge=global.anthropic.claude-haiku-4-5-20251001-v1:0
 """,
     )
     parser.add_argument(
@@ -119,9 +183,177 @@ examples:
         default=None,
         help="Override Bedrock model ID",
     )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Run each pattern's calls concurrently on one asyncio event loop",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Concurrent LLM calls allowed with --async (default: BEDROCK_ASYNC_LIMIT or 64)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=None,
+        help="LLM backend: bedrock (default), openai (OpenAI-compatible server at OPENAI_BASE_URL) "
+             "or fake (offline); default from LLM_BACKEND",
+    )
+    parser.add_argument(
+        "--role-config",
+        type=str,
+        default=None,
+        metavar="PATH",
+        help="JSON file with per-role model/max_tokens/region overrides (and optional pricing)",
+    )
+    parser.add_argument(
+        "--catalog",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Extra catalogue directory of styles/personas/scenarios/questions/tasks JSON "
+             "layered over the built-in definitions (repeatable; also PATTERNS_CATALOG)",
+    )
+    parser.add_argument(
+        "--role-model",
+        action="append",
+        default=[],
+        metavar="ROLE=MODEL_ID",
+        help="Per-role model override (roles: generate, persona, critique, refine, judge); repeatable",
+    )
+    parser.add_argument(
+        "--role-region",
+        action="append",
+        default=[],
+        metavar="ROLE=REGION",
+        help="Per-role region override; repeatable",
+    )
+    parser.add_argument(
+        "--role-max-tokens",
+        action="append",
+        default=[],
+        metavar="ROLE=N",
+        help="Per-role max_tokens override; repeatable",
+    )
+    parser.add_argument(
+        "--regions",
+        type=str,
+        default=None,
+        metavar="R1[:W],R2[:W],...",
+        help="Spread calls over several regions (weighted least-outstanding routing, "
+             "throttle-aware ejection and failover), e.g. us-west-2:2,us-east-1,us-east-2",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Time budget for the run: per-call timeouts come from the remaining budget, "
+             "and refine rounds / judge calls / max_tokens are cut when time runs short",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Self-Refine: re-critique only criteria below 5/5 and send only actionable feedback",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Hedge slow calls: send a duplicate request once a call exceeds its role's running p95",
+    )
+    parser.add_argument(
+        "--hedge-max-rate",
+        type=float,
+        default=0.1,
+        metavar="RATE",
+        help="Maximum fraction of calls that may be hedged (default: 0.1)",
+    )
+    parser.add_argument(
+        "--sim-cache",
+        nargs="?",
+        type=float,
+        const=0.9,
+        default=None,
+        metavar="THRESHOLD",
+        help="Reuse outputs for near-duplicate style/persona inputs (MinHash similarity, default 0.9)",
+    )
+    parser.add_argument(
+        "--sim-cache-size",
+        type=int,
+        default=10000,
+        metavar="N",
+        help="Maximum entries kept in the near-duplicate cache (LRU eviction, default: 10000)",
+    )
+    parser.add_argument(
+        "--store",
+        nargs="?",
+        const=DEFAULT_DB_PATH,
+        default=None,
+        metavar="DB",
+        help="Ingest calls and results into the SQLite results store as they arrive "
+             f"(default path: {DEFAULT_DB_PATH}; query with python3 -m patterns.store)",
+    )
+    parser.add_argument(
+        "--columnar",
+        nargs="?",
+        const=COLUMNAR_DIR,
+        default=None,
+        metavar="DIR",
+        help="Export this run as typed Arrow columns (one row per result, texts separate) "
+             f"(default dir: {COLUMNAR_DIR}; scan with python3 -m patterns.columnar)",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Live status on stderr: results done / expected, calls done / in flight / queued, "
+             "calls/s, tok/s, p95 latency, throttle rate, ETA (periodic log lines when not a TTY)",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=30.0,
+        metavar="SEC",
+        help="Seconds between --progress log lines when stderr is not a terminal (default: 30)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run (cProfile + sampled collapsed stacks + per-call wall/CPU/wait) "
+             "and write results/profile_<ts>.{txt,prof,folded}",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="Record run/pattern/scenario/call spans and export them as OTLP/JSON "
+             "(default path: results/trace_<ts>.json)",
+    )
     return parser
 
 
+def apply_role_args(args) -> None:
+    """Apply --role-config / --role-* CLI overrides (CLI wins over the config file)."""
+    if args.role_config:
+        data = load_role_config(args.role_config)
+        if "pricing" in data:
+            set_pricing(data["pricing"])
+    for value in args.role_model:
+        role, model_id = parse_role_assignment(value)
+        set_role_config(role, model_id=model_id)
+    for value in args.role_region:
+        role, region = parse_role_assignment(value)
+        set_role_config(role, region=region)
+    for value in args.role_max_tokens:
+        role, n = parse_role_assignment(value)
+        set_role_config(role, max_tokens=int(n))
+
+
 def interactive_menu(advanced: bool) -> str:
     """Show interactive menu and get user choice."""
     mode = "ADVANCED" if advanced else "BASIC"
@@ -135,6 +367,18 @@ def interactive_menu(advanced: bool) -> str:
     return input("Select (1/2/3/all): ").strip()
 
 
+def _finish_profile(profiler: RunProfiler, json_mode: bool) -> None:
+    """Stop the profiler, write its files and print the one-line summary."""
+    profiler.stop()
+    paths = profiler.write()
+    r = profiler.report()
+    out = sys.stderr if json_mode else sys.stdout
+    print(f"\n  Profile: {r['wall_sec']:.1f}s wall, LLM wait {r['llm_wait_sec']:.1f}s, "
+          f"local overhead {r['local_overhead_pct']}% ({r['local_sec']:.2f}s, "
+          f"process CPU {r['process_cpu_sec']:.2f}s)", file=out)
+    print(f"  Profile report: {paths['report']} (flamegraph: {paths['folded']})", file=out)
+
+
 def main():
     parser = build_parser()
     args = parser.parse_args()
@@ -143,28 +387,108 @@ def main():
 
     if args.model:
         set_model_id(args.model)
+    if args.max_in_flight is not None:
+        set_async_limit(args.max_in_flight)
+
+    try:
+        set_backend(args.backend or get_backend())
+        apply_role_args(args)
+        for path in args.catalog:
+            add_catalog(path)
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    if args.regions:
+        regions, weights = parse_regions(args.regions)
+        if not regions:
+            parser.error("--regions needs at least one region")
+        set_regions(regions, weights)
 
     # Interactive mode if no pattern specified
     choice = args.pattern
     if not choice:
         choice = interactive_menu(args.advanced)
 
+    if args.trace is not None:
+        enable_tracing(JsonFileExporter(args.trace or None))
+
+    if args.hedge or os.environ.get("BEDROCK_HEDGE") == "1":
+        enable_hedging(Hedger(max_rate=args.hedge_max_rate))
+
+    sim_threshold = args.sim_cache
+    if sim_threshold is None and os.environ.get("SIM_CACHE_THRESHOLD"):
+        sim_threshold = float(os.environ["SIM_CACHE_THRESHOLD"])
+    if sim_threshold is not None:
+        enable_similarity_cache(threshold=sim_threshold, max_entries=args.sim_cache_size)
+
+    store = None
+    if args.store:
+        store = enable_store(args.store)
+        store.attach(get_model_id(), meta={"choice": choice, "advanced": args.advanced},
+                     run_key=collector.timestamp)
+
     # Check for comparison mode
-    import os
     compare_models = os.environ.get("COMPARE_MODELS", "")
-    if compare_models:
-        model_ids = [m.strip() for m in compare_models.split(",") if m.strip()]
-        results = run_comparison(choice, args.advanced, model_ids, json_mode)
-    else:
-        total_start = time.time()
-        results = run_demo(choice, args.advanced, json_mode)
-        total_elapsed = time.time() - total_start
-
+    model_ids = [m.strip() for m in compare_models.split(",") if m.strip()]
+
+    progress = None
+    total = None
+    if args.progress:
+        progress = ProgressDashboard(interval=args.progress_interval).attach()
+        # Expected result entries (the shard runner's work matrix), for the progress ETA
+        if choice == "all" or choice in DEMOS:
+            total = len(build_matrix(choice, args.advanced, model_ids or [get_model_id()]))
+    profiler = None
+    if args.profile:
+        profiler = RunProfiler()
+        profiler.start()
+    try:
+        emit("run.start", model_id=get_model_id(), choice=choice, advanced=args.advanced, total=total)
+        with span("run", choice=choice, advanced=args.advanced), deadline_scope(args.deadline) as deadline:
+            total_start = time.time()
+            try:
+                if compare_models:
+                    results = run_comparison(choice, args.advanced, model_ids, json_mode, args.incremental,
+                                             args.use_async)
+                else:
+                    results = run_demo(choice, args.advanced, json_mode, args.incremental, args.use_async)
+            except DeadlineExceeded as e:
+                deadline.record_skip("rest_of_run", str(e))
+            total_elapsed = time.time() - total_start
+
+            if not compare_models and not json_mode:
+                print(f"\n{'=' * 60}")
+                print(f"  Total elapsed: {total_elapsed:.1f}s")
+                print(f"  Model: {get_model_id()}")
+                print(f"{'=' * 60}")
+
+        if deadline is not None:
+            collector.set_meta("deadline", deadline.report())
+            if not json_mode:
+                print_deadline_summary(deadline.report())
+
+        summary = stats.summary()
+        collector.set_meta("backend", get_backend())
+        collector.set_meta("routing", describe_routing())
+        collector.set_meta("call_stats", summary)
         if not json_mode:
-            print(f"\n{'=' * 60}")
-            print(f"  Total elapsed: {total_elapsed:.1f}s")
-            print(f"  Model: {get_model_id()}")
-            print(f"{'=' * 60}")
+            print_call_summary(summary)
+        pool = get_region_pool()
+        if pool is not None:
+            collector.set_meta("regions", pool.report())
+            if not json_mode:
+                print_region_summary(pool.report())
+
+        emit("run.end", model_id=get_model_id(), meta=collector.meta)
+    finally:
+        # Restore stdout, close the live run and keep the profile even when the run fails
+        if progress is not None:
+            progress.detach()
+        if store is not None:
+            store.detach(meta=collector.meta)
+            store.close()
+        if profiler is not None:
+            _finish_profile(profiler, json_mode)
 
     # JSON output
     if json_mode:
@@ -176,6 +500,22 @@ def main():
         if not json_mode:
             print(f"\n  Results saved: {path}")
 
+    if args.columnar is not None:
+        from patterns.columnar import export_data
+
+        if args.save:
+            run_id = os.path.splitext(os.path.basename(path))[0]
+        else:
+            run_id = time.strftime("run_%Y%m%d_%H%M%S")
+        try:
+            out = export_data(collector.to_dict(get_model_id()), run_id, args.columnar)
+        except ValueError as e:
+            out = f"skipped ({e})"
+        print(f"  Columnar export: {out}", file=sys.stderr if json_mode else sys.stdout)
+
+    if args.trace is not None:
+        shutdown_tracing()
+
 
 if __name__ == "__main__":
     main()
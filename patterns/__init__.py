@@ -1,11 +1,18 @@
 """LLM Output Control Design Patterns"""
 
-from patterns.style_transfer import demo_style_transfer
-from patterns.reverse_neutralization import demo_reverse_neutralization
-from patterns.content_optimization import demo_content_optimization
-
-__all__ = [
-    "demo_style_transfer",
-    "demo_reverse_neutralization",
-    "demo_content_optimization",
-]
+import importlib
+
+_EXPORTS = {
+    "demo_style_transfer": "patterns.style_transfer",
+    "demo_reverse_neutralization": "patterns.reverse_neutralization",
+    "demo_content_optimization": "patterns.content_optimization",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    # Pattern modules (and boto3) load on first use, so ``python3 -m patterns.<tool>`` starts fast
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'patterns' has no attribute '{name}'")
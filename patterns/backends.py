@@ -0,0 +1,401 @@
+"""Pluggable LLM backends behind the Converse request/response shape.
+
+``patterns.bedrock.converse`` builds a Converse request and hands it to a
+backend client; everything above it (routing, hedging, coalescing, region
+pool, stats, tracing) stays backend-agnostic. A backend implements:
+
+    converse(modelId, system, messages, inferenceConfig=None) -> response dict
+    converse_stream(...)  -> {"stream": iterator of Converse stream events}
+    aconverse(...) / aconverse_stream(...)   async counterparts
+
+Responses carry ``output.message.content[0].text``, ``stopReason``,
+``usage.{inputTokens,outputTokens}`` and ``ResponseMetadata.RetryAttempts``;
+failures surface as botocore errors (``ThrottlingException`` for 429 etc.) so
+failover and throttle accounting work unchanged. Only the ``bedrock`` backend
+needs boto3; without it the same error classes are defined here.
+
+Backends (``--backend`` or ``LLM_BACKEND``):
+
+    bedrock   boto3 ``bedrock-runtime`` (default)
+    openai    OpenAI-compatible ``/chat/completions`` (llama.cpp, vLLM, ...):
+              OPENAI_BASE_URL (default http://localhost:8000/v1), OPENAI_API_KEY,
+              OPENAI_MODEL (overrides the Bedrock model ID)
+    fake      in-process ``FakeBedrockClient`` (FAKE_LATENCY seconds per call)
+
+Async methods are native where possible (aiobotocore when installed, asyncio
+streams for the OpenAI-compatible endpoint, ``asyncio.sleep`` in the fake);
+otherwise the sync call runs in a worker thread.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+try:
+    from botocore.exceptions import (
+        BotoCoreError,
+        ClientError,
+        ConnectTimeoutError,
+        EndpointConnectionError,
+        ReadTimeoutError,
+    )
+except ImportError:  # the openai / fake backends run without boto3; same shapes as botocore's
+    class BotoCoreError(Exception):
+        fmt = "An unspecified error occurred"
+
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+            super().__init__(self.fmt.format(**kwargs))
+
+    class EndpointConnectionError(BotoCoreError):
+        fmt = 'Could not connect to the endpoint URL: "{endpoint_url}"'
+
+    class ConnectTimeoutError(BotoCoreError):
+        fmt = 'Connect timeout on endpoint URL: "{endpoint_url}"'
+
+    class ReadTimeoutError(BotoCoreError):
+        fmt = 'Read timeout on endpoint URL: "{endpoint_url}"'
+
+    class ClientError(Exception):
+        def __init__(self, error_response: dict, operation_name: str):
+            error = error_response.get("Error", {})
+            super().__init__(f"An error occurred ({error.get('Code', 'Unknown')}) when calling the "
+                             f"{operation_name} operation: {error.get('Message', 'Unknown')}")
+            self.response = error_response
+            self.operation_name = operation_name
+
+BACKENDS = ("bedrock", "openai", "fake")
+DEFAULT_OPENAI_BASE_URL = "http://localhost:8000/v1"
+
+_STOP_REASONS = {"stop": "end_turn", "length": "max_tokens", "content_filter": "content_filtered"}
+_HTTP_ERROR_CODES = {
+    400: "ValidationException",
+    403: "AccessDeniedException",
+    404: "ResourceNotFoundException",
+    408: "ModelTimeoutException",
+    429: "ThrottlingException",
+    503: "ServiceUnavailableException",
+}
+
+
+def client_error(code: str, message: str, status: int = 400, operation: str = "Converse") -> ClientError:
+    """A botocore ``ClientError`` as the Bedrock client would raise it."""
+    return ClientError(
+        {"Error": {"Code": code, "Message": message}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        operation,
+    )
+
+
+class BaseBackend:
+    """Async methods on top of the sync ones (run in a worker thread)."""
+
+    def converse(self, **kwargs) -> dict:
+        raise NotImplementedError
+
+    def converse_stream(self, **kwargs) -> dict:
+        """Default: one full call replayed as stream events."""
+        return {"stream": response_events(self.converse(**kwargs))}
+
+    async def aconverse(self, **kwargs) -> dict:
+        return await asyncio.to_thread(self.converse, **kwargs)
+
+    async def aconverse_stream(self, **kwargs):
+        """Async iterator over the stream events of ``converse_stream``."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+
+        def pump():
+            try:
+                for event in self.converse_stream(**kwargs)["stream"]:
+                    loop.call_soon_threadsafe(queue.put_nowait, event)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        threading.Thread(target=pump, name="stream-pump", daemon=True).start()
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+def response_events(response: dict) -> list:
+    """A Converse response as the equivalent ConverseStream event sequence."""
+    return [
+        {"messageStart": {"role": "assistant"}},
+        {"contentBlockDelta": {"contentBlockIndex": 0,
+                               "delta": {"text": response["output"]["message"]["content"][0]["text"]}}},
+        {"contentBlockStop": {"contentBlockIndex": 0}},
+        {"messageStop": {"stopReason": response.get("stopReason")}},
+        {"metadata": {"usage": response.get("usage", {}), "metrics": response.get("metrics", {})}},
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Bedrock
+# ---------------------------------------------------------------------------
+class BedrockBackend(BaseBackend):
+    """boto3 ``bedrock-runtime`` client (native streaming via ConverseStream).
+
+    ``aconverse`` uses an aiobotocore client per event loop when aiobotocore
+    is installed and falls back to a worker thread otherwise.
+    """
+
+    _aio_available = None
+
+    def __init__(self, region: str, read_timeout: int = 120, max_attempts: int = 3):
+        self.region = region
+        self.read_timeout = read_timeout
+        self.max_attempts = max_attempts
+        import boto3
+        from botocore.config import Config
+
+        self._client = boto3.client(
+            "bedrock-runtime",
+            region_name=region,
+            config=Config(read_timeout=read_timeout, retries={"max_attempts": max_attempts}),
+        )
+        self._aio_clients = {}  # event loop -> (client context, task creating the client)
+
+    def converse(self, **kwargs) -> dict:
+        return self._client.converse(**kwargs)
+
+    def converse_stream(self, **kwargs) -> dict:
+        return self._client.converse_stream(**kwargs)
+
+    async def _aio_client(self):
+        """aiobotocore client bound to the running loop, or None without aiobotocore."""
+        if BedrockBackend._aio_available is None:
+            BedrockBackend._aio_available = importlib.util.find_spec("aiobotocore") is not None
+        if not BedrockBackend._aio_available:
+            return None
+        from aiobotocore.config import AioConfig
+        from aiobotocore.session import get_session
+
+        loop = asyncio.get_running_loop()
+        if loop not in self._aio_clients:
+            context = get_session().create_client(
+                "bedrock-runtime",
+                region_name=self.region,
+                config=AioConfig(read_timeout=self.read_timeout, retries={"max_attempts": self.max_attempts}),
+            )
+            self._aio_clients[loop] = (context, asyncio.ensure_future(context.__aenter__()))
+        return await self._aio_clients[loop][1]
+
+    async def aconverse(self, **kwargs) -> dict:
+        client = await self._aio_client()
+        if client is None:
+            return await super().aconverse(**kwargs)
+        return await client.converse(**kwargs)
+
+    async def aclose(self) -> None:
+        entry = self._aio_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1]
+            await entry[0].__aexit__(None, None, None)
+
+
+# ---------------------------------------------------------------------------
+# OpenAI-compatible HTTP
+# ---------------------------------------------------------------------------
+class OpenAICompatBackend(BaseBackend):
+    """``/chat/completions`` client speaking the Converse shape (stdlib HTTP only)."""
+
+    def __init__(self, base_url: str = None, api_key: str = None, model: str = None,
+                 read_timeout: int = 120, max_attempts: int = 3, region: str = None):
+        self.base_url = (base_url or os.environ.get("OPENAI_BASE_URL", DEFAULT_OPENAI_BASE_URL)).rstrip("/")
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self.model = model or os.environ.get("OPENAI_MODEL")
+        self.read_timeout = read_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.region = region
+
+    def _payload(self, modelId: str, system: list, messages: list, inferenceConfig: dict = None,
+                 stream: bool = False) -> dict:
+        config = inferenceConfig or {}
+        chat = [{"role": "system", "content": " ".join(b.get("text", "") for b in system)}] if system else []
+        for m in messages:
+            chat.append({"role": m["role"], "content": "".join(b.get("text", "") for b in m["content"])})
+        payload = {"model": self.model or modelId, "messages": chat, "stream": stream}
+        if "maxTokens" in config:
+            payload["max_tokens"] = config["maxTokens"]
+        if "temperature" in config:
+            payload["temperature"] = config["temperature"]
+        if config.get("stopSequences"):
+            payload["stop"] = config["stopSequences"]
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    def _open(self, payload: dict):
+        """POST with retries on throttling / 5xx; returns ``(response, retries)``."""
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        body = json.dumps(payload).encode("utf-8")
+        url = f"{self.base_url}/chat/completions"
+        for attempt in range(self.max_attempts):
+            request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+            try:
+                return urllib.request.urlopen(request, timeout=self.read_timeout), attempt
+            except urllib.error.HTTPError as e:
+                error = self._error(e.code, e.read())
+                if e.code != 429 and e.code < 500:
+                    raise error
+            except (socket.timeout, TimeoutError):
+                error = ReadTimeoutError(endpoint_url=url)
+            except urllib.error.URLError:
+                error = EndpointConnectionError(endpoint_url=url)
+            if attempt + 1 < self.max_attempts:
+                time.sleep(min(2.0, 0.2 * 2 ** attempt))
+        raise error
+
+    @staticmethod
+    def _error(status: int, body: bytes) -> ClientError:
+        code = _HTTP_ERROR_CODES.get(status, "InternalServerException" if status >= 500 else "ValidationException")
+        return client_error(code, body.decode("utf-8", "replace")[:500], status)
+
+    @staticmethod
+    def _response(data: dict, retries: int, elapsed: float) -> dict:
+        """A chat completion as a Converse response."""
+        choice = data["choices"][0]
+        usage = data.get("usage") or {}
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": choice["message"].get("content") or ""}]}},
+            "stopReason": _stop_reason(choice),
+            "usage": {"inputTokens": usage.get("prompt_tokens", 0), "outputTokens": usage.get("completion_tokens", 0)},
+            "metrics": {"latencyMs": int(elapsed * 1000)},
+            "ResponseMetadata": {"RetryAttempts": retries, "HTTPStatusCode": 200},
+        }
+
+    def converse(self, **kwargs) -> dict:
+        start = time.time()
+        response, retries = self._open(self._payload(**kwargs))
+        with response:
+            data = json.loads(response.read())
+        return self._response(data, retries, time.time() - start)
+
+    async def aconverse(self, **kwargs) -> dict:
+        """Non-streaming call over asyncio streams (one HTTP/1.1 connection per request)."""
+        start = time.time()
+        url = f"{self.base_url}/chat/completions"
+        parts = urllib.parse.urlsplit(url)
+        body = json.dumps(self._payload(**kwargs)).encode("utf-8")
+        head = [f"POST {parts.path} HTTP/1.1", f"Host: {parts.netloc}", "Content-Type: application/json",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        if self.api_key:
+            head.append(f"Authorization: Bearer {self.api_key}")
+        raw = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+        tls = parts.scheme == "https"
+        port = parts.port or (443 if tls else 80)
+
+        for attempt in range(self.max_attempts):
+            try:
+                status, data = await asyncio.wait_for(_http_exchange(parts.hostname, port, tls, raw),
+                                                      self.read_timeout)
+            except asyncio.TimeoutError:
+                error = ReadTimeoutError(endpoint_url=url)
+            except OSError:
+                error = EndpointConnectionError(endpoint_url=url)
+            else:
+                if status < 400:
+                    return self._response(json.loads(data), attempt, time.time() - start)
+                error = self._error(status, data)
+                if status != 429 and status < 500:
+                    raise error
+            if attempt + 1 < self.max_attempts:
+                await asyncio.sleep(min(2.0, 0.2 * 2 ** attempt))
+        raise error
+
+    def converse_stream(self, **kwargs) -> dict:
+        start = time.time()
+        response, retries = self._open(self._payload(**kwargs, stream=True))
+
+        def events():
+            usage, stop_reason = {}, None
+            yield {"messageStart": {"role": "assistant"}}
+            with response:
+                for raw in response:
+                    line = raw.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    usage = chunk.get("usage") or usage
+                    for choice in chunk.get("choices", []):
+                        text = (choice.get("delta") or {}).get("content")
+                        if text:
+                            yield {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": text}}}
+                        if choice.get("finish_reason"):
+                            stop_reason = _stop_reason(choice)
+            yield {"contentBlockStop": {"contentBlockIndex": 0}}
+            yield {"messageStop": {"stopReason": stop_reason}}
+            yield {"metadata": {
+                "usage": {"inputTokens": usage.get("prompt_tokens", 0),
+                          "outputTokens": usage.get("completion_tokens", 0)},
+                "metrics": {"latencyMs": int((time.time() - start) * 1000)},
+            }}
+
+        return {"stream": events(), "ResponseMetadata": {"RetryAttempts": retries, "HTTPStatusCode": 200}}
+
+
+def _stop_reason(choice: dict) -> str | None:
+    """Converse ``stopReason`` for a choice; the matched stop string itself is never in the output."""
+    reason = choice.get("finish_reason")
+    # vLLM names the stop string that ended generation; other servers only say "stop"
+    if reason == "stop" and isinstance(choice.get("stop_reason"), str):
+        return "stop_sequence"
+    return _STOP_REASONS.get(reason, reason)
+
+
+async def _http_exchange(host: str, port: int, tls: bool, raw: bytes) -> tuple[int, bytes]:
+    """Send a raw HTTP/1.1 request and return ``(status, body)``."""
+    reader, writer = await asyncio.open_connection(host, port, ssl=ssl.create_default_context() if tls else None)
+    try:
+        writer.write(raw)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            return status, b"".join(chunks)
+        if "content-length" in headers:
+            return status, await reader.readexactly(int(headers["content-length"]))
+        return status, await reader.read()
+    finally:
+        writer.close()
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+def create_backend(name: str, region: str, read_timeout: int = 120, max_attempts: int = 3) -> BaseBackend:
+    """Client for backend ``name`` (one per region / timeout / retry setting)."""
+    if name == "bedrock":
+        return BedrockBackend(region, read_timeout, max_attempts)
+    if name == "openai":
+        return OpenAICompatBackend(read_timeout=read_timeout, max_attempts=max_attempts, region=region)
+    if name == "fake":
+        from patterns.fake import FakeBedrockClient
+        return FakeBedrockClient(latency=float(os.environ.get("FAKE_LATENCY", "0.05")), region=region)
+    raise ValueError(f"unknown backend {name!r} (choose from {', '.join(BACKENDS)})")
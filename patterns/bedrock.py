@@ -1,40 +1,450 @@
-"""Bedrock client and LLM call utilities."""
+"""Bedrock client and LLM call utilities (other backends plug in via ``patterns.backends``)."""
 
+import asyncio
+import hashlib
+import itertools
+import json
 import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future
 
-import boto3
-from botocore.config import Config as BotoConfig
+from patterns.backends import BACKENDS, create_backend
+from patterns.deadline import get_deadline
+from patterns.events import emit
+from patterns.hedging import Hedger
+from patterns.regions import RegionPool, error_code, is_throttle, parse_regions
+from patterns.routing import get_role_config
+from patterns.simcache import get_similarity_cache
+from patterns.stats import stats
+from patterns.tracing import span
 
 DEFAULT_MODEL_ID = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"
 DEFAULT_REGION = "us-west-2"
+READ_TIMEOUT = 120
+GEN_AI_SYSTEMS = {"bedrock": "aws.bedrock", "openai": "openai", "fake": "fake"}
 
-_client = None
+_clients = {}
+_client_factory = None
 _model_id = None
+_backend = None
+_hedger = None
+_region = None
+_region_pool = None
+_regions_loaded = False
+_async_limit = int(os.environ.get("BEDROCK_ASYNC_LIMIT", "64"))
+_async_slots = weakref.WeakKeyDictionary()
 
 
-def get_model_id() -> str:
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one underlying call.
+
+    Flights are shared between threads and event loops: a sync caller can
+    follow an async leader and vice versa. A sync caller on a thread that is
+    running an event loop never waits on a flight (blocking there could stall
+    the very loop its leader runs on); it sends its own request instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def _join(self, key: str, can_follow: bool = True) -> tuple[Future | None, bool]:
+        """``(flight, leader)``; ``(None, False)`` when a flight exists but may not be followed."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return (flight, False) if can_follow else (None, False)
+            flight = self._flights[key] = Future()
+        return flight, True
+
+    def _land(self, key: str, flight: Future, result=None, error: BaseException = None) -> None:
+        with self._lock:
+            del self._flights[key]
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
+
+    def do(self, key: str, fn) -> tuple:
+        """Return ``(fn() result, shared)``; ``shared`` is True for coalesced followers."""
+        try:
+            asyncio.get_running_loop()
+            on_loop = True
+        except RuntimeError:
+            on_loop = False
+        flight, leader = self._join(key, can_follow=not on_loop)
+        if flight is None:
+            return fn(), False
+        if not leader:
+            return flight.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._land(key, flight, result)
+        return result, False
+
+    async def ado(self, key: str, afn) -> tuple:
+        """Async ``do``: ``afn`` is a coroutine function."""
+        flight, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(flight), True
+        try:
+            result = await afn()
+        except BaseException as e:
+            self._land(key, flight, error=e)
+            raise
+        self._land(key, flight, result)
+        return result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+_singleflight = SingleFlight()
+_call_ids = itertools.count(1)
+_throttle_lock = threading.Lock()  # hedged duplicates may fail over concurrently
+
+
+def request_key(model_id: str, region: str, system: str, user: str,
+                max_tokens: int, temperature: float, stop_sequences: list = None,
+                prompt_hash: str = None) -> str:
+    """Stable key identifying an LLM request (used for single-flight coalescing).
+
+    A registry ``prompt_hash`` already identifies system + user, so the texts are not hashed again.
+    """
+    prompt = [prompt_hash] if prompt_hash else [system, user]
+    payload = json.dumps([model_id, region, *prompt, max_tokens, temperature, stop_sequences or []],
+                         ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_model_id(role: str = None) -> str:
+    """Model ID for a role (falls back to the global model)."""
     global _model_id
+    if role is not None:
+        role_model = get_role_config(role).model_id
+        if role_model:
+            return role_model
     if _model_id is None:
         _model_id = os.environ.get("BEDROCK_MODEL_ID", DEFAULT_MODEL_ID)
     return _model_id
 
 
 def set_model_id(model_id: str) -> None:
-    global _model_id, _client
+    global _model_id
     _model_id = model_id
-    _client = None
+    _clients.clear()
+
+
+def get_backend() -> str:
+    """Backend name from ``set_backend`` or LLM_BACKEND (default ``bedrock``)."""
+    if _backend is None:
+        set_backend(os.environ.get("LLM_BACKEND", "bedrock"))
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend {name!r} (choose from {', '.join(BACKENDS)})")
+    _backend = name
+    _clients.clear()
+
+
+def get_region(role: str = None) -> str:
+    """Region for a role (falls back to BEDROCK_REGION)."""
+    if role is not None:
+        role_region = get_role_config(role).region
+        if role_region:
+            return role_region
+    pool = get_region_pool()
+    if pool is not None:
+        return next(iter(pool.regions))
+    if _region is not None:
+        return _region
+    return os.environ.get("BEDROCK_REGION", DEFAULT_REGION).split(",")[0].split(":")[0].strip()
+
+
+def set_regions(regions: list, weights: dict = None, **pool_kwargs) -> RegionPool | None:
+    """Spread calls over several regions (a single region disables the pool)."""
+    global _region, _region_pool, _regions_loaded
+    _regions_loaded = True
+    _region = regions[0]
+    _region_pool = RegionPool(regions, weights, **pool_kwargs) if len(regions) > 1 else None
+    return _region_pool
+
+
+def get_region_pool() -> RegionPool | None:
+    """Region pool from ``set_regions`` or a comma-separated BEDROCK_REGION."""
+    global _regions_loaded
+    if not _regions_loaded:
+        _regions_loaded = True
+        value = os.environ.get("BEDROCK_REGION", "")
+        if "," in value:
+            set_regions(*parse_regions(value))
+    return _region_pool
+
+
+def set_client_factory(factory) -> None:
+    """Use ``factory(region)`` instead of the selected backend to build clients."""
+    global _client_factory
+    _client_factory = factory
+    _clients.clear()
+
+
+def _timeout_bucket(seconds: float) -> int:
+    """Round a timeout down to a small set of values so clients can be reused."""
+    if seconds >= 10:
+        return int(seconds // 5 * 5)
+    return max(1, int(seconds))
+
+
+def _get_client(region: str = None, read_timeout: int = READ_TIMEOUT, max_attempts: int = 3):
+    region = region or get_region()
+    key = (region, read_timeout, max_attempts)
+    if key not in _clients:
+        if _client_factory is not None:
+            _clients[key] = _client_factory(region)
+        else:
+            _clients[key] = create_backend(get_backend(), region, read_timeout, max_attempts)
+    return _clients[key]
+
+
+def enable_hedging(hedger: Hedger = None) -> Hedger:
+    """Turn on hedged requests for all calls (pass None to use default settings)."""
+    global _hedger
+    _hedger = hedger if hedger is not None else Hedger()
+    return _hedger
+
+
+def disable_hedging() -> None:
+    global _hedger
+    _hedger = None
+
+
+def get_hedger() -> Hedger | None:
+    return _hedger
+
+
+def _prepare(system: str, user: str, max_tokens: int, temperature: float, role: str,
+             stop_sequences: list = None, prompt_hash: str = None) -> dict:
+    """Resolve role routing and the deadline budget into a Converse request plan."""
+    role_cfg = get_role_config(role)
+    model_id = get_model_id(role)
+    pool = get_region_pool() if not role_cfg.region else None
+    region = "pool" if pool is not None else get_region(role)
+    max_tokens = role_cfg.max_tokens or max_tokens
+
+    # Deadline propagation: per-call timeout from the remaining budget
+    read_timeout = READ_TIMEOUT
+    deadline = get_deadline()
+    if deadline is not None:
+        read_timeout = _timeout_bucket(deadline.call_timeout(READ_TIMEOUT))
+        if deadline.low(role) and max_tokens > 256:
+            shortened = max(256, max_tokens // 2)
+            deadline.record_skip("shorten_max_tokens", "low time budget", role=role,
+                                 from_tokens=max_tokens, to_tokens=shortened)
+            max_tokens = shortened
+
+    kwargs = {
+        "modelId": model_id,
+        "system": [{"text": system}],
+        "messages": [{"role": "user", "content": [{"text": user}]}],
+        "inferenceConfig": {"maxTokens": max_tokens, "temperature": temperature},
+    }
+    if stop_sequences:
+        kwargs["inferenceConfig"]["stopSequences"] = list(stop_sequences)
+    return {"role": role, "model_id": model_id, "pool": pool, "region": region,
+            "max_tokens": max_tokens, "temperature": temperature, "read_timeout": read_timeout,
+            "kwargs": kwargs, "served_region": region, "prompt_hash": prompt_hash,
+            "call_id": next(_call_ids), "throttles": 0,
+            "key": request_key(model_id, region, system, user, max_tokens, temperature, stop_sequences,
+                               prompt_hash)}
+
+
+def _span_attributes(plan: dict, span_attrs: dict = None) -> dict:
+    if plan["prompt_hash"]:
+        span_attrs = {"prompt.hash": plan["prompt_hash"], **(span_attrs or {})}
+    return {
+        "gen_ai.system": GEN_AI_SYSTEMS[get_backend()], "gen_ai.request.model": plan["model_id"],
+        "gen_ai.request.max_tokens": plan["max_tokens"], "gen_ai.request.temperature": plan["temperature"],
+        "llm.role": plan["role"], "cloud.region": plan["region"], "bedrock.read_timeout": plan["read_timeout"],
+        **(span_attrs or {}),
+    }
+
+
+def _cache_lookup(s, plan: dict, system: str, sim_key: str) -> tuple:
+    """``(cache, namespace, hit result or None)`` for the similarity cache."""
+    sim_cache = get_similarity_cache() if sim_key is not None else None
+    if sim_cache is None:
+        return None, None, None
+    role, model_id, max_tokens = plan["role"], plan["model_id"], plan["max_tokens"]
+    namespace = f"{role}|{model_id}|{hashlib.sha1(system.encode('utf-8')).hexdigest()}"
+    hit = sim_cache.lookup(namespace, sim_key)
+    if hit is None:
+        stats.incr("simcache_miss")
+        return sim_cache, namespace, None
+    stats.incr("simcache_hit")
+    s.set_attributes(**{"cache.hit": True, "cache.similarity": hit["similarity"]})
+    emit("call.end", call_id=plan["call_id"], role=role, model_id=model_id, region=None, elapsed_sec=0.0,
+         input_tokens=0, output_tokens=0, stop_reason="cache_hit",
+         max_tokens=max_tokens, coalesced=False, cache_hit=True, prompt_hash=plan["prompt_hash"], throttled=0)
+    return sim_cache, namespace, {
+        "text": hit["output"],
+        "model_id": model_id,
+        "role": role,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "stop_reason": "cache_hit",
+        "retries": 0,
+        "max_tokens": max_tokens,
+        "truncated": False,
+        "cache": {"hit": True, "similarity": hit["similarity"], "source_input": hit["source_input"]},
+    }
+
+
+def _complete(s, plan: dict, response: dict, elapsed: float, shared: bool) -> dict:
+    """Build the result from a Converse response and record stats / span attributes."""
+    role, model_id, max_tokens = plan["role"], plan["model_id"], plan["max_tokens"]
+    usage = response.get("usage", {})
+    result = {
+        "text": response["output"]["message"]["content"][0]["text"],
+        "model_id": model_id,
+        "role": role,
+        "input_tokens": usage.get("inputTokens", 0),
+        "output_tokens": usage.get("outputTokens", 0),
+        "stop_reason": response.get("stopReason"),
+        "retries": response.get("ResponseMetadata", {}).get("RetryAttempts", 0),
+        "region": plan["served_region"],
+        "max_tokens": max_tokens,
+        "truncated": response.get("stopReason") == "max_tokens",
+    }
+    if shared:
+        result["coalesced"] = True
+        stats.incr("coalesced_hits")
+        s.set_attribute("singleflight.coalesced", True)
+    else:
+        stats.record_call(role, model_id, elapsed, result["input_tokens"], result["output_tokens"],
+                          max_tokens=max_tokens, stop_reason=result["stop_reason"])
+    s.set_attributes(**{
+        "gen_ai.usage.input_tokens": result["input_tokens"],
+        "gen_ai.usage.output_tokens": result["output_tokens"],
+        "gen_ai.response.finish_reason": result["stop_reason"],
+        "bedrock.retry_count": result["retries"],
+    })
+    if result["truncated"]:
+        s.set_attribute("llm.truncated", True)
+    return result
+
+
+def _note_throttle(plan: dict, error: BaseException) -> None:
+    """Count a throttled region attempt that the pool then failed over from."""
+    if is_throttle(error):
+        with _throttle_lock:
+            plan["throttles"] += 1
+
+
+def _coalesces(coalesce: bool | None, temperature: float) -> bool:
+    """Whether a call joins single-flight: explicit choice, else only deterministic calls."""
+    return temperature == 0 if coalesce is None else coalesce
+
+
+def _emit_call_start(plan: dict, event: str = "call.start") -> None:
+    emit(event, call_id=plan["call_id"], role=plan["role"], model_id=plan["model_id"])
 
 
-def _get_client():
-    global _client
-    if _client is None:
-        region = os.environ.get("BEDROCK_REGION", DEFAULT_REGION)
-        _client = boto3.client(
-            "bedrock-runtime",
-            region_name=region,
-            config=BotoConfig(read_timeout=120, retries={"max_attempts": 3}),
-        )
-    return _client
+def _emit_call_error(plan: dict, error: BaseException) -> None:
+    emit("call.error", call_id=plan["call_id"], role=plan["role"], model_id=plan["model_id"],
+         error=error_code(error) or type(error).__name__, throttled=is_throttle(error))
+
+
+def _emit_call_end(plan: dict, result: dict, elapsed: float, cpu: float, shared: bool) -> None:
+    emit("call.end", call_id=plan["call_id"], role=plan["role"], model_id=plan["model_id"],
+         region=result["region"], elapsed_sec=round(elapsed, 3), cpu_sec=round(cpu, 4), retries=result["retries"],
+         input_tokens=result["input_tokens"], output_tokens=result["output_tokens"],
+         stop_reason=result["stop_reason"], max_tokens=plan["max_tokens"], coalesced=shared, cache_hit=False,
+         prompt_hash=plan["prompt_hash"], throttled=plan["throttles"])
+
+
+def converse(
+    system: str,
+    user: str,
+    max_tokens: int = 1024,
+    temperature: float = 0.7,
+    role: str = "generate",
+    span_attrs: dict = None,
+    sim_key: str = None,
+    coalesce: bool = None,
+    stop_sequences: list = None,
+    prompt_hash: str = None,
+) -> dict:
+    """Bedrock Converse API call returning text plus usage/retry metadata.
+
+    ``role`` selects the per-role model, region and max_tokens override.
+    ``sim_key`` is the variable input text; when the similarity cache is enabled
+    a near-duplicate prior input with the same role/model/system reuses its output
+    and the result carries ``cache = {"hit": True, "similarity": ..., ...}``.
+    With ``coalesce`` (default: only for deterministic, temperature-0 calls,
+    since sampled calls are meant to differ) concurrent identical requests
+    share one underlying call; followers get ``coalesced = True``, the
+    leader's region, and are not counted as separate calls.
+    With a region pool (and no per-role region) each attempt picks a region
+    and fails over to the next one on throttling or server errors.
+    ``stop_sequences`` end generation early (the matched sequence is not
+    returned); ``truncated`` is True when the output hit ``max_tokens``.
+    ``prompt_hash`` (``registry.Prompt.content_hash``) stands in for system/user
+    in the single-flight key and is recorded on the span and ``call.end``.
+    """
+    plan = _prepare(system, user, max_tokens, temperature, role, stop_sequences, prompt_hash)
+    pool, kwargs, read_timeout = plan["pool"], plan["kwargs"], plan["read_timeout"]
+    with span("bedrock.converse", **_span_attributes(plan, span_attrs)) as s:
+        sim_cache, namespace, hit = _cache_lookup(s, plan, system, sim_key)
+        if hit is not None:
+            return hit
+
+        def call_in(r):
+            # Cross-region failover replaces botocore's in-region retries
+            try:
+                response = _get_client(r, read_timeout, max_attempts=1).converse(**kwargs)
+            except Exception as e:
+                _note_throttle(plan, e)
+                raise
+            plan["served_region"] = r
+            return response
+
+        def request():
+            if pool is None:
+                return _get_client(plan["region"], read_timeout).converse(**kwargs)
+            return pool.call(call_in)
+
+        def send():
+            _emit_call_start(plan)
+            response = _hedger.run(role, request, plan["model_id"]) if _hedger is not None else request()
+            return response, plan["served_region"]
+
+        start = time.time()
+        cpu_start = time.thread_time()
+        shared = False
+        try:
+            if _coalesces(coalesce, temperature):
+                (response, plan["served_region"]), shared = _singleflight.do(plan["key"], send)
+            else:
+                response, _ = send()
+        except Exception as e:
+            _emit_call_error(plan, e)
+            raise
+        elapsed = time.time() - start
+        cpu = time.thread_time() - cpu_start
+        result = _complete(s, plan, response, elapsed, shared)
+        if sim_cache is not None:
+            sim_cache.store(namespace, sim_key, result["text"])
+    _emit_call_end(plan, result, elapsed, cpu, shared)
+    return result
 
 
 def call_bedrock(
@@ -42,13 +452,223 @@ def call_bedrock(
     user: str,
     max_tokens: int = 1024,
     temperature: float = 0.7,
+    role: str = "generate",
+    span_attrs: dict = None,
+    coalesce: bool = None,
 ) -> str:
     """Bedrock Converse API call."""
-    client = _get_client()
-    response = client.converse(
-        modelId=get_model_id(),
-        system=[{"text": system}],
-        messages=[{"role": "user", "content": [{"text": user}]}],
-        inferenceConfig={"maxTokens": max_tokens, "temperature": temperature},
-    )
-    return response["output"]["message"]["content"][0]["text"]
+    return converse(system, user, max_tokens, temperature, role, span_attrs, coalesce=coalesce)["text"]
+
+
+# ---------------------------------------------------------------------------
+# Async path: many in-flight calls on one event loop
+# ---------------------------------------------------------------------------
+def set_async_limit(limit: int) -> None:
+    """Cap on concurrent ``aconverse`` sends per event loop."""
+    global _async_limit
+    _async_limit = max(1, limit)
+    _async_slots.clear()
+
+
+def get_async_limit() -> int:
+    return _async_limit
+
+
+def _async_slot() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slot = _async_slots.get(loop)
+    if slot is None:
+        slot = _async_slots[loop] = asyncio.Semaphore(_async_limit)
+    return slot
+
+
+async def aconverse(
+    system: str,
+    user: str,
+    max_tokens: int = 1024,
+    temperature: float = 0.7,
+    role: str = "generate",
+    span_attrs: dict = None,
+    sim_key: str = None,
+    coalesce: bool = None,
+    stop_sequences: list = None,
+    prompt_hash: str = None,
+) -> dict:
+    """Async ``converse``: same routing, caching, coalescing, failover and hedging.
+
+    Sends wait for one of ``get_async_limit()`` slots, so hundreds of calls can
+    be awaited together without one OS thread each (given a backend with a
+    native ``aconverse``). ``cpu_sec`` covers only this coroutine's own work.
+    """
+    cpu_start = time.thread_time()
+    plan = _prepare(system, user, max_tokens, temperature, role, stop_sequences, prompt_hash)
+    pool, kwargs, read_timeout = plan["pool"], plan["kwargs"], plan["read_timeout"]
+    with span("bedrock.converse", **_span_attributes(plan, span_attrs)) as s:
+        sim_cache, namespace, hit = _cache_lookup(s, plan, system, sim_key)
+        if hit is not None:
+            return hit
+
+        async def call_in(r):
+            try:
+                response = await _get_client(r, read_timeout, max_attempts=1).aconverse(**kwargs)
+            except Exception as e:
+                _note_throttle(plan, e)
+                raise
+            plan["served_region"] = r
+            return response
+
+        async def request():
+            if pool is None:
+                return await _get_client(plan["region"], read_timeout).aconverse(**kwargs)
+            return await pool.acall(call_in)
+
+        async def send():
+            _emit_call_start(plan, "call.queued")
+            async with _async_slot():
+                _emit_call_start(plan)
+                response = await (_hedger.arun(role, request, plan["model_id"]) if _hedger is not None
+                                  else request())
+            return response, plan["served_region"]
+
+        start = time.time()
+        cpu = time.thread_time() - cpu_start
+        shared = False
+        try:
+            if _coalesces(coalesce, temperature):
+                (response, plan["served_region"]), shared = await _singleflight.ado(plan["key"], send)
+            else:
+                response, _ = await send()
+        except BaseException as e:  # includes cancellation
+            _emit_call_error(plan, e)
+            raise
+        elapsed = time.time() - start
+        cpu_start = time.thread_time()
+        result = _complete(s, plan, response, elapsed, shared)
+        if sim_cache is not None:
+            sim_cache.store(namespace, sim_key, result["text"])
+        cpu += time.thread_time() - cpu_start
+    _emit_call_end(plan, result, elapsed, cpu, shared)
+    return result
+
+
+async def acall_bedrock(
+    system: str,
+    user: str,
+    max_tokens: int = 1024,
+    temperature: float = 0.7,
+    role: str = "generate",
+    span_attrs: dict = None,
+    coalesce: bool = None,
+) -> str:
+    """Async Bedrock Converse API call."""
+    return (await aconverse(system, user, max_tokens, temperature, role, span_attrs, coalesce=coalesce))["text"]
+
+
+async def close_async_clients() -> None:
+    """Close backend connections bound to the running event loop."""
+    for client in list(_clients.values()):
+        aclose = getattr(client, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def run_steps(steps):
+    """Drive a call generator: each yielded ``converse`` kwargs dict gets its result sent back.
+
+    Pattern logic written once as a generator runs synchronously here and
+    concurrently under ``arun_steps``; the generator's return value is returned.
+    """
+    try:
+        request = next(steps)
+        while True:
+            try:
+                response = converse(**request)
+            except Exception as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(response)
+    except StopIteration as done:
+        return done.value
+
+
+async def arun_steps(steps):
+    """Async ``run_steps`` using ``aconverse``."""
+    try:
+        request = next(steps)
+        while True:
+            try:
+                response = await aconverse(**request)
+            except Exception as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(response)
+    except StopIteration as done:
+        return done.value
+
+
+def stream_bedrock(
+    system: str,
+    user: str,
+    max_tokens: int = 1024,
+    temperature: float = 0.7,
+    role: str = "generate",
+    span_attrs: dict = None,
+    stop_sequences: list = None,
+):
+    """Yield text deltas as the model generates them (ConverseStream).
+
+    Usage is recorded and ``call.end`` emitted once the stream ends. Streams go
+    to the role's region without hedging, coalescing or failover, since a
+    partially consumed stream cannot be replayed elsewhere.
+    """
+    role_cfg = get_role_config(role)
+    model_id = get_model_id(role)
+    region = get_region(role)
+    max_tokens = role_cfg.max_tokens or max_tokens
+    kwargs = {
+        "modelId": model_id,
+        "system": [{"text": system}],
+        "messages": [{"role": "user", "content": [{"text": user}]}],
+        "inferenceConfig": {"maxTokens": max_tokens, "temperature": temperature},
+    }
+    if stop_sequences:
+        kwargs["inferenceConfig"]["stopSequences"] = list(stop_sequences)
+
+    with span(
+        "bedrock.converse_stream",
+        **{"gen_ai.system": GEN_AI_SYSTEMS[get_backend()], "gen_ai.request.model": model_id,
+           "gen_ai.request.max_tokens": max_tokens, "llm.role": role, "cloud.region": region},
+        **(span_attrs or {}),
+    ) as s:
+        call_id = next(_call_ids)
+        emit("call.start", call_id=call_id, role=role, model_id=model_id)
+        start = time.time()
+        try:
+            response = _get_client(region).converse_stream(**kwargs)
+        except Exception as e:
+            emit("call.error", call_id=call_id, role=role, model_id=model_id,
+                 error=error_code(e) or type(e).__name__, throttled=is_throttle(e))
+            raise
+        usage, stop_reason = {}, None
+        for event in response["stream"]:
+            if "contentBlockDelta" in event:
+                text = event["contentBlockDelta"]["delta"].get("text")
+                if text:
+                    yield text
+            elif "messageStop" in event:
+                stop_reason = event["messageStop"].get("stopReason")
+            elif "metadata" in event:
+                usage = event["metadata"].get("usage", {})
+        elapsed = time.time() - start
+        input_tokens, output_tokens = usage.get("inputTokens", 0), usage.get("outputTokens", 0)
+        retries = response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        stats.record_call(role, model_id, elapsed, input_tokens, output_tokens,
+                          max_tokens=max_tokens, stop_reason=stop_reason)
+        s.set_attributes(**{
+            "gen_ai.usage.input_tokens": input_tokens,
+            "gen_ai.usage.output_tokens": output_tokens,
+            "gen_ai.response.finish_reason": stop_reason,
+        })
+    emit("call.end", call_id=call_id, role=role, model_id=model_id, region=region,
+         elapsed_sec=round(elapsed, 3), cpu_sec=0.0, retries=retries, input_tokens=input_tokens, output_tokens=output_tokens,
+         stop_reason=stop_reason, max_tokens=max_tokens, coalesced=False, cache_hit=False, throttled=0)
@@ -0,0 +1,87 @@
+"""Input-aware output budgets: max_tokens from input length and stated constraints.
+
+A fixed ``max_tokens=1024`` lets a one-line rewrite run away just as far as a
+long answer. The budget here comes from the task's stated limits ("3
+sentences", "3문장", "300자 이내", "Max 3 bullet points") or, for
+transformations, from the size of the input, with a safety margin and clamped
+to the caller's default. Long-form registers (a medical or legal opinion
+restructures a short complaint into sections) declare a ``min_tokens`` floor
+in the style catalogue, since input length alone undersizes them. Calls that
+still hit the budget (``stopReason == "max_tokens"``) are counted per role so
+the constants can be tuned from data.
+"""
+
+import math
+import re
+
+SAFETY_MARGIN = 1.5
+MIN_BUDGET = 256
+PROMPT_OVERHEAD_TOKENS = 64
+
+# Rough output sizes per unit of a stated constraint (tokens)
+TOKENS_PER_SENTENCE = 60
+TOKENS_PER_BULLET = 60
+TOKENS_PER_WORD = 1.6
+TOKENS_PER_CRITERION = 150
+
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+CONSTRAINT_PATTERNS = {
+    "sentences": re.compile(r"(\d+)\s*(?:sentences?|문장)", re.IGNORECASE),
+    "chars": re.compile(r"(\d+)\s*(?:자|characters?|chars?)(?:\s|$|이내|이하|[.,)])", re.IGNORECASE),
+    "bullets": re.compile(r"(\d+)\s*(?:bullet(?:\s*point)?s?|개\s*항목)", re.IGNORECASE),
+    "words": re.compile(r"(\d+)\s*words?\b", re.IGNORECASE),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token estimate: ~1 token per Hangul syllable, ~3.5 chars per token otherwise."""
+    hangul = len(_HANGUL_RE.findall(text))
+    return math.ceil(hangul + (len(text) - hangul) / 3.5)
+
+
+def parse_constraints(text: str) -> dict:
+    """Largest stated limit per kind, e.g. ``{"sentences": 3, "chars": 300}``."""
+    found = {}
+    for kind, pattern in CONSTRAINT_PATTERNS.items():
+        values = [int(n) for n in pattern.findall(text or "")]
+        if values:
+            found[kind] = max(values)
+    return found
+
+
+def constraint_tokens(constraints: dict) -> int | None:
+    """Tokens needed to satisfy the stated constraints (before the safety margin)."""
+    needs = []
+    if "sentences" in constraints:
+        needs.append(constraints["sentences"] * TOKENS_PER_SENTENCE)
+    if "chars" in constraints:
+        needs.append(constraints["chars"])  # Korean: about one token per character
+    if "bullets" in constraints:
+        needs.append(constraints["bullets"] * TOKENS_PER_BULLET)
+    if "words" in constraints:
+        needs.append(math.ceil(constraints["words"] * TOKENS_PER_WORD))
+    return max(needs) + PROMPT_OVERHEAD_TOKENS if needs else None
+
+
+def output_budget(instructions: str = "", source_text: str = None, default: int = 1024,
+                  expansion: float = 4.0, floor: int = None) -> int:
+    """max_tokens for a generation.
+
+    Stated constraints in ``instructions`` win; otherwise a transformation of
+    ``source_text`` gets ``expansion`` x its token size. Without either the
+    caller's ``default`` is kept. ``floor`` raises the result for long-form
+    output; the result never exceeds ``default``.
+    """
+    need = constraint_tokens(parse_constraints(instructions))
+    if need is None and source_text:
+        need = estimate_tokens(source_text) * expansion + PROMPT_OVERHEAD_TOKENS
+    if need is None:
+        return default
+    return int(min(default, max(MIN_BUDGET, floor or 0, need * SAFETY_MARGIN)))
+
+
+def critique_budget(n_criteria: int, default: int = 2048) -> int:
+    """max_tokens for a JSON critique of ``n_criteria`` criteria with feedback."""
+    need = n_criteria * TOKENS_PER_CRITERION + PROMPT_OVERHEAD_TOKENS
+    return int(min(default, max(MIN_BUDGET, need * SAFETY_MARGIN)))
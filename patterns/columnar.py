@@ -0,0 +1,313 @@
+"""Columnar export of saved runs (Arrow IPC / Parquet) for analytics.
+
+Each result entry -- a style transform, persona answer or Self-Refine task --
+becomes one row of typed columns (pattern, scenario, label, model, elapsed,
+tokens, chars, scores). Input and output texts go to a separate ``texts``
+table keyed by ``(run_id, entry_id)``, so latency / score scans never read
+the text bodies. Every run is written as its own file under
+``<dir>/entries/`` and ``<dir>/texts/``; exporting again skips runs that are
+already there in either format. A directory holds one format: exporting in the
+other one into it is rejected.
+
+The default Arrow IPC format is uncompressed and memory-mapped on read, so a
+dashboard scanning a few columns across thousands of runs only pages in
+those columns. Parquet (zstd) is smaller on disk and readable by most tools.
+
+Usage:
+    python3 -m patterns.columnar export results/run_*.json                 # -> results/columnar/
+    python3 -m patterns.columnar export results/run_*.json --format parquet --out /data/llm
+    python3 -m patterns.columnar scan --by model_id,pattern,label
+    python3 -m patterns.columnar texts run_20250101_120000 --entry 3
+
+Requires ``pyarrow`` (``pip install pyarrow``); the rest of the project does not.
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+DEFAULT_DIR = os.path.join("results", "columnar")
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+# (name, pyarrow type name) -- built lazily so importing this module needs no pyarrow
+ENTRY_COLUMNS = [
+    ("run_id", "dict"),
+    ("run_ts", "timestamp"),
+    ("entry_id", "int32"),
+    ("pattern", "dict"),
+    ("scenario", "dict"),
+    ("label", "dict"),
+    ("model_id", "dict"),
+    ("advanced", "bool"),
+    ("elapsed_sec", "float64"),
+    ("input_tokens", "int64"),
+    ("output_tokens", "int64"),
+    ("chars_input", "int32"),
+    ("chars_output", "int32"),
+    ("preservation", "float64"),
+    ("no_distortion", "float64"),
+    ("tone_shift", "float64"),
+    ("rounds", "int16"),
+    ("first_avg", "float64"),
+    ("final_avg", "float64"),
+    ("cache_hit", "bool"),
+    ("truncated", "bool"),
+]
+TEXT_COLUMNS = [("run_id", "dict"), ("entry_id", "int32"), ("input", "text"), ("output", "text")]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise SystemExit("Columnar export needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _schema(columns: list):
+    pa = _pyarrow()
+    types = {
+        "dict": pa.dictionary(pa.int32(), pa.string()),
+        "timestamp": pa.timestamp("s"),
+        "int16": pa.int16(),
+        "int32": pa.int32(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "text": pa.large_string(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+# ---------------------------------------------------------------------------
+# Flattening (pure Python)
+# ---------------------------------------------------------------------------
+def _score(metrics: dict, key: str):
+    value = metrics.get(key)
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def entry_rows(data: dict, run_id: str) -> tuple[list[dict], list[dict]]:
+    """``(entry rows, text rows)`` for one ``collector.to_dict`` / saved run."""
+    try:
+        run_ts = datetime.fromisoformat(data.get("timestamp", "")).replace(microsecond=0)
+    except ValueError:
+        run_ts = None
+    entries, texts = [], []
+    for p in data.get("patterns", []):
+        for entry in p.get("scenarios", []):
+            entry_id = len(entries)
+            metrics = entry.get("metrics") or {}
+            rounds = metrics.get("round_scores") or []
+            critiques = [r for r in rounds if r.get("type") == "critique"]
+            finals = [r for r in rounds if r.get("type") == "final" and not r.get("stale")]
+            tokens = entry.get("tokens") or {}
+            entries.append({
+                "run_id": run_id,
+                "run_ts": run_ts,
+                "entry_id": entry_id,
+                "pattern": p.get("pattern"),
+                "scenario": entry.get("scenario"),
+                "label": entry.get("label"),
+                "model_id": p.get("model_id", data.get("model_id")),
+                "advanced": bool(p.get("advanced", False)),
+                "elapsed_sec": entry.get("elapsed_sec"),
+                "input_tokens": tokens.get("input"),
+                "output_tokens": tokens.get("output"),
+                "chars_input": len(entry.get("input") or ""),
+                "chars_output": len(entry.get("output") or ""),
+                "preservation": _score(metrics, "preservation"),
+                "no_distortion": _score(metrics, "no_distortion"),
+                "tone_shift": _score(metrics, "tone_shift"),
+                "rounds": len(critiques) if rounds else None,
+                "first_avg": rounds[0].get("avg") if rounds else None,
+                "final_avg": finals[-1].get("avg") if finals else None,
+                "cache_hit": bool((entry.get("cache") or {}).get("hit")),
+                "truncated": bool(entry.get("truncated")),
+            })
+            texts.append({"run_id": run_id, "entry_id": entry_id,
+                          "input": entry.get("input"), "output": entry.get("output")})
+    return entries, texts
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+def _write(table, path: str, fmt: str) -> None:
+    pa = _pyarrow()
+    tmp = path + ".tmp"
+    if fmt == "parquet":
+        pa.parquet.write_table(table, tmp, compression="zstd")
+    else:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def export_data(data: dict, run_id: str, out_dir: str = DEFAULT_DIR, fmt: str = "arrow",
+                overwrite: bool = False) -> str | None:
+    """Write one run's entry and text tables; returns the entries path (None if already exported)."""
+    pa = _pyarrow()
+    ext = FORMATS[fmt]
+    entries_path = os.path.join(out_dir, "entries", run_id + ext)
+    if not overwrite and any(os.path.exists(os.path.join(out_dir, "entries", run_id + e))
+                             for e in FORMATS.values()):
+        return None
+    present = _formats(out_dir)
+    if present - {fmt}:
+        raise ValueError(f"{out_dir} already holds {', '.join(sorted(present))} exports; "
+                         f"use another --out for {fmt}")
+    entries, texts = entry_rows(data, run_id)
+    for sub in ("entries", "texts"):
+        os.makedirs(os.path.join(out_dir, sub), exist_ok=True)
+    _write(pa.Table.from_pylist(texts, schema=_schema(TEXT_COLUMNS)),
+           os.path.join(out_dir, "texts", run_id + ext), fmt)
+    _write(pa.Table.from_pylist(entries, schema=_schema(ENTRY_COLUMNS)), entries_path, fmt)
+    return entries_path
+
+
+def export_json(path: str, out_dir: str = DEFAULT_DIR, fmt: str = "arrow", overwrite: bool = False) -> str | None:
+    """Export a ``collector.save`` file; the run id is the file name without ``.json``."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    run_id = os.path.splitext(os.path.basename(path))[0]
+    return export_data(data, run_id, out_dir, fmt, overwrite)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+def _formats(out_dir: str) -> set:
+    """Export formats present under ``out_dir`` (normally at most one)."""
+    found = set()
+    for table in ("entries", "texts"):
+        base = os.path.join(out_dir, table)
+        for name in os.listdir(base) if os.path.isdir(base) else ():
+            found |= {fmt for fmt, ext in FORMATS.items() if name.endswith(ext)}
+    return found
+
+
+def _dataset(out_dir: str, table: str):
+    """Dataset over all exported runs (IPC files are memory-mapped)."""
+    pa = _pyarrow()
+    from pyarrow import fs
+
+    present = _formats(out_dir)
+    if len(present) > 1:
+        raise ValueError(f"{out_dir} mixes {' and '.join(sorted(present))} exports; keep one format per directory")
+    fmt = present.pop() if present else "arrow"
+    base = os.path.join(out_dir, table)
+    names = os.listdir(base) if os.path.isdir(base) else []
+    files = sorted(os.path.join(base, n) for n in names if n.endswith(FORMATS[fmt]))
+    columns = ENTRY_COLUMNS if table == "entries" else TEXT_COLUMNS
+    return pa.dataset.dataset(files, schema=_schema(columns), format="ipc" if fmt == "arrow" else fmt,
+                              filesystem=fs.LocalFileSystem(use_mmap=True))
+
+
+def read_entries(out_dir: str = DEFAULT_DIR, columns: list = None, filter=None):
+    """Entry rows across all exported runs as a ``pyarrow.Table`` (only ``columns`` are read)."""
+    return _dataset(out_dir, "entries").to_table(columns=columns, filter=filter)
+
+
+def read_texts(out_dir: str = DEFAULT_DIR, run_id: str = None, entry_id: int = None):
+    """Input / output texts, optionally for one run or one entry."""
+    pc = _pyarrow().compute
+    filter = None
+    if run_id is not None:
+        filter = pc.field("run_id") == run_id
+        if entry_id is not None:
+            filter = filter & (pc.field("entry_id") == entry_id)
+    return _dataset(out_dir, "texts").to_table(filter=filter)
+
+
+def summarize(out_dir: str = DEFAULT_DIR, by: list = None) -> list[dict]:
+    """Per-group count, median / max latency and mean scores from the typed columns only."""
+    by = by or ["pattern", "label"]
+    columns = list(dict.fromkeys(by + ["elapsed_sec", "output_tokens", "preservation", "final_avg"]))
+    table = read_entries(out_dir, columns=columns).unify_dictionaries()  # one dictionary per file
+    grouped = table.group_by(by).aggregate([
+        ("elapsed_sec", "count"),
+        ("elapsed_sec", "approximate_median"),
+        ("elapsed_sec", "max"),
+        ("output_tokens", "mean"),
+        ("preservation", "mean"),
+        ("final_avg", "mean"),
+    ])
+    rows = grouped.to_pylist()
+    return sorted(rows, key=lambda r: tuple(str(r[k]) for k in by))
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Columnar (Arrow / Parquet) export of saved runs")
+    parser.add_argument("--out", default=DEFAULT_DIR, help=f"Export directory (default: {DEFAULT_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="Export saved run JSON files")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--format", choices=list(FORMATS), default="arrow",
+                   help="arrow (memory-mapped IPC, default) or parquet (zstd)")
+    p.add_argument("--overwrite", action="store_true", help="Re-export runs that already exist")
+
+    p = sub.add_parser("scan", help="Latency / score summary from the typed columns")
+    p.add_argument("--by", default="pattern,label", help="Group-by columns (default: pattern,label)")
+    p.add_argument("--output", choices=["text", "json"], default="text")
+
+    p = sub.add_parser("texts", help="Print the texts of one run (or one entry)")
+    p.add_argument("run_id")
+    p.add_argument("--entry", type=int, default=None)
+    return parser
+
+
+def _run(args) -> None:
+    if args.command == "export":
+        done = skipped = 0
+        for path in args.paths:
+            if export_json(path, args.out, args.format, args.overwrite):
+                done += 1
+            else:
+                skipped += 1
+        print(f"  Exported {done} run(s), {skipped} already present -> {args.out}")
+    elif args.command == "scan":
+        from patterns.display import print_table
+
+        by = [c.strip() for c in args.by.split(",") if c.strip()]
+        rows = summarize(args.out, by)
+        if args.output == "json":
+            print(json.dumps(rows, ensure_ascii=False, indent=2, default=str))
+            return
+
+        def fmt(value, spec):
+            return "-" if value is None else format(value, spec)
+
+        print_table(
+            by + ["N", "P50", "Max", "OutTok", "Preserv", "FinalAvg"],
+            [[r[c] for c in by] + [
+                r["elapsed_sec_count"], fmt(r["elapsed_sec_approximate_median"], ".2f"),
+                fmt(r["elapsed_sec_max"], ".2f"), fmt(r["output_tokens_mean"], ".0f"),
+                fmt(r["preservation_mean"], ".2f"), fmt(r["final_avg_mean"], ".2f"),
+            ] for r in rows],
+        )
+    elif args.command == "texts":
+        for row in read_texts(args.out, args.run_id, args.entry).to_pylist():
+            print(f"\n  [{row['entry_id']}]")
+            print(f"   input:  {row['input']}")
+            print(f"   output: {row['output']}")
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    try:
+        _run(args)
+    except ValueError as e:
+        raise SystemExit(f"  {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Run-to-run regression detector for saved runs (``collector.save`` JSON).
+
+Entries are aligned by (pattern, scenario, label). For each aligned entry the
+baseline and candidate values of latency, tokens, output length, preservation
+scores and Self-Refine round averages are compared. When a key has two or more
+samples on both sides (repeated runs, or repeats within a run) a Welch t-test
+decides whether the change is significant; otherwise the threshold alone does.
+
+Usage:
+    python3 -m patterns.compare results/run_A.json results/run_B.json
+    python3 -m patterns.compare a1.json a2.json a3.json b1.json b2.json b3.json --split 3
+    python3 -m patterns.compare base.json cand.json --max-latency-pct 20 --max-score-drop 0.3
+
+Exit status: 0 = no regression, 1 = at least one threshold exceeded.
+"""
+
+import argparse
+import json
+import math
+import sys
+
+from patterns.display import print_table
+
+# Metric direction: lower is better, higher is better, informational only
+LOWER, HIGHER, INFO = -1, 1, 0
+
+
+def metric_kind(name: str) -> str:
+    if name == "elapsed_sec":
+        return "latency"
+    if name.startswith("tokens."):
+        return "tokens"
+    if name.startswith("preservation.") or name.startswith("round."):
+        return "score"
+    return "info"
+
+
+def metric_direction(name: str) -> int:
+    kind = metric_kind(name)
+    if kind in ("latency", "tokens"):
+        return LOWER
+    if kind == "score":
+        return HIGHER
+    return INFO
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+def _betacf(a: float, b: float, x: float, max_iter: int = 200, eps: float = 3e-14) -> float:
+    """Continued fraction for the incomplete beta function (Lentz's method)."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, max_iter + 1):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < eps:
+            break
+    return h
+
+
+def betainc(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    ln_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(ln_front) * _betacf(a, b, x) / a
+    return 1.0 - math.exp(ln_front) * _betacf(b, a, 1.0 - x) / b
+
+
+def _mean_var(values: list) -> tuple:
+    n = len(values)
+    mean = sum(values) / n
+    var = sum((v - mean) ** 2 for v in values) / (n - 1) if n > 1 else 0.0
+    return mean, var
+
+
+def welch_t_test(a: list, b: list) -> tuple | None:
+    """Two-sided Welch t-test; returns (t, df, p) or None with fewer than 2 samples per side."""
+    if len(a) < 2 or len(b) < 2:
+        return None
+    mean_a, var_a = _mean_var(a)
+    mean_b, var_b = _mean_var(b)
+    se_a, se_b = var_a / len(a), var_b / len(b)
+    se = se_a + se_b
+    if se == 0:
+        return (0.0, float(len(a) + len(b) - 2), 1.0 if mean_a == mean_b else 0.0)
+    t = (mean_b - mean_a) / math.sqrt(se)
+    df = se ** 2 / ((se_a ** 2 / (len(a) - 1) if se_a else 0) + (se_b ** 2 / (len(b) - 1) if se_b else 0))
+    p = betainc(df / 2.0, 0.5, df / (df + t * t))
+    return t, df, p
+
+
+# ---------------------------------------------------------------------------
+# Loading and alignment
+# ---------------------------------------------------------------------------
+def entry_values(entry: dict) -> dict:
+    """Comparable numeric values of one collector entry."""
+    values = {}
+    if isinstance(entry.get("elapsed_sec"), (int, float)):
+        values["elapsed_sec"] = entry["elapsed_sec"]
+    tokens = entry.get("tokens") or {}
+    if tokens:
+        values["tokens.input"] = tokens.get("input", 0)
+        values["tokens.output"] = tokens.get("output", 0)
+        values["tokens.total"] = tokens.get("input", 0) + tokens.get("output", 0)
+    if entry.get("output") is not None:
+        values["chars_output"] = len(entry["output"])
+    metrics = entry.get("metrics") or {}
+    for key, value in metrics.items():
+        if isinstance(value, (int, float)):
+            values[f"preservation.{key}"] = value
+    for rs in metrics.get("round_scores") or []:
+        if not isinstance(rs.get("avg"), (int, float)) or rs.get("stale"):
+            continue
+        name = "round.final.avg" if rs.get("type") == "final" else f"round.R{rs.get('round')}.avg"
+        values[name] = rs["avg"]
+    return values
+
+
+def load_samples(paths: list) -> dict:
+    """{(pattern, scenario, label): {metric: [values...]}} pooled over the given runs."""
+    samples = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for p in data.get("patterns", []):
+            for entry in p.get("scenarios", []):
+                if (entry.get("cache") or {}).get("hit"):
+                    continue  # cache hits say nothing about the model or prompt
+                key = (p.get("pattern"), entry.get("scenario"), entry.get("label"))
+                bucket = samples.setdefault(key, {})
+                for metric, value in entry_values(entry).items():
+                    bucket.setdefault(metric, []).append(value)
+    return samples
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+def compare_samples(baseline: dict, candidate: dict, max_latency_pct: float = 25.0,
+                    max_token_pct: float = 20.0, max_score_drop: float = 0.5,
+                    alpha: float = 0.05) -> list[dict]:
+    """One row per aligned (key, metric) with deltas, p-value and regression flag."""
+    rows = []
+    for key in sorted(set(baseline) & set(candidate), key=lambda k: tuple(str(x) for x in k)):
+        for metric in sorted(set(baseline[key]) & set(candidate[key])):
+            a, b = baseline[key][metric], candidate[key][metric]
+            mean_a, mean_b = sum(a) / len(a), sum(b) / len(b)
+            delta = mean_b - mean_a
+            # Undefined (None) for a change from zero; any such change is beyond the thresholds
+            delta_pct = delta / mean_a * 100 if mean_a else (0.0 if delta == 0 else None)
+            test = welch_t_test(a, b)
+            p = test[2] if test is not None else None
+
+            # Changes within the threshold count as noise in either direction
+            kind = metric_kind(metric)
+            if kind == "latency":
+                beyond = delta_pct is None or abs(delta_pct) > max_latency_pct
+            elif kind == "tokens":
+                beyond = delta_pct is None or abs(delta_pct) > max_token_pct
+            elif kind == "score":
+                beyond = abs(delta) > max_score_drop
+            else:
+                beyond = False
+            worse = metric_direction(metric) * delta < 0
+            significant = p is None or p < alpha
+            rows.append({
+                "pattern": key[0], "scenario": key[1], "label": key[2], "metric": metric,
+                "n_base": len(a), "n_cand": len(b),
+                "base": mean_a, "cand": mean_b, "delta": delta, "delta_pct": delta_pct,
+                "p_value": p, "regression": beyond and worse and significant,
+                "improved": beyond and not worse and significant,
+            })
+    return rows
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.2f}" if abs(value) < 1000 else f"{value:.0f}"
+
+
+def print_report(rows: list[dict], baseline: dict, candidate: dict, show_all: bool = False) -> None:
+    missing = sorted(set(baseline) - set(candidate), key=str)
+    added = sorted(set(candidate) - set(baseline), key=str)
+    shown = [r for r in rows if show_all or r["regression"] or r["improved"]]
+    print(f"\n  Compared {len(set(baseline) & set(candidate))} aligned entries, {len(rows)} metrics")
+    if shown:
+        print_table(
+            ["Pattern", "Scenario", "Label", "Metric", "Base", "Cand", "Delta", "Delta%", "p", "Status"],
+            [(r["pattern"][:14], str(r["scenario"])[:24], str(r["label"])[:22], r["metric"],
+              _fmt(r["base"]), _fmt(r["cand"]), f"{r['delta']:+.2f}",
+              f"{r['delta_pct']:+.1f}%" if r["delta_pct"] is not None else "n/a",
+              f"{r['p_value']:.3f}" if r["p_value"] is not None else "-",
+              "REGRESSION" if r["regression"] else ("improved" if r["improved"] else ""))
+             for r in shown],
+        )
+    for key in missing:
+        print(f"   - missing in candidate: {' / '.join(str(k) for k in key)}")
+    for key in added:
+        print(f"   + new in candidate: {' / '.join(str(k) for k in key)}")
+    regressions = sum(1 for r in rows if r["regression"])
+    print(f"\n  {regressions} regression(s)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare saved runs and flag regressions")
+    parser.add_argument("runs", nargs="+", help="Saved run JSON files (baseline first)")
+    parser.add_argument("--split", type=int, default=1, metavar="N",
+                        help="First N files are the baseline, the rest the candidate (default: 1)")
+    parser.add_argument("--max-latency-pct", type=float, default=25.0,
+                        help="Max allowed elapsed_sec increase in percent (default: 25)")
+    parser.add_argument("--max-token-pct", type=float, default=20.0,
+                        help="Max allowed token increase in percent (default: 20)")
+    parser.add_argument("--max-score-drop", type=float, default=0.5,
+                        help="Max allowed drop in preservation / Self-Refine averages (default: 0.5)")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="Significance level when repeats exist (default: 0.05)")
+    parser.add_argument("--all", action="store_true", help="Show unchanged metrics too")
+    parser.add_argument("--output", choices=["text", "json"], default="text", help="Output format")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if len(args.runs) < 2 or not 0 < args.split < len(args.runs):
+        parser.error("need at least one baseline and one candidate run")
+
+    baseline = load_samples(args.runs[:args.split])
+    candidate = load_samples(args.runs[args.split:])
+    rows = compare_samples(baseline, candidate, args.max_latency_pct, args.max_token_pct,
+                           args.max_score_drop, args.alpha)
+    if args.output == "json":
+        print(json.dumps({
+            "baseline": args.runs[:args.split],
+            "candidate": args.runs[args.split:],
+            "rows": rows,
+            "regressions": sum(1 for r in rows if r["regression"]),
+        }, ensure_ascii=False, indent=2, default=str, allow_nan=False))
+    else:
+        print_report(rows, baseline, candidate, args.all)
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,99 +1,61 @@
 """Pattern 3: Content Optimization — Self-Refine Loop.
 
 Generate -> Self-Critique -> Refine cycle to systematically improve output quality.
+Tasks and the critique / refine prompts are registry definitions
+(``patterns/data/tasks.json``, ``prompts.json``).
 """
 
+import asyncio
+import json
+import re
 import time
 
-from patterns.bedrock import call_bedrock
+from patterns.bedrock import arun_steps, run_steps
+from patterns.budget import critique_budget, output_budget
+from patterns.deadline import expected_latency, get_deadline, should_skip
 from patterns.display import (
     collector,
     print_header,
     print_result,
     print_table,
+    report_failures,
 )
-from patterns.metrics import parse_critique_scores
+from patterns.metrics import parse_critique
+from patterns.registry import demo_tasks, deprecated_constant, prompt_template, prompts, tasks
+from patterns.tracing import current_span, span, traced
 
-# ---------------------------------------------------------------------------
-# Task definitions
-# ---------------------------------------------------------------------------
-TASKS = {
-    "basic": {
-        "name": "Bedrock Overview for Executives",
-        "task": (
-            "Explain the key features of Amazon Bedrock in 3 sentences. "
-            "Target audience: executives with no cloud experience."
-        ),
-        "task_ko": (
-            "Amazon Bedrock의 주요 특징을 3문장으로 설명하세요. "
-            "대상: 클라우드 경험이 없는 경영진."
-        ),
-        "role": "You are an AWS technical marketing specialist.",
-        "role_ko": "당신은 AWS 기술 마케팅 전문가입니다.",
-        "criteria": (
-            "1. Clarity (1-5): Understandable by executives without jargon?\n"
-            "2. Conciseness (1-5): Within 3 sentences, no filler?\n"
-            "3. Persuasiveness (1-5): Clear business value?\n"
-            "4. Accuracy (1-5): Technically accurate?"
-        ),
-        "criteria_ko": (
-            "1. 명확성 (1-5): 전문 용어 없이 경영진이 바로 이해할 수 있는가?\n"
-            "2. 간결성 (1-5): 3문장 이내, 군더더기 없는가?\n"
-            "3. 설득력 (1-5): 비즈니스 가치가 명확한가?\n"
-            "4. 정확성 (1-5): 기술적으로 정확한가?"
-        ),
-        "criteria_keys": ["명확성", "간결성", "설득력", "정확성"],
-        "rounds": 1,
-    },
-    "advanced": {
-        "name": "Financial CIO Proposal Summary",
-        "task": (
-            "Write a 5-sentence executive summary for a proposal to introduce "
-            "customer service automation using Amazon Bedrock. "
-            "Target: Financial sector CIO. Emphasize ROI and security."
-        ),
-        "task_ko": (
-            "Amazon Bedrock을 활용한 고객 서비스 자동화 도입 제안서의 핵심 요약을 "
-            "5문장으로 작성하세요. 대상: 금융권 CIO. ROI와 보안을 강조하세요."
-        ),
-        "role": "You are a financial-sector specialized AWS consultant.",
-        "role_ko": "당신은 금융권 전문 AWS 컨설턴트입니다.",
-        "criteria": (
-            "1. 명확성 (1-5): CIO가 바로 의사결정할 수 있을 정도로 명확한가?\n"
-            "2. 간결성 (1-5): 5문장 이내, 불필요한 수식어 없는가?\n"
-            "3. 설득력 (1-5): ROI와 비즈니스 임팩트가 구체적인가?\n"
-            "4. 정확성 (1-5): 기술적으로 정확하고 과장이 없는가?\n"
-            "5. 보안/규제 (1-5): 금융권 규제(전자금융감독규정 등) 관점을 반영했는가?\n"
-            "6. 실행가능성 (1-5): 구체적인 다음 단계(PoC 등)가 제시되었는가?"
-        ),
-        "criteria_keys": ["명확성", "간결성", "설득력", "정확성", "보안/규제", "실행가능성"],
-        "rounds": 3,
-    },
-    "advanced-blog": {
-        "name": "Tech Blog Introduction",
-        "task_ko": (
-            "Amazon Bedrock을 소개하는 기술 블로그의 도입부를 300자 이내로 작성하세요. "
-            "대상: 백엔드 개발자. Hook + 핵심 가치 + 읽어야 할 이유를 포함하세요."
-        ),
-        "role_ko": "당신은 기술 블로그 전문 작가입니다. 개발자 커뮤니티에서 인기 있는 글을 쓰는 것이 특기입니다.",
-        "criteria": (
-            "1. 명확성 (1-5): 개발자가 바로 이해할 수 있는가?\n"
-            "2. 간결성 (1-5): 300자 이내인가?\n"
-            "3. 설득력 (1-5): 계속 읽고 싶어지는가?\n"
-            "4. 정확성 (1-5): 기술적으로 정확한가?\n"
-            "5. 톤 (1-5): 개발자 친화적이고 자연스러운가?"
-        ),
-        "criteria_keys": ["명확성", "간결성", "설득력", "정확성", "톤"],
-        "rounds": 2,
-    },
-}
 
+def __getattr__(name: str):
+    # BASIC_STYLES and the other pre-registry constants, kept as deprecated aliases
+    return deprecated_constant(__name__, name)
 
 # ---------------------------------------------------------------------------
 # Self-Refine engine
 # ---------------------------------------------------------------------------
-def run_self_refine(task_config: dict, verbose: bool = True) -> tuple[list, str]:
-    """Run Self-Refine loop. Return (round_scores, final_draft)."""
+def _select_criteria(criteria: str, keys: list) -> str:
+    """Keep only the numbered criteria lines whose name is in ``keys``."""
+    lines = []
+    for line in criteria.splitlines():
+        m = re.match(r"\s*\d+\.\s*(.+?)\s*\(", line)
+        if m and m.group(1) in keys:
+            lines.append(line)
+    return "\n".join(lines) if lines else criteria
+
+
+def _scaled_saving(tokens: int, actual_chars: int, full_chars: float) -> int:
+    """Tokens a full-size prompt would have used, minus the actual tokens (char-ratio estimate)."""
+    if not actual_chars:
+        return 0
+    return max(0, round(tokens * full_chars / actual_chars) - tokens)
+
+
+def _avg(scores: dict) -> float:
+    return round(sum(scores.values()) / len(scores), 1) if scores else 0
+
+
+def _self_refine_steps(task_config: dict, verbose: bool = True, incremental: bool = False,
+                       threshold: int = 5, coalesce: bool = None):
+    """Call generator behind ``run_self_refine`` / ``arun_self_refine``."""
     task = task_config.get("task_ko", task_config.get("task", ""))
     role = task_config.get("role_ko", task_config.get("role", ""))
     criteria = task_config.get("criteria_ko", task_config.get("criteria", ""))
@@ -102,11 +64,20 @@ def run_self_refine(task_config: dict, verbose: bool = True) -> tuple[list, str]
 
     if verbose:
         print(f"\n  Task: {task}")
-        print(f"   Rounds: {rounds}\n")
+        mode = f"  (incremental, threshold {threshold})" if incremental else ""
+        print(f"   Rounds: {rounds}{mode}\n")
+
+    refine_template = prompt_template("refine", system=role + prompts.get("refine")["system_suffix"])
 
     # Initial generation
     start = time.time()
-    draft = call_bedrock(role, task, temperature=0.8)
+    draft_budget = output_budget(task)
+    prompt = prompt_template("draft", system=role).render(task=task)
+    draft = (yield {
+        "system": prompt.system, "user": prompt.user, "max_tokens": draft_budget, "temperature": 0.8,
+        "role": "generate", "span_attrs": {"step": "generate", "round": 0},
+        "coalesce": coalesce, "prompt_hash": prompt.content_hash,
+    })["text"]
     gen_elapsed = time.time() - start
 
     if verbose:
@@ -114,103 +85,166 @@ def run_self_refine(task_config: dict, verbose: bool = True) -> tuple[list, str]
         print(f"   {draft}\n")
 
     round_scores = []
+    carried = {}  # criterion -> {"score", "feedback"} from its latest evaluation
 
-    for r in range(rounds):
-        # Critique
-        critique_prompt = f"""Evaluate the following text against these criteria.
-
-## Criteria
-{criteria}
-
-## Text
-{draft}
-
-## Output format
-Output JSON with each criterion name as key and {{"score": N, "feedback": "..."}} as value."""
+    def pending_keys() -> list:
+        if not (incremental and carried):
+            return list(criteria_keys)
+        return [k for k in criteria_keys if carried.get(k, {}).get("score", 0) < threshold]
 
+    def evaluate(prompt_criteria: str, evaluated: list, final: bool, round_no: int) -> tuple:
+        """Run one critique (``yield from``); returns (raw critique, scores, detail, response, elapsed, saved)."""
+        template = prompt_template("critique-final" if final else "critique")
+        prompt = template.render(criteria=prompt_criteria, draft=draft)
         start = time.time()
-        critique = call_bedrock(
-            "You are a technical document quality auditor. Be strict and specific.",
-            critique_prompt,
-            max_tokens=2048,
-            temperature=0.3,
-        )
-        critique_elapsed = time.time() - start
+        response = yield {
+            "system": prompt.system,
+            "user": prompt.user,
+            "max_tokens": critique_budget(len(evaluated)),
+            "temperature": 0.3,
+            "role": "critique",
+            "span_attrs": {"step": "final" if final else "critique", "round": round_no,
+                           "criteria_evaluated": len(evaluated)},
+            "coalesce": coalesce,
+            "prompt_hash": prompt.content_hash,
+        }
+        elapsed = time.time() - start
+        detail = parse_critique(response["text"])
+        saved_in = saved_out = 0
+        if incremental:
+            carried.update(detail)
+            scores = {k: v["score"] for k, v in carried.items()}
+            full_prompt = template.render(criteria=criteria, draft=draft)
+            saved_in = _scaled_saving(response["input_tokens"], len(prompt.user), len(full_prompt.user))
+            saved_out = _scaled_saving(response["output_tokens"], len(evaluated), len(criteria_keys))
+        else:
+            scores = {k: v["score"] for k, v in detail.items()}
+        return response["text"], scores, detail, response, elapsed, (saved_in, saved_out)
+
+    deadline = get_deadline()
+    for r in range(rounds):
+        if deadline is not None:
+            # A round (critique + refine) must still leave room for the final evaluation
+            needed = 2 * expected_latency("critique") + expected_latency("refine")
+            if not deadline.can_afford(needed):
+                deadline.record_skip("refine_rounds", "insufficient time", task=task_config.get("name"),
+                                     dropped_rounds=list(range(r + 1, rounds + 1)),
+                                     remaining_sec=round(deadline.remaining(), 2))
+                if verbose:
+                    print(f"  [Deadline] dropping rounds {r + 1}-{rounds}\n")
+                break
+
+        evaluated = pending_keys()
+        if not evaluated:
+            if verbose:
+                print(f"  [Round {r + 1}] all criteria >= {threshold}; remaining rounds skipped\n")
+            break
 
-        scores = parse_critique_scores(critique)
-        avg = round(sum(scores.values()) / len(scores), 1) if scores else 0
+        # Critique
+        round_criteria = _select_criteria(criteria, evaluated) if incremental else criteria
+        critique, scores, detail, crit_resp, critique_elapsed, (saved_in, saved_out) = yield from evaluate(
+            round_criteria, evaluated, final=False, round_no=r + 1,
+        )
+        avg = _avg(scores)
+        tokens = {
+            "input": crit_resp["input_tokens"],
+            "output": crit_resp["output_tokens"],
+            "saved_input": saved_in,
+            "saved_output": saved_out,
+        }
         round_scores.append({
             "round": r + 1,
             "type": "critique",
             "scores": scores,
             "avg": avg,
             "elapsed_sec": round(critique_elapsed, 2),
+            "evaluated": evaluated,
+            "tokens": tokens,
         })
 
         if verbose:
             print(f"  [Round {r + 1} Critique] avg: {avg}/5  ({critique_elapsed:.1f}s)")
             for k, v in scores.items():
-                print(f"   {k}: {v}/5")
+                carried_mark = "  (carried)" if incremental and k not in detail else ""
+                print(f"   {k}: {v}/5{carried_mark}")
             print()
 
         # Refine
-        refine_prompt = f"""Improve the text based on the feedback.
-
-## Original
-{draft}
-
-## Feedback
-{critique}
-
-## Original Task
-{task}
-
-Reflect ALL feedback and output only the improved final version."""
+        feedback = critique
+        trimmed = incremental and bool(detail)
+        if trimmed:
+            actionable = {k: v for k, v in carried.items() if v["score"] < threshold}
+            if not actionable:
+                if verbose:
+                    print(f"  [Round {r + 1}] all criteria >= {threshold}; refine skipped\n")
+                break
+            feedback = json.dumps(actionable, ensure_ascii=False, indent=1)
+        refine_prompt = refine_template.render(draft=draft, feedback=feedback, task=task)
 
         start = time.time()
-        draft = call_bedrock(
-            role + " Carefully incorporate all feedback.",
-            refine_prompt,
-            temperature=0.5,
-        )
+        refine_resp = yield {
+            "system": refine_prompt.system,
+            "user": refine_prompt.user,
+            "max_tokens": draft_budget,
+            "temperature": 0.5,
+            "role": "refine",
+            "span_attrs": {"step": "refine", "round": r + 1},
+            "coalesce": coalesce,
+            "prompt_hash": refine_prompt.content_hash,
+        }
+        draft = refine_resp["text"]
         refine_elapsed = time.time() - start
 
+        tokens["input"] += refine_resp["input_tokens"]
+        tokens["output"] += refine_resp["output_tokens"]
+        if trimmed:
+            # Full mode would have sent the raw critique of every criterion
+            full_feedback_chars = len(critique) * len(criteria_keys) / len(evaluated)
+            full_chars = len(refine_prompt.user) - len(feedback) + full_feedback_chars
+            tokens["saved_input"] += _scaled_saving(refine_resp["input_tokens"], len(refine_prompt.user),
+                                                    full_chars)
+
         if verbose:
             print(f"  [Round {r + 1} Refined] ({refine_elapsed:.1f}s)")
             print(f"   {draft}\n")
 
     # Final evaluation
-    final_prompt = f"""Evaluate the following text against these criteria.
-
-## Criteria
-{criteria}
-
-## Text
-{draft}
-
-## Output format
-Output JSON with scores and feedback."""
-
-    start = time.time()
-    final_critique = call_bedrock(
-        "You are a technical document quality auditor.",
-        final_prompt,
-        max_tokens=2048,
-        temperature=0.3,
-    )
-    final_elapsed = time.time() - start
-
-    final_scores = parse_critique_scores(final_critique)
-    final_avg = round(sum(final_scores.values()) / len(final_scores), 1) if final_scores else 0
+    evaluated = pending_keys()
+    stale = bool(evaluated) and should_skip("final_evaluation", "critique", task=task_config.get("name"))
+    if stale:
+        # Out of time: the last critique scored the draft before its refine, so it is carried, not final
+        evaluated = []
+        last_scores = round_scores[-1]["scores"] if round_scores else {}
+        carried = {k: {"score": v} for k, v in last_scores.items()}
+    if evaluated:
+        final_criteria = _select_criteria(criteria, evaluated) if incremental else criteria
+        _, final_scores, _, final_resp, final_elapsed, (saved_in, saved_out) = yield from evaluate(
+            final_criteria, evaluated, final=True, round_no=rounds + 1,
+        )
+        final_tokens = {"input": final_resp["input_tokens"], "output": final_resp["output_tokens"],
+                        "saved_input": saved_in, "saved_output": saved_out}
+    else:
+        # Everything at threshold (or no time left): the carried scores are final
+        final_scores = {k: v["score"] for k, v in carried.items()}
+        final_elapsed = 0.0
+        final_tokens = {"input": 0, "output": 0, "saved_input": 0, "saved_output": 0}
+    final_avg = _avg(final_scores)
     round_scores.append({
         "round": rounds + 1,
         "type": "final",
         "scores": final_scores,
         "avg": final_avg,
         "elapsed_sec": round(final_elapsed, 2),
+        "evaluated": evaluated,
+        "tokens": final_tokens,
     })
+    if stale:
+        round_scores[-1]["stale"] = True
+        round_scores[-1]["carried_from"] = round_scores[-2]["round"] if len(round_scores) > 1 else None
 
-    if verbose and rounds > 1:
+    if verbose and stale:
+        print("  [Final Evaluation] skipped (deadline); last critique scores carried, not re-evaluated")
+    elif verbose and rounds > 1:
         print(f"  [Final Evaluation] avg: {final_avg}/5  ({final_elapsed:.1f}s)")
         for k, v in final_scores.items():
             print(f"   {k}: {v}/5")
@@ -218,64 +252,165 @@ Output JSON with scores and feedback."""
     return round_scores, draft
 
 
+def run_self_refine(task_config: dict, verbose: bool = True, incremental: bool = False,
+                    threshold: int = 5, coalesce: bool = None) -> tuple[list, str]:
+    """Run Self-Refine loop. Return (round_scores, final_draft).
+
+    With ``incremental``, each critique after the first re-scores only criteria
+    below ``threshold`` (others carry forward), and the refine prompt gets only
+    the actionable feedback instead of the raw critique. Every round records
+    its token usage and the estimated savings versus a full critique.
+    ``coalesce`` is passed to ``converse`` (default: share only temperature-0 calls).
+    """
+    return run_steps(_self_refine_steps(task_config, verbose, incremental, threshold, coalesce))
+
+
+async def arun_self_refine(task_config: dict, verbose: bool = False, incremental: bool = False,
+                           threshold: int = 5, coalesce: bool = None) -> tuple[list, str]:
+    """Async ``run_self_refine`` (quiet by default, since concurrent loops would interleave output)."""
+    return await arun_steps(_self_refine_steps(task_config, verbose, incremental, threshold, coalesce))
+
+
+def print_token_savings(name: str, round_scores: list, n_criteria: int) -> None:
+    """Print per-round token usage and estimated savings of incremental critique."""
+    print(f"\n  Token Savings ({name})")
+    rows = []
+    totals = {"input": 0, "output": 0, "saved_input": 0, "saved_output": 0}
+    for rs in round_scores:
+        t = rs["tokens"]
+        for k in totals:
+            totals[k] += t[k]
+        rows.append((
+            f"R{rs['round']}" if rs["type"] == "critique" else "Final",
+            f"{len(rs['evaluated'])}/{n_criteria}",
+            t["input"], t["output"], t["saved_input"], t["saved_output"],
+        ))
+    rows.append(("TOTAL", "", totals["input"], totals["output"],
+                 totals["saved_input"], totals["saved_output"]))
+    print_table(["Round", "Criteria", "InTok", "OutTok", "SavedIn", "SavedOut"], rows)
+
+    full = totals["input"] + totals["output"] + totals["saved_input"] + totals["saved_output"]
+    if full:
+        pct = 100 * (totals["saved_input"] + totals["saved_output"]) / full
+        print(f"  Saved ~{pct:.0f}% of critique/refine tokens vs. full critique")
+
+
 # ---------------------------------------------------------------------------
 # Main demo function
 # ---------------------------------------------------------------------------
-def demo_content_optimization(advanced: bool = False, json_mode: bool = False) -> dict:
+def _record_task(config: dict, round_scores: list, final_draft: str, json_mode: bool,
+                 incremental: bool) -> dict:
+    """Collect one Self-Refine result, print its score progression and return the task result."""
+    task_result = {
+        "task": config["name"],
+        "rounds": config["rounds"],
+        "round_scores": round_scores,
+        "final_draft": final_draft,
+    }
+
+    # Collect for output
+    task_ko = config.get("task_ko", config.get("task", ""))
+    total_elapsed = sum(rs.get("elapsed_sec", 0) for rs in round_scores)
+    tokens = {
+        "input": sum(rs.get("tokens", {}).get("input", 0) for rs in round_scores),
+        "output": sum(rs.get("tokens", {}).get("output", 0) for rs in round_scores),
+    }
+    collector.add_result(
+        config["name"], "self-refine", task_ko, final_draft,
+        total_elapsed, {"round_scores": round_scores}, {"tokens": tokens},
+    )
+
+    if not json_mode and len(round_scores) > 1:
+        print(f"\n  Score Progression ({config['name']})")
+        headers = ["Round"] + config["criteria_keys"] + ["AVG"]
+        rows = []
+        for rs in round_scores:
+            row = [f"R{rs['round']}" if rs["type"] == "critique" else "Final*" if rs.get("stale") else "Final"]
+            for k in config["criteria_keys"]:
+                row.append(rs["scores"].get(k, "-"))
+            row.append(rs["avg"])
+            rows.append(row)
+        print_table(headers, rows)
+
+        if len(round_scores) >= 2:
+            first_avg = round_scores[0]["avg"]
+            last_avg = round_scores[-1]["avg"]
+            delta = round(last_avg - first_avg, 1)
+            sign = "+" if delta >= 0 else ""
+            print(f"\n  Improvement: {first_avg} -> {last_avg} ({sign}{delta})")
+            if round_scores[-1].get("stale"):
+                print("  * final evaluation skipped for time; scores carried from the last critique")
+
+        if incremental:
+            print_token_savings(config["name"], round_scores, len(config["criteria_keys"]))
+
+    return task_result
+
+
+@traced("pattern", pattern="content_optimization")
+def demo_content_optimization(advanced: bool = False, json_mode: bool = False,
+                              incremental: bool = False) -> dict:
     """Run Content Optimization demo and return results dict."""
+    current_span().set_attributes(advanced=advanced, incremental=incremental)
     if not json_mode:
         print_header("Pattern 3: Content Optimization (Self-Refine Loop)", advanced)
 
     collector.start_pattern("content_optimization", advanced)
     pattern_results = {"pattern": "content_optimization", "tasks": []}
 
-    task_keys = ["basic"]
-    if advanced:
-        task_keys = ["advanced", "advanced-blog"]
-
-    for tkey in task_keys:
-        config = TASKS[tkey]
+    for tkey in demo_tasks(advanced):
+        config = tasks.get(tkey)
+        if should_skip("self_refine_task", "generate", task=config["name"]):
+            continue
 
         if not json_mode:
             print(f"\n{'~' * 40}")
             print(f"  Scenario: {config['name']}")
 
-        round_scores, final_draft = run_self_refine(config, verbose=not json_mode)
+        with span("scenario", scenario=config["name"], rounds=config["rounds"]):
+            round_scores, final_draft = run_self_refine(
+                config, verbose=not json_mode, incremental=incremental,
+            )
 
-        task_result = {
-            "task": config["name"],
-            "rounds": config["rounds"],
-            "round_scores": round_scores,
-            "final_draft": final_draft,
-        }
+        pattern_results["tasks"].append(_record_task(config, round_scores, final_draft, json_mode, incremental))
 
-        # Collect for output
-        task_ko = config.get("task_ko", config.get("task", ""))
-        total_elapsed = sum(rs.get("elapsed_sec", 0) for rs in round_scores)
-        collector.add_result(
-            config["name"], "self-refine", task_ko, final_draft,
-            total_elapsed, {"round_scores": round_scores},
-        )
+    return pattern_results
+
+
+@traced("pattern", pattern="content_optimization")
+async def ademo_content_optimization(advanced: bool = False, json_mode: bool = False,
+                                     incremental: bool = False) -> dict:
+    """Async Content Optimization demo: the Self-Refine loops run concurrently, reported in order.
+
+    A failed loop is reported on its own; the others are still recorded.
+    """
+    current_span().set_attributes(advanced=advanced, incremental=incremental)
+    if not json_mode:
+        print_header("Pattern 3: Content Optimization (Self-Refine Loop)", advanced)
+
+    collector.start_pattern("content_optimization", advanced)
+    pattern_results = {"pattern": "content_optimization", "tasks": []}
+
+    async def run_task(config: dict) -> tuple:
+        with span("scenario", scenario=config["name"], rounds=config["rounds"]):
+            return await arun_self_refine(config, incremental=incremental)
+
+    configs = [tasks.get(k) for k in demo_tasks(advanced)]
+    configs = [c for c in configs if not should_skip("self_refine_task", "generate", task=c["name"])]
+    results = await asyncio.gather(*(run_task(c) for c in configs), return_exceptions=True)
 
-        if not json_mode and len(round_scores) > 1:
-            print(f"\n  Score Progression ({config['name']})")
-            headers = ["Round"] + config["criteria_keys"] + ["AVG"]
-            rows = []
-            for rs in round_scores:
-                row = [f"R{rs['round']}" if rs["type"] == "critique" else "Final"]
-                for k in config["criteria_keys"]:
-                    row.append(rs["scores"].get(k, "-"))
-                row.append(rs["avg"])
-                rows.append(row)
-            print_table(headers, rows)
-
-            if len(round_scores) >= 2:
-                first_avg = round_scores[0]["avg"]
-                last_avg = round_scores[-1]["avg"]
-                delta = round(last_avg - first_avg, 1)
-                sign = "+" if delta >= 0 else ""
-                print(f"\n  Improvement: {first_avg} -> {last_avg} ({sign}{delta})")
-
-        pattern_results["tasks"].append(task_result)
+    failures = []
+    for config, result in zip(configs, results):
+        if isinstance(result, BaseException):
+            failures.append((config["name"], "self-refine", result))
+            continue
+        round_scores, final_draft = result
+        if not json_mode:
+            print(f"\n{'~' * 40}")
+            print(f"  Scenario: {config['name']}")
+            print_result("Final Draft", final_draft)
+        pattern_results["tasks"].append(_record_task(config, round_scores, final_draft, json_mode, incremental))
 
+    if failures:
+        pattern_results["failures"] = report_failures(failures, json_mode)
     return pattern_results
@@ -0,0 +1,122 @@
+"""Deadline-aware execution: a per-run (or per-request) time budget.
+
+The active deadline lives in a context variable, so it follows the run into
+spans and server worker threads. ``converse()`` derives each call's read timeout
+from the remaining budget, and the patterns degrade gracefully when time runs
+short (drop refine rounds, skip judge calls, shorten max_tokens). Every
+degradation is recorded in ``Deadline.skipped``.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from patterns.stats import stats
+
+# Rough per-role latency guesses used until real samples exist (seconds)
+DEFAULT_EXPECTED_LATENCY = {
+    "generate": 10.0,
+    "persona": 15.0,
+    "critique": 8.0,
+    "refine": 10.0,
+    "judge": 3.0,
+}
+MIN_CALL_TIMEOUT = 1.0
+LOW_BUDGET_FRACTION = 0.25
+
+_current = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call cannot start because the time budget is spent."""
+
+
+def expected_latency(role: str) -> float:
+    """Median recent latency for a role, or a default guess with too few samples."""
+    if stats.sample_count(role) >= 3:
+        return stats.latency_percentile(role, 50)
+    return DEFAULT_EXPECTED_LATENCY.get(role, 10.0)
+
+
+class Deadline:
+    """A time budget with a record of what was skipped to meet it."""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.start = time.monotonic()
+        self.expires = self.start + seconds
+        self.skipped = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def can_afford(self, seconds: float) -> bool:
+        return self.remaining() >= seconds
+
+    def low(self, role: str = None) -> bool:
+        """True when less than a quarter of the budget (or two typical calls) is left."""
+        remaining = self.remaining()
+        if remaining < self.budget * LOW_BUDGET_FRACTION:
+            return True
+        return role is not None and remaining < 2 * expected_latency(role)
+
+    def call_timeout(self, default: float) -> float:
+        """Read timeout for the next call; raises DeadlineExceeded if none is left."""
+        remaining = self.remaining()
+        if remaining < MIN_CALL_TIMEOUT:
+            raise DeadlineExceeded(f"{self.budget:.0f}s budget exhausted")
+        return min(default, remaining)
+
+    def record_skip(self, action: str, reason: str, **detail) -> None:
+        with self._lock:
+            self.skipped.append({
+                "action": action,
+                "reason": reason,
+                "at_sec": round(time.monotonic() - self.start, 2),
+                **detail,
+            })
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "budget_sec": self.budget,
+                "elapsed_sec": round(time.monotonic() - self.start, 2),
+                "remaining_sec": round(self.remaining(), 2),
+                "skipped": list(self.skipped),
+            }
+
+
+def get_deadline() -> Deadline | None:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float | None):
+    """Run the block under a time budget (``None`` = no deadline)."""
+    if seconds is None:
+        yield None
+        return
+    d = Deadline(seconds)
+    token = _current.set(d)
+    try:
+        yield d
+    finally:
+        _current.reset(token)
+
+
+def should_skip(action: str, role: str, **detail) -> bool:
+    """True (and recorded) if a call for ``role`` no longer fits in the remaining budget."""
+    d = _current.get()
+    if d is None:
+        return False
+    needed = max(MIN_CALL_TIMEOUT, min(expected_latency(role), d.budget * LOW_BUDGET_FRACTION))
+    if d.can_afford(needed):
+        return False
+    d.record_skip(action, "insufficient time", role=role,
+                  remaining_sec=round(d.remaining(), 2), **detail)
+    return True
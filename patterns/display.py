@@ -5,6 +5,9 @@ import os
 import sys
 from datetime import datetime
 
+from patterns.deadline import DeadlineExceeded
+from patterns.events import emit
+
 
 def print_table(headers: list, rows: list) -> list[str]:
     """Print a formatted table and return lines."""
@@ -51,23 +54,109 @@ def print_result(label: str, text: str, truncate: int = 0) -> None:
     print(f"   {display}\n")
 
 
+def report_failures(failures: list, json_mode: bool = False) -> list[dict]:
+    """Print the ``(scenario, label, error)`` items of a concurrent batch that failed.
+
+    Returns them as result records; a ``DeadlineExceeded`` among them is re-raised
+    afterwards, so the run stops as it would on the sync path.
+    """
+    records = []
+    for scenario, label, error in failures:
+        message = f"{type(error).__name__}: {error}"
+        print(f"  [failed] {scenario} / {label}: {message}", file=sys.stderr if json_mode else sys.stdout)
+        records.append({"scenario": scenario, "label": label, "error": message})
+    for _, _, error in failures:
+        if isinstance(error, DeadlineExceeded):
+            raise error
+    return records
+
+
+def print_call_summary(summary: dict) -> None:
+    """Print per-role latency / token / cost summary."""
+    roles = summary.get("roles", {})
+    if not roles:
+        return
+    print("\n  LLM Calls by Role")
+    rows = []
+    for role, r in roles.items():
+        rows.append((
+            role,
+            ", ".join(m.split(".")[-1][:28] for m in r["models"]),
+            r["calls"],
+            f"{r['avg_sec']:.1f}s",
+            f"{r['p95_sec']:.1f}s",
+            r["input_tokens"],
+            r["output_tokens"],
+            r.get("truncated", 0),
+            f"{r['budget_used']:.0%}" if r.get("budget_used") is not None else "-",
+            f"${r['cost_usd']:.4f}",
+        ))
+    total_cost = sum(r["cost_usd"] for r in roles.values())
+    rows.append(("TOTAL", "", sum(r["calls"] for r in roles.values()), "", "",
+                 sum(r["input_tokens"] for r in roles.values()),
+                 sum(r["output_tokens"] for r in roles.values()),
+                 sum(r.get("truncated", 0) for r in roles.values()), "", f"${total_cost:.4f}"))
+    print_table(["Role", "Model", "Calls", "Avg", "P95", "InTok", "OutTok", "Trunc", "Budget", "Cost"], rows)
+
+    counters = summary.get("counters", {})
+    if counters:
+        print("  " + ", ".join(f"{k}={v}" for k, v in sorted(counters.items())))
+
+
+def print_deadline_summary(report: dict) -> None:
+    """Print the time budget usage and what was skipped to meet it."""
+    skipped = report.get("skipped", [])
+    print(f"\n  Deadline: {report['budget_sec']:.0f}s budget, {report['elapsed_sec']:.1f}s used, "
+          f"{len(skipped)} degradation(s)")
+    counts = {}
+    for s in skipped:
+        counts[s["action"]] = counts.get(s["action"], 0) + 1
+    for action, n in counts.items():
+        print(f"   - {action}: {n}")
+
+
+def print_region_summary(report: dict) -> None:
+    """Print per-region call counts, latency and health for the region pool."""
+    print("\n  LLM Calls by Region")
+    rows = [
+        (region, r["weight"], r["calls"], r["errors"], r["throttles"], r["ejections"],
+         f"{r['p50_sec']:.1f}s", f"{r['p95_sec']:.1f}s", "ok" if r["healthy"] else "ejected")
+        for region, r in report.items()
+    ]
+    print_table(["Region", "Weight", "Calls", "Errors", "Throttled", "Ejected", "P50", "P95", "Health"], rows)
+
+
 class OutputCollector:
     """Collect results for JSON output and file saving."""
 
     def __init__(self):
         self.results = []
+        self.meta = {}
         self._current_pattern = None
+        # Identifies the run: the same in JSON output, the saved file and the results store
+        self.timestamp = datetime.now().isoformat()
 
-    def start_pattern(self, name: str, advanced: bool = False) -> None:
+    def set_meta(self, key: str, value) -> None:
+        """Attach run-level metadata (e.g. call stats) to the output."""
+        self.meta[key] = value
+
+    def start_pattern(self, name: str, advanced: bool = False, model_id: str = None) -> None:
+        """Open a pattern section (``model_id`` defaults to the active model)."""
+        if model_id is None:
+            from patterns.bedrock import get_model_id  # keeps the results tools free of the call layer
+
+            model_id = get_model_id()
         self._current_pattern = {
             "pattern": name,
             "advanced": advanced,
+            "model_id": model_id,
             "scenarios": [],
         }
         self.results.append(self._current_pattern)
 
     def add_result(self, scenario: str, label: str, input_text: str,
-                   output_text: str, elapsed: float = 0, metrics: dict = None) -> None:
+                   output_text: str, elapsed: float = 0, metrics: dict = None,
+                   extra: dict = None) -> None:
         if self._current_pattern is None:
             return
         entry = {
@@ -79,13 +168,19 @@ class OutputCollector:
         }
         if metrics:
             entry["metrics"] = metrics
+        if extra:
+            entry.update(extra)
         self._current_pattern["scenarios"].append(entry)
+        emit("result.add", pattern=self._current_pattern["pattern"],
+             advanced=self._current_pattern["advanced"],
+             model_id=self._current_pattern["model_id"], entry=entry)
 
     def to_dict(self, model_id: str) -> dict:
         return {
             "model_id": model_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self.timestamp,
             "patterns": self.results,
+            **self.meta,
         }
 
     def save(self, model_id: str, output_dir: str = "results") -> str:
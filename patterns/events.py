@@ -0,0 +1,47 @@
+"""In-process event hooks for observers (results store, progress display).
+
+Events emitted by the patterns:
+
+    run.start     model_id, choice, advanced, total (expected result entries, or None)
+    run.end       model_id, meta
+    result.add    pattern, advanced, model_id, entry
+    call.queued   call_id, role, model_id  (async: waiting for an in-flight slot)
+    call.start    call_id, role, model_id  (request sent; coalesced followers and cache hits skip it)
+    call.end      call_id, role, model_id, region, elapsed_sec, cpu_sec, retries, throttled, input_tokens,
+                  output_tokens, stop_reason, max_tokens, coalesced, cache_hit, prompt_hash
+                  (throttled: region attempts that were throttled and failed over; botocore's
+                  in-region retries are only in ``retries``, which also counts other errors)
+    call.error    call_id, role, model_id, error, throttled
+
+Listeners run synchronously on the emitting thread; a failing listener is
+reported on stderr and never breaks the run.
+"""
+
+import sys
+import threading
+from collections import defaultdict
+
+_listeners = defaultdict(list)
+_lock = threading.Lock()
+
+
+def subscribe(event: str, fn) -> None:
+    """Call ``fn(**payload)`` whenever ``event`` is emitted."""
+    with _lock:
+        _listeners[event].append(fn)
+
+
+def unsubscribe(event: str, fn) -> None:
+    with _lock:
+        if fn in _listeners[event]:
+            _listeners[event].remove(fn)
+
+
+def emit(event: str, **payload) -> None:
+    with _lock:
+        listeners = list(_listeners.get(event, ()))
+    for fn in listeners:
+        try:
+            fn(**payload)
+        except Exception as e:
+            print(f"  [events] {event} listener failed: {type(e).__name__}: {e}", file=sys.stderr)
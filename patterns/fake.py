@@ -0,0 +1,149 @@
+"""Fake bedrock-runtime client for offline runs and tests.
+
+Mimics ``client.converse(...)`` with configurable latency, latency outliers,
+throttling and errors. ``max_inflight`` models a concurrency quota: requests
+beyond it are throttled, as a real account limit would. Responses are canned
+but shaped like the real API, and critique / judge prompts get parseable JSON
+scores so every pattern runs end-to-end.
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+
+from patterns.backends import BaseBackend, client_error, response_events
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 3)
+
+
+class FakeBedrockClient(BaseBackend):
+    """Drop-in stand-in for a ``bedrock-runtime`` client (the ``fake`` backend)."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02,
+                 outlier_rate: float = 0.0, outlier_latency: float = 2.0,
+                 throttle_rate: float = 0.0, error_rate: float = 0.0,
+                 max_inflight: int = None, region: str = "fake-region", seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.outlier_rate = outlier_rate
+        self.outlier_latency = outlier_latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.max_inflight = max_inflight
+        self.region = region
+        self.calls = 0
+        self.inflight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _draw(self) -> tuple[float, float]:
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            if self._rng.random() < self.outlier_rate:
+                delay = self.outlier_latency
+        return roll, delay
+
+    def _admit(self) -> tuple[str, float]:
+        """Draw one call's fate: ``("throttle" | "error" | "ok", delay)``; "ok"/"error" hold a quota slot."""
+        roll, delay = self._draw()
+        with self._lock:
+            over_quota = self.max_inflight is not None and self.inflight >= self.max_inflight
+            if not over_quota:
+                self.inflight += 1
+        if over_quota or roll < self.throttle_rate:
+            if not over_quota:
+                self._release()
+            return "throttle", delay / 10
+        if roll < self.throttle_rate + self.error_rate:
+            return "error", delay / 10
+        return "ok", delay
+
+    def _release(self) -> None:
+        with self._lock:
+            self.inflight -= 1
+
+    def _outcome(self, outcome: str, delay: float, system: list, messages: list,
+                 inferenceConfig: dict = None) -> dict:
+        if outcome == "throttle":
+            raise client_error("ThrottlingException", "Rate exceeded (fake)", 429)
+        if outcome == "error":
+            raise client_error("InternalServerException", "Internal error (fake)", 500)
+
+        system_text = " ".join(block.get("text", "") for block in system)
+        user_text = messages[-1]["content"][0]["text"]
+        max_tokens = (inferenceConfig or {}).get("maxTokens", 1024)
+        text = fake_completion(system_text, user_text)
+        output_tokens = _estimate_tokens(text)
+        stop_reason = "end_turn"
+        stops = [i for i in (text.find(seq) for seq in (inferenceConfig or {}).get("stopSequences", ())) if i >= 0]
+        if stops:
+            text = text[:min(stops)]
+            output_tokens = _estimate_tokens(text)
+            stop_reason = "stop_sequence"
+        if output_tokens > max_tokens:
+            text = text[: max_tokens * 3]
+            output_tokens = max_tokens
+            stop_reason = "max_tokens"
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+            "stopReason": stop_reason,
+            "usage": {
+                "inputTokens": _estimate_tokens(system_text + user_text),
+                "outputTokens": output_tokens,
+            },
+            "metrics": {"latencyMs": int(delay * 1000)},
+            "ResponseMetadata": {"RetryAttempts": 0, "HTTPStatusCode": 200},
+        }
+
+    def converse(self, modelId: str, system: list, messages: list,
+                 inferenceConfig: dict = None, **kwargs) -> dict:
+        outcome, delay = self._admit()
+        try:
+            time.sleep(delay)
+        finally:
+            if outcome != "throttle":
+                self._release()
+        return self._outcome(outcome, delay, system, messages, inferenceConfig)
+
+    async def aconverse(self, modelId: str, system: list, messages: list,
+                        inferenceConfig: dict = None, **kwargs) -> dict:
+        outcome, delay = self._admit()
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            if outcome != "throttle":
+                self._release()
+        return self._outcome(outcome, delay, system, messages, inferenceConfig)
+
+    def converse_stream(self, **kwargs) -> dict:
+        """The full response re-chunked into word-sized deltas."""
+        response = self.converse(**kwargs)
+        events = response_events(response)
+        text = events[1]["contentBlockDelta"]["delta"]["text"]
+        deltas = [{"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": word}}}
+                  for word in re.findall(r"\S+\s*|\s+", text)]
+        return {"stream": [events[0], *deltas, *events[2:]]}
+
+
+def fake_completion(system: str, user: str) -> str:
+    """Canned completion: JSON scores for judge/critique prompts, echo text otherwise."""
+    if "semantic preservation" in user:
+        return json.dumps({"preservation": 5, "no_distortion": 4, "tone_shift": 5})
+    criteria_block = re.search(r"## Criteria\n([\s\S]*?)\n\n", user)
+    if criteria_block:
+        names = re.findall(r"^\s*\d+\.\s*(.+?)\s*\(1-5\)", criteria_block.group(1), re.MULTILINE)
+        seed = sum(map(ord, user)) % 3
+        return json.dumps(
+            {n: {"score": 3 + (i + seed) % 3, "feedback": f"Tighten the wording for {n}."}
+             for i, n in enumerate(names)},
+            ensure_ascii=False,
+        )
+    body = user.strip().splitlines()[-1] if user.strip() else ""
+    return f"[fake:{system[:40]}] {body[:400]}"
@@ -0,0 +1,177 @@
+"""Hedged requests: fire a duplicate call when the first one is slower than usual.
+
+If a call has not finished within the running latency percentile for its role
+(p95 by default, capped at ``max_ratio`` x the median so a few percent of
+outliers cannot push it out of reach), a second identical request is sent and
+whichever finishes first wins. The threshold is learned from primary requests
+only, timed from the moment they start running, so waiting for a free worker
+never counts as slowness. The loser cannot be cancelled mid-flight in boto3,
+so its result is discarded but its tokens and cost are still recorded (on the
+async path the losing task is cancelled and its usage is unknown). The share
+of calls that may be hedged is capped.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from patterns.stats import percentile, stats
+from patterns.tracing import current_span
+
+
+class Hedger:
+    """Run a zero-argument request callable with an adaptive hedge."""
+
+    def __init__(self, percentile: float = 95, min_samples: int = 10,
+                 initial_delay: float = None, min_delay: float = 0.05, max_ratio: float = 3.0,
+                 max_rate: float = 0.1, max_workers: int = 32, window: int = 200):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_ratio = max_ratio
+        self.max_rate = max_rate
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self.calls = 0
+        self.fired = 0
+        self.won = 0
+
+    def threshold(self, role: str) -> float | None:
+        """Hedge delay for a role, or None while there is not enough latency data."""
+        with self._lock:
+            samples = list(self._latencies[role])
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        delay = percentile(samples, self.percentile)
+        if self.max_ratio:
+            delay = min(delay, self.max_ratio * percentile(samples, 50))
+        return max(self.min_delay, delay)
+
+    def _record(self, role: str, elapsed: float) -> None:
+        with self._lock:
+            self._latencies[role].append(elapsed)
+
+    def _budget_allows(self) -> bool:
+        with self._lock:
+            return self.fired + 1 <= self.max_rate * self.calls
+
+    def _submit(self, request):
+        ctx = contextvars.copy_context()
+        return self._executor.submit(ctx.run, request)
+
+    def _timed(self, role: str, request, started: threading.Event = None):
+        """``request`` wrapped to sample the primary's own latency (and flag that it is running)."""
+        def primary():
+            if started is not None:
+                started.set()
+            t0 = time.monotonic()
+            response = request()
+            self._record(role, time.monotonic() - t0)
+            return response
+        return primary
+
+    @staticmethod
+    def _discarded(role: str, model_id: str, fut) -> None:
+        """Record the usage of a losing request once it completes."""
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        usage = fut.result().get("usage", {})
+        stats.record_discarded(role, model_id or "", usage.get("inputTokens", 0), usage.get("outputTokens", 0))
+
+    def _fire(self, delay: float) -> None:
+        with self._lock:
+            self.fired += 1
+        stats.incr("hedge_fired")
+        current_span().set_attributes(**{"hedge.fired": True, "hedge.delay_sec": round(delay, 3)})
+
+    def _won(self) -> None:
+        with self._lock:
+            self.won += 1
+        stats.incr("hedge_won")
+        current_span().set_attribute("hedge.won", True)
+
+    def run(self, role: str, request, model_id: str = None):
+        """Execute ``request()``, hedging it once if it exceeds the role's threshold.
+
+        ``model_id`` prices the discarded request's tokens.
+        """
+        with self._lock:
+            self.calls += 1
+        delay = self.threshold(role)
+        if delay is None:
+            return self._timed(role, request)()
+
+        started = threading.Event()
+        primary = self._submit(self._timed(role, request, started))
+        started.wait()  # the hedge clock starts when a worker picks the primary up
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._budget_allows():
+            return primary.result()
+
+        self._fire(delay)
+        hedge = self._submit(request)
+
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is None:
+                    if fut is hedge:
+                        self._won()
+                    loser = primary if fut is hedge else hedge
+                    loser.add_done_callback(functools.partial(self._discarded, role, model_id))
+                    return fut.result()
+                first_error = first_error or fut.exception()
+        raise first_error
+
+    async def _atimed(self, role: str, arequest):
+        t0 = time.monotonic()
+        response = await arequest()
+        self._record(role, time.monotonic() - t0)
+        return response
+
+    async def arun(self, role: str, arequest, model_id: str = None):
+        """Async ``run``: ``arequest`` is a coroutine function; the losing task is cancelled."""
+        with self._lock:
+            self.calls += 1
+        delay = self.threshold(role)
+        if delay is None:
+            return await self._atimed(role, arequest)
+
+        primary = asyncio.ensure_future(self._atimed(role, arequest))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._budget_allows():
+            return await primary
+
+        self._fire(delay)
+        hedge = asyncio.ensure_future(arequest())
+
+        pending = {primary, hedge}
+        first_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._won()
+                        loser = primary if task is hedge else hedge
+                        loser.add_done_callback(functools.partial(self._discarded, role, model_id))
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def report(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "fired": self.fired, "won": self.won,
+                    "rate": round(self.fired / self.calls, 3) if self.calls else 0.0}
@@ -0,0 +1,365 @@
+"""Load test: find the concurrency (or request rate) that maximizes throughput before throttling.
+
+Drives ``converse`` -- ``call_bedrock`` plus the usage metadata -- with the
+real prompt mix (basic-tier style transforms over the scenarios,
+advanced-tier persona answers and task drafts from the registry). Each step runs for a fixed
+duration at one concurrency level (closed loop) or target rate (open loop,
+latency measured from the scheduled send time) and records achieved
+throughput, latency percentiles, throttle / retry / error rates and
+tokens/sec. Rates are per logical request: a closed-loop worker re-sends a
+throttled request until it completes or the step ends, and those re-sends
+count as attempts of the same request, not as new ones. The steps form a capacity curve; the recommendation is the
+smallest level that reaches ``--knee`` of the best healthy throughput.
+
+Usage:
+    python3 -m patterns.loadtest --concurrency 1,2,4,8,16 --duration 30
+    python3 -m patterns.loadtest --rps 0.5,1,2,4 --duration 60 --save
+    python3 -m patterns.loadtest --backend fake --fake-max-inflight 6 --concurrency 1,2,4,8,12 --duration 5
+
+The backend comes from ``--backend`` or LLM_BACKEND (real Bedrock by default,
+model / region from the usual BEDROCK_MODEL_ID / BEDROCK_REGION); the fake
+backend takes its latency, quota and error rate from the ``--fake-*`` options. A step whose throttle rate exceeds
+``--stop-throttle-pct`` ends the test so the account quota is not hammered.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from patterns.backends import BACKENDS
+from patterns.bedrock import (
+    converse,
+    get_backend,
+    get_model_id,
+    set_backend,
+    set_client_factory,
+    set_model_id,
+)
+from patterns.budget import output_budget
+from patterns.display import print_table
+from patterns.regions import error_code, is_throttle
+from patterns.registry import (
+    persona_template,
+    personas,
+    prompt_template,
+    questions,
+    scenarios,
+    style_template,
+    styles,
+    tasks,
+)
+from patterns.stats import percentile
+from patterns.style_transfer import scenario_input
+
+CURVE_WIDTH = 40
+
+
+# ---------------------------------------------------------------------------
+# Prompt mix
+# ---------------------------------------------------------------------------
+def build_prompt_mix() -> list[dict]:
+    """Requests as the demo sends them: style transforms, persona answers, task drafts."""
+    prompts = []
+    for scenario in scenarios.items().values():
+        text = scenario_input(scenario)
+        for style_key in styles.keys(("basic",)):
+            p = style_template(style_key).render(text=text)
+            prompts.append({
+                "kind": "style", "role": "generate", "system": p.system, "user": p.user,
+                "max_tokens": output_budget(p.system, source_text=text), "prompt_hash": p.content_hash,
+            })
+    for question in questions.items().values():
+        for persona_key in personas.keys(("advanced",)):
+            p = persona_template(persona_key).render(question=question["text_ko"])
+            prompts.append({
+                "kind": "persona", "role": "persona", "system": p.system, "user": p.user,
+                "max_tokens": output_budget(p.system), "prompt_hash": p.content_hash,
+            })
+    for task in tasks.items().values():
+        text = task.get("task_ko", task.get("task", ""))
+        p = prompt_template("draft", system=task.get("role_ko", task.get("role", ""))).render(task=text)
+        prompts.append({
+            "kind": "task", "role": "generate", "system": p.system, "user": p.user,
+            "max_tokens": output_budget(text), "prompt_hash": p.content_hash,
+        })
+    return prompts
+
+
+class PromptCycle:
+    """Thread-safe round-robin over the prompt mix."""
+
+    def __init__(self, prompts: list):
+        self._it = itertools.cycle(prompts)
+        self._lock = threading.Lock()
+
+    def next(self) -> dict:
+        with self._lock:
+            return next(self._it)
+
+
+def call_once(prompt: dict, sent_at: float = None) -> dict:
+    """One request; returns a sample with outcome, latency and token counts."""
+    sent_at = time.monotonic() if sent_at is None else sent_at
+    try:
+        r = converse(prompt["system"], prompt["user"], max_tokens=prompt["max_tokens"],
+                     role=prompt["role"], span_attrs={"step": "loadtest", "kind": prompt["kind"]},
+                     coalesce=False, prompt_hash=prompt["prompt_hash"])
+    except Exception as e:
+        outcome = "throttled" if is_throttle(e) else "error"
+        return {"outcome": outcome, "latency": time.monotonic() - sent_at,
+                "error": error_code(e) or type(e).__name__, "retries": 0, "attempts": 1,
+                "throttles": int(outcome == "throttled"), "input_tokens": 0, "output_tokens": 0,
+                "end": time.monotonic()}
+    return {"outcome": "ok", "latency": time.monotonic() - sent_at, "retries": r["retries"],
+            "attempts": 1, "throttles": 0, "input_tokens": r["input_tokens"],
+            "output_tokens": r["output_tokens"], "end": time.monotonic()}
+
+
+def call_until_done(prompt: dict, stop_at: float) -> dict:
+    """One logical request: re-send while throttled and the step has time left."""
+    sent_at = time.monotonic()
+    sample = call_once(prompt, sent_at)
+    attempts, throttles = 1, sample["throttles"]
+    while sample["outcome"] == "throttled" and time.monotonic() < stop_at:
+        sample = call_once(prompt, sent_at)
+        attempts += 1
+        throttles += sample["throttles"]
+    return {**sample, "attempts": attempts, "throttles": throttles}
+
+
+# ---------------------------------------------------------------------------
+# Steps
+# ---------------------------------------------------------------------------
+def run_closed_step(prompts: PromptCycle, concurrency: int, duration: float) -> tuple[list, float]:
+    """``concurrency`` workers send back-to-back for ``duration`` seconds."""
+    samples, lock = [], threading.Lock()
+    start = time.monotonic()
+    stop_at = start + duration
+
+    def worker():
+        while time.monotonic() < stop_at:
+            sample = call_until_done(prompts.next(), stop_at)
+            with lock:
+                samples.append(sample)
+
+    threads = [threading.Thread(target=worker, name=f"load-{i}") for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, max([s["end"] for s in samples] + [stop_at]) - start
+
+
+def run_open_step(prompts: PromptCycle, rps: float, duration: float,
+                  max_workers: int = 64) -> tuple[list, float]:
+    """Send at a fixed rate regardless of completions (queueing shows up as latency)."""
+    start = time.monotonic()
+    n = max(1, int(rps * duration))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load") as pool:
+        futures = []
+        for i in range(n):
+            sent_at = start + i / rps
+            delay = sent_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(call_once, prompts.next(), sent_at))
+        samples = [f.result() for f in futures]
+    return samples, max([s["end"] for s in samples] + [start + duration]) - start
+
+
+def summarize_step(mode: str, level: float, samples: list, elapsed: float) -> dict:
+    """Step summary; rates are per logical request (``attempts`` counts the re-sends)."""
+    ok = [s for s in samples if s["outcome"] == "ok"]
+    latencies = [s["latency"] for s in ok]
+    requests = len(samples) or 1
+    attempts = sum(s["attempts"] for s in samples)
+    throttled = sum(1 for s in samples if s["throttles"])
+    errors = sum(1 for s in samples if s["outcome"] == "error")
+    retried = sum(1 for s in ok if s["retries"])
+    return {
+        "mode": mode,
+        "level": level,
+        "requests": len(samples),
+        "attempts": attempts,
+        "ok": len(ok),
+        "elapsed_sec": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "p50_sec": round(percentile(latencies, 50), 3),
+        "p90_sec": round(percentile(latencies, 90), 3),
+        "p99_sec": round(percentile(latencies, 99), 3),
+        "throttle_pct": round(100 * throttled / requests, 1),
+        "throttled_attempts_pct": round(100 * sum(s["throttles"] for s in samples) / (attempts or 1), 1),
+        "retried_pct": round(100 * retried / requests, 1),
+        "error_pct": round(100 * errors / requests, 1),
+        "input_tokens_per_sec": round(sum(s["input_tokens"] for s in ok) / elapsed, 1) if elapsed else 0.0,
+        "output_tokens_per_sec": round(sum(s["output_tokens"] for s in ok) / elapsed, 1) if elapsed else 0.0,
+        "errors": sorted({s["error"] for s in samples if "error" in s}),
+    }
+
+
+def recommend(steps: list, max_throttle_pct: float = 1.0, max_error_pct: float = 1.0,
+              max_p90_sec: float = None, knee: float = 0.9) -> dict:
+    """Smallest healthy level within ``knee`` of the best healthy throughput.
+
+    Healthy: throttled + retried requests and errors stay under their limits,
+    and p90 latency under ``max_p90_sec`` when given.
+    """
+    healthy = [
+        s for s in steps
+        if s["ok"] and s["throttle_pct"] + s["retried_pct"] <= max_throttle_pct
+        and s["error_pct"] <= max_error_pct
+        and (max_p90_sec is None or s["p90_sec"] <= max_p90_sec)
+    ]
+    if not healthy:
+        lowest = min(steps, key=lambda s: s["level"]) if steps else None
+        return {"level": lowest["level"] if lowest else None, "healthy": False,
+                "reason": "no step met the throttle/error/latency limits; start lower"}
+    best = max(healthy, key=lambda s: s["throughput_rps"])
+    chosen = min((s for s in healthy if s["throughput_rps"] >= knee * best["throughput_rps"]),
+                 key=lambda s: s["level"])
+    return {
+        "level": chosen["level"],
+        "healthy": True,
+        "throughput_rps": chosen["throughput_rps"],
+        "p90_sec": chosen["p90_sec"],
+        "best_level": best["level"],
+        "best_throughput_rps": best["throughput_rps"],
+        "reason": f"smallest level within {int(knee * 100)}% of the best healthy throughput",
+    }
+
+
+def run_load_test(levels: list, mode: str = "concurrency", duration: float = 30.0,
+                  pause: float = 2.0, stop_throttle_pct: float = 25.0, max_workers: int = 64,
+                  verbose: bool = True) -> list[dict]:
+    """Run one step per level (ascending) and return the step summaries."""
+    prompts = PromptCycle(build_prompt_mix())
+    steps = []
+    for i, level in enumerate(sorted(levels)):
+        if i and pause:
+            time.sleep(pause)
+        if mode == "concurrency":
+            samples, elapsed = run_closed_step(prompts, int(level), duration)
+        else:
+            samples, elapsed = run_open_step(prompts, level, duration, max_workers)
+        step = summarize_step(mode, level, samples, elapsed)
+        steps.append(step)
+        if verbose:
+            print(f"  {mode} {level:>6}: {step['throughput_rps']:.2f} req/s, p90 {step['p90_sec']:.2f}s, "
+                  f"throttled {step['throttle_pct']}% of requests, errors {step['error_pct']}%", file=sys.stderr)
+        if step["throttle_pct"] > stop_throttle_pct:
+            if verbose:
+                print(f"  Stopping: throttle rate above {stop_throttle_pct}%", file=sys.stderr)
+            break
+    return steps
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+def print_report(steps: list, rec: dict) -> None:
+    mode = steps[0]["mode"] if steps else "concurrency"
+    print(f"\n  Load test ({get_model_id()})\n")
+    print_table(
+        [mode, "Requests", "Attempts", "OK", "req/s", "p50", "p90", "p99", "Throttled req%", "Retried%",
+         "Error%", "in tok/s", "out tok/s"],
+        [[s["level"], s["requests"], s["attempts"], s["ok"], f"{s['throughput_rps']:.2f}", f"{s['p50_sec']:.2f}s",
+          f"{s['p90_sec']:.2f}s", f"{s['p99_sec']:.2f}s", s["throttle_pct"], s["retried_pct"],
+          s["error_pct"], s["input_tokens_per_sec"], s["output_tokens_per_sec"]] for s in steps],
+    )
+
+    print("\n  Capacity curve (req/s)\n")
+    top = max((s["throughput_rps"] for s in steps), default=0) or 1
+    for s in steps:
+        bar = "#" * round(CURVE_WIDTH * s["throughput_rps"] / top)
+        mark = " <- recommended" if s["level"] == rec.get("level") and rec.get("healthy") else ""
+        throttle = f" (throttled {s['throttle_pct']}% of requests)" if s["throttle_pct"] else ""
+        print(f"  {s['level']:>8} | {bar:<{CURVE_WIDTH}} {s['throughput_rps']:.2f}{throttle}{mark}")
+
+    if rec.get("healthy"):
+        print(f"\n  Recommended {mode}: {rec['level']} "
+              f"({rec['throughput_rps']:.2f} req/s, p90 {rec['p90_sec']:.2f}s; "
+              f"best {rec['best_throughput_rps']:.2f} req/s at {rec['best_level']}) -- {rec['reason']}")
+    else:
+        print(f"\n  No recommendation: {rec['reason']}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Step through load levels and find the best concurrency")
+    levels = parser.add_mutually_exclusive_group()
+    levels.add_argument("--concurrency", default=None, metavar="N,N,...",
+                        help="Closed-loop concurrency levels (default: 1,2,4,8,16)")
+    levels.add_argument("--rps", default=None, metavar="R,R,...", help="Open-loop target request rates")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per step (default: 30)")
+    parser.add_argument("--pause", type=float, default=2.0, help="Seconds between steps (default: 2)")
+    parser.add_argument("--max-throttle-pct", type=float, default=1.0,
+                        help="Healthy step: throttled + retried requests at most this percent (default: 1)")
+    parser.add_argument("--max-error-pct", type=float, default=1.0,
+                        help="Healthy step: errors at most this percent (default: 1)")
+    parser.add_argument("--max-p90", type=float, default=None, metavar="SEC",
+                        help="Healthy step: p90 latency at most SEC")
+    parser.add_argument("--knee", type=float, default=0.9,
+                        help="Recommend the smallest level reaching this share of the best throughput (default: 0.9)")
+    parser.add_argument("--stop-throttle-pct", type=float, default=25.0,
+                        help="Stop stepping once a step is throttled above this percent (default: 25)")
+    parser.add_argument("--max-workers", type=int, default=64, help="Thread cap for --rps steps (default: 64)")
+    parser.add_argument("--model", default=None, help="Model ID (default: BEDROCK_MODEL_ID)")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="LLM backend: bedrock, openai or fake (default: LLM_BACKEND or bedrock)")
+    parser.add_argument("--fake-latency", type=float, default=0.5, help="Fake call latency in seconds (default: 0.5)")
+    parser.add_argument("--fake-max-inflight", type=int, default=8,
+                        help="Fake concurrency quota; requests beyond it are throttled (default: 8)")
+    parser.add_argument("--fake-error-rate", type=float, default=0.0, help="Fake server error rate (default: 0)")
+    parser.add_argument("--output", choices=["text", "json"], default="text", help="Output format")
+    parser.add_argument("--save", action="store_true", help="Save the curve to results/loadtest_<ts>.json")
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.model:
+        set_model_id(args.model)
+    if args.backend:
+        set_backend(args.backend)
+    if get_backend() == "fake":
+        from patterns.fake import FakeBedrockClient
+        fake = FakeBedrockClient(latency=args.fake_latency, jitter=args.fake_latency / 5,
+                                 error_rate=args.fake_error_rate, max_inflight=args.fake_max_inflight)
+        set_client_factory(lambda region: fake)
+
+    mode = "rps" if args.rps else "concurrency"
+    raw = args.rps or args.concurrency or "1,2,4,8,16"
+    levels = [float(v) if mode == "rps" else int(v) for v in raw.split(",") if v.strip()]
+
+    steps = run_load_test(levels, mode, args.duration, args.pause, args.stop_throttle_pct,
+                          args.max_workers)
+    rec = recommend(steps, args.max_throttle_pct, args.max_error_pct, args.max_p90, args.knee)
+    output = {
+        "timestamp": datetime.now().isoformat(),
+        "model_id": get_model_id(),
+        "backend": get_backend(),
+        "mode": mode,
+        "duration_sec": args.duration,
+        "steps": steps,
+        "recommendation": rec,
+    }
+
+    if args.output == "json":
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    else:
+        print_report(steps, rec)
+    if args.save:
+        os.makedirs("results", exist_ok=True)
+        path = os.path.join("results", f"loadtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+        print(f"\n  Curve saved: {path}", file=sys.stderr if args.output == "json" else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,8 @@
 import json
 import re
 
-from patterns.bedrock import call_bedrock
+from patterns.bedrock import converse
+from patterns.registry import prompt_template
 
 
 def count_chars(text: str) -> int:
@@ -19,29 +20,30 @@ def avg_sentence_len(text: str) -> float:
     return round(sum(len(s.split()) for s in sentences) / len(sentences), 1)
 
 
-def evaluate_preservation(original: str, transformed: str) -> dict:
-    """Evaluate semantic preservation between original and transformed text using LLM."""
-    prompt = f"""Evaluate semantic preservation between original and transformed text.
-
-## Original
-{original}
-
-## Transformed
-{transformed}
-
-## Criteria
-- preservation (1-5): Are all key facts from the original preserved?
-- no_distortion (1-5): Is the original meaning undistorted? (5=no distortion)
-- tone_shift (1-5): Is the tone/style clearly transformed?
-
-Output JSON only: {{"preservation": N, "no_distortion": N, "tone_shift": N}}"""
-
-    result = call_bedrock(
-        "You are a text quality evaluator. Output JSON only.",
-        prompt,
-        max_tokens=200,
-        temperature=0.2,
-    )
+def preservation_request(original: str, transformed: str, span_attrs: dict = None) -> dict:
+    """``converse`` kwargs for the LLM-as-Judge preservation check."""
+    prompt = prompt_template("judge-preservation").render(original=original, transformed=transformed)
+
+    # The scores object is flat, so generation can stop at its closing brace
+    return {
+        "system": prompt.system,
+        "user": prompt.user,
+        "max_tokens": 200,
+        "temperature": 0.2,
+        "role": "judge",
+        "span_attrs": {"step": "judge", **(span_attrs or {})},
+        "stop_sequences": ["}"],
+        "prompt_hash": prompt.content_hash,
+    }
+
+
+def parse_preservation(response: dict) -> dict:
+    """Scores from a judge response (empty dict when unparseable)."""
+    result = response["text"]
+    # Generation stops at "}" and the stop string is not returned; some servers report
+    # that as a plain "end_turn", so close any unmatched brace regardless of stop reason
+    if result.count("{") > result.count("}"):
+        result += "}"
     try:
         match = re.search(r'\{[^}]+\}', result)
         return json.loads(match.group()) if match else {}
@@ -49,8 +51,13 @@ Output JSON only: {{"preservation": N, "no_distortion": N, "tone_shift": N}}"""
         return {}
 
 
-def parse_critique_scores(critique_text: str) -> dict:
-    """Extract scores from Self-Critique JSON."""
+def evaluate_preservation(original: str, transformed: str, span_attrs: dict = None) -> dict:
+    """Evaluate semantic preservation between original and transformed text using LLM."""
+    return parse_preservation(converse(**preservation_request(original, transformed, span_attrs)))
+
+
+def parse_critique(critique_text: str) -> dict:
+    """Extract ``{criterion: {"score": N, "feedback": "..."}}`` from Self-Critique JSON."""
     # Strip markdown code block if present
     text = critique_text.strip()
     text = re.sub(r'^```(?:json)?\s*', '', text)
@@ -61,14 +68,24 @@ def parse_critique_scores(critique_text: str) -> dict:
         match = re.search(r'\{[\s\S]*\}', text)
         if match:
             data = json.loads(match.group())
-            scores = {k: v.get("score", 0) for k, v in data.items() if isinstance(v, dict) and "score" in v}
-            if scores:
-                return scores
+            detail = {
+                k: {"score": v.get("score", 0), "feedback": v.get("feedback", "")}
+                for k, v in data.items() if isinstance(v, dict) and "score" in v
+            }
+            if detail:
+                return detail
     except (json.JSONDecodeError, AttributeError):
         pass
 
-    # Fallback: extract individual "key": {"score": N} patterns
-    scores = {}
-    for m in re.finditer(r'"([^"]+)"\s*:\s*\{\s*"score"\s*:\s*(\d+)', text):
-        scores[m.group(1)] = int(m.group(2))
-    return scores
+    # Fallback: extract individual "key": {"score": N, "feedback": "..."} patterns
+    detail = {}
+    for m in re.finditer(
+        r'"([^"]+)"\s*:\s*\{\s*"score"\s*:\s*(\d+)(?:\s*,\s*"feedback"\s*:\s*"((?:[^"\\]|\\.)*)")?', text
+    ):
+        detail[m.group(1)] = {"score": int(m.group(2)), "feedback": m.group(3) or ""}
+    return detail
+
+
+def parse_critique_scores(critique_text: str) -> dict:
+    """Extract scores from Self-Critique JSON."""
+    return {k: v["score"] for k, v in parse_critique(critique_text).items()}
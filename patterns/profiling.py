@@ -0,0 +1,165 @@
+"""Profiling mode: where does a run's time go -- Bedrock wait or local CPU?
+
+Three views are captured together:
+
+- cProfile of the main thread (regex parsing, JSON serialization, printing ...)
+- a wall-clock sampling profiler over all threads, written as collapsed stacks
+  (``flamegraph.pl`` / speedscope / inferno compatible)
+- per-call wall / CPU / wait from the ``call.end`` events, plus the union of
+  LLM call intervals, so the run summary can state the local overhead share
+
+Files written to ``results/``: ``profile_<ts>.txt`` (report), ``.prof`` (pstats,
+e.g. for snakeviz) and ``.folded`` (collapsed stacks).
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from patterns.events import subscribe, unsubscribe
+
+
+class StackSampler:
+    """Background thread sampling every thread's stack at a fixed interval."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = defaultdict(int)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(self.samples.items()))
+
+
+def _union_seconds(intervals: list) -> float:
+    """Total length covered by possibly overlapping (start, end) intervals."""
+    total, cur_start, cur_end = 0.0, None, None
+    for start, end in sorted(intervals):
+        if cur_end is None or start > cur_end:
+            if cur_end is not None:
+                total += cur_end - cur_start
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    if cur_end is not None:
+        total += cur_end - cur_start
+    return total
+
+
+class RunProfiler:
+    """cProfile + stack sampler + per-call wall/CPU/wait accounting for one run."""
+
+    def __init__(self, output_dir: str = "results", sample_interval: float = 0.005):
+        self.output_dir = output_dir
+        self.sampler = StackSampler(sample_interval)
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._calls = defaultdict(lambda: {"calls": 0, "wall": 0.0, "cpu": 0.0, "retries": 0})
+        self._intervals = []
+        self.wall = self.cpu = 0.0
+
+    def _on_call(self, role: str, elapsed_sec: float, cpu_sec: float = 0.0, retries: int = 0,
+                 cache_hit: bool = False, **_) -> None:
+        if cache_hit:
+            return
+        end = time.monotonic()
+        with self._lock:
+            c = self._calls[role]
+            c["calls"] += 1
+            c["wall"] += elapsed_sec
+            c["cpu"] += cpu_sec
+            c["retries"] += retries
+            self._intervals.append((end - elapsed_sec, end))
+
+    def start(self) -> None:
+        subscribe("call.end", self._on_call)
+        self._wall_start = time.monotonic()
+        self._cpu_start = time.process_time()
+        self.sampler.start()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+        self.sampler.stop()
+        self.wall = time.monotonic() - self._wall_start
+        self.cpu = time.process_time() - self._cpu_start
+        unsubscribe("call.end", self._on_call)
+
+    def report(self) -> dict:
+        with self._lock:
+            calls = {role: dict(c) for role, c in self._calls.items()}
+            llm_wait = _union_seconds(self._intervals)
+        per_role = {
+            role: {"calls": c["calls"], "wall_sec": round(c["wall"], 3), "cpu_sec": round(c["cpu"], 3),
+                   "wait_sec": round(max(0.0, c["wall"] - c["cpu"]), 3), "retries": c["retries"]}
+            for role, c in calls.items()
+        }
+        local = max(0.0, self.wall - llm_wait)
+        return {
+            "wall_sec": round(self.wall, 3),
+            "process_cpu_sec": round(self.cpu, 3),
+            "llm_wait_sec": round(llm_wait, 3),
+            "local_sec": round(local, 3),
+            "local_overhead_pct": round(100 * local / self.wall, 1) if self.wall else 0.0,
+            "calls": per_role,
+        }
+
+    def top_functions(self, limit: int = 30) -> str:
+        buf = io.StringIO()
+        pstats.Stats(self._profile, stream=buf).sort_stats("cumulative").print_stats(limit)
+        return buf.getvalue()
+
+    def write(self) -> dict:
+        """Write the text report, pstats dump and collapsed stacks; returns their paths."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        paths = {"report": base + ".txt", "pstats": base + ".prof", "folded": base + ".folded"}
+        self._profile.dump_stats(paths["pstats"])
+        with open(paths["folded"], "w", encoding="utf-8") as f:
+            f.write(self.sampler.collapsed())
+
+        r = self.report()
+        lines = [
+            f"wall {r['wall_sec']}s | process CPU {r['process_cpu_sec']}s | "
+            f"LLM wait {r['llm_wait_sec']}s | local {r['local_sec']}s ({r['local_overhead_pct']}%)",
+            "",
+            f"{'role':<10} {'calls':>6} {'wall':>9} {'cpu':>8} {'wait':>9} {'retries':>8}",
+        ]
+        for role, c in r["calls"].items():
+            lines.append(f"{role:<10} {c['calls']:>6} {c['wall_sec']:>8.2f}s {c['cpu_sec']:>7.3f}s "
+                         f"{c['wait_sec']:>8.2f}s {c['retries']:>8}")
+        lines += ["", "cProfile (main thread, cumulative):", self.top_functions()]
+        with open(paths["report"], "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        return paths
@@ -0,0 +1,235 @@
+"""Live progress / throughput status for long runs, driven by call-layer events.
+
+The dashboard subscribes to ``run.start``, ``call.queued``, ``call.start``,
+``call.end``, ``call.error``, ``result.add`` and ``run.end``; nothing polls.
+It shows result entries done (of the expected total), calls completed / in
+flight / queued, and calls/sec, tokens/sec, p95 latency and the throttle rate
+over a rolling window. It also shows an ETA from the result rate. A call counts
+as throttled when it failed with a throttle or failed over from a throttled
+region (``call.end`` ``throttled``); generic retries are not throttles.
+
+On a terminal the status line is redrawn in place on stderr (at most every
+``refresh`` seconds). While stdout is the same terminal, stdout writes clear
+the line first, so the demo output scrolls above it. When stderr is not a TTY
+(CI, ``nohup``, redirected logs) a plain log line is written at most every
+``interval`` seconds instead, plus a final one at ``run.end``::
+
+    [progress] 42/120 results  calls 97 done, 8 in flight, 24 queued  1.9 calls/s
+    1,240 tok/s  p95 6.2s  throttled 3.1%  elapsed 3m02s  ETA 5m38s
+"""
+
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+
+from patterns.events import subscribe, unsubscribe
+from patterns.stats import percentile
+
+
+def _duration(sec: float) -> str:
+    sec = int(sec)
+    if sec >= 3600:
+        return f"{sec // 3600}h{sec % 3600 // 60:02d}m"
+    if sec >= 60:
+        return f"{sec // 60}m{sec % 60:02d}s"
+    return f"{sec}s"
+
+
+class _StdoutProxy:
+    """Clears the status line before stdout output and redraws it after each complete line."""
+
+    def __init__(self, target, dashboard: "ProgressDashboard"):
+        self._target = target
+        self._dashboard = dashboard
+
+    def write(self, text: str) -> int:
+        with self._dashboard._lock:
+            self._dashboard._clear()
+            n = self._target.write(text)
+            # Redrawing mid-line would erase the partial line, so wait for its newline
+            self._dashboard._hold = not text.endswith("\n")
+            if not self._dashboard._hold:
+                self._target.flush()
+                self._dashboard._draw(time.monotonic())
+            return n
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class ProgressDashboard:
+    """Event-driven status line (TTY) or periodic log lines (non-TTY) for a run."""
+
+    def __init__(self, stream=None, refresh: float = 0.2, interval: float = 30.0,
+                 window: float = 60.0, latency_window: int = 200):
+        self.stream = stream or sys.stderr
+        self.tty = self.stream.isatty()
+        self.refresh = refresh
+        self.interval = interval
+        self.window = window
+        self._lock = threading.RLock()
+        self._latencies = deque(maxlen=latency_window)
+        self._recent = deque()  # (t, tokens, throttled) per finished call in the window
+        self._calls = {}  # call_id -> "queued" | "sending"
+        self._drawn = self._hold = False
+        self._stdout = None
+        self._handlers = {
+            "run.start": self._on_run_start,
+            "call.queued": self._on_queued,
+            "call.start": self._on_start,
+            "call.end": self._on_end,
+            "call.error": self._on_error,
+            "result.add": self._on_result,
+            "run.end": self._on_run_end,
+        }
+        self._reset(None)
+
+    def _reset(self, total: int | None) -> None:
+        self.total = total
+        self.results = self.completed = self.errors = 0
+        self.started = time.monotonic()
+        self._last_out = 0.0
+        self._latencies.clear()
+        self._recent.clear()
+        self._calls.clear()
+
+    # -- lifecycle ----------------------------------------------------------
+    def attach(self) -> "ProgressDashboard":
+        for event, fn in self._handlers.items():
+            subscribe(event, fn)
+        if self.tty and sys.stdout.isatty():
+            self._stdout = sys.stdout
+            sys.stdout = _StdoutProxy(sys.stdout, self)
+        return self
+
+    def detach(self) -> None:
+        for event, fn in self._handlers.items():
+            unsubscribe(event, fn)
+        with self._lock:
+            if self._stdout is not None:
+                sys.stdout = self._stdout
+                self._stdout = None
+            if self._drawn:
+                self.stream.write("\n")
+                self.stream.flush()
+                self._drawn = False
+
+    # -- event handlers -----------------------------------------------------
+    def _on_run_start(self, total: int = None, **_) -> None:
+        with self._lock:
+            self._reset(total)
+            self._update(force=True)
+
+    def _on_queued(self, call_id: int, **_) -> None:
+        with self._lock:
+            self._calls[call_id] = "queued"
+            self._update()
+
+    def _on_start(self, call_id: int, **_) -> None:
+        with self._lock:
+            self._calls[call_id] = "sending"
+            self._update()
+
+    def _on_end(self, call_id: int = None, elapsed_sec: float = 0.0, input_tokens: int = 0,
+                output_tokens: int = 0, throttled: int = 0, coalesced: bool = False,
+                cache_hit: bool = False, **_) -> None:
+        with self._lock:
+            self._calls.pop(call_id, None)
+            self.completed += 1
+            if not (coalesced or cache_hit):
+                # Shared / cached results made no request of their own
+                self._recent.append((time.monotonic(), input_tokens + output_tokens, throttled > 0))
+                self._latencies.append(elapsed_sec)
+            self._update()
+
+    def _on_error(self, call_id: int = None, throttled: bool = False, **_) -> None:
+        with self._lock:
+            if self._calls.pop(call_id, None) is None:
+                return  # a coalesced follower sharing its leader's failure
+            self.errors += 1
+            self._recent.append((time.monotonic(), 0, throttled))
+            self._update()
+
+    def _on_result(self, **_) -> None:
+        with self._lock:
+            self.results += 1
+            self._update()
+
+    def _on_run_end(self, **_) -> None:
+        with self._lock:
+            self._update(force=True)
+
+    # -- rendering ----------------------------------------------------------
+    def snapshot(self) -> dict:
+        """Current counters and rolling-window rates."""
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0][0] > self.window:
+                self._recent.popleft()
+            elapsed = now - self.started
+            span = max(1e-9, min(self.window, elapsed))
+            finished = len(self._recent)
+            queued = sum(1 for state in self._calls.values() if state == "queued")
+            eta = None
+            if self.total and self.results:
+                eta = max(0, self.total - self.results) * elapsed / self.results
+            return {
+                "results": self.results,
+                "total": self.total,
+                "completed": self.completed,
+                "errors": self.errors,
+                "in_flight": len(self._calls) - queued,
+                "queued": queued,
+                "calls_per_sec": round(finished / span, 2),
+                "tokens_per_sec": round(sum(t for _, t, _ in self._recent) / span, 1),
+                "p95_sec": round(percentile(self._latencies, 95), 2),
+                "throttle_pct": round(100 * sum(1 for *_, th in self._recent if th) / finished, 1)
+                if finished else 0.0,
+                "elapsed_sec": round(elapsed, 1),
+                "eta_sec": round(eta, 1) if eta is not None else None,
+            }
+
+    def format(self, snap: dict = None) -> str:
+        s = snap or self.snapshot()
+        results = f"{s['results']}/{s['total']}" if s["total"] else str(s["results"])
+        parts = [
+            f"[progress] {results} results",
+            f"calls {s['completed']} done, {s['in_flight']} in flight, {s['queued']} queued"
+            + (f", {s['errors']} failed" if s["errors"] else ""),
+            f"{s['calls_per_sec']:.1f} calls/s",
+            f"{s['tokens_per_sec']:,.0f} tok/s",
+            f"p95 {s['p95_sec']:.1f}s",
+            f"throttled {s['throttle_pct']:.1f}%",
+            f"elapsed {_duration(s['elapsed_sec'])}",
+        ]
+        if s["eta_sec"] is not None:
+            parts.append(f"ETA {_duration(s['eta_sec'])}")
+        return "  ".join(parts)
+
+    def _update(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_out < (self.refresh if self.tty else self.interval):
+            return
+        if self.tty:
+            self._draw(now)
+        else:
+            self.stream.write(self.format() + "\n")
+            self.stream.flush()
+            self._last_out = now
+
+    def _draw(self, now: float) -> None:
+        if self._hold:
+            return
+        width = shutil.get_terminal_size().columns - 1
+        self.stream.write("\r\x1b[K" + self.format()[:width])
+        self.stream.flush()
+        self._drawn = True
+        self._last_out = now
+
+    def _clear(self) -> None:
+        if self._drawn:
+            self.stream.write("\r\x1b[K")
+            self.stream.flush()
+            self._drawn = False
@@ -0,0 +1,228 @@
+"""Multi-region client pool: load spreading, health tracking and failover.
+
+Calls go to the healthy region with the fewest outstanding requests relative to
+its weight. Throttled regions are ejected for a cool-down (doubling on repeated
+throttles); regions with several consecutive errors are ejected too. A failed
+call is retried once on each remaining region. Once every region has failed
+(a shared quota throttles them all), the pool backs off exponentially with
+jitter and tries another round, up to ``rounds`` in all, as botocore's own
+in-region retries would have; a backoff that no longer fits the deadline
+raises the last error instead.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+
+from patterns.backends import (
+    BotoCoreError,
+    ClientError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+from patterns.deadline import MIN_CALL_TIMEOUT, get_deadline
+from patterns.stats import percentile
+from patterns.tracing import current_span
+
+THROTTLE_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException"}
+RETRYABLE_CODES = THROTTLE_CODES | {
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+}
+
+
+def error_code(error: Exception) -> str | None:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code")
+    return None
+
+
+def is_throttle(error: Exception) -> bool:
+    return error_code(error) in THROTTLE_CODES
+
+
+def is_retryable(error: Exception) -> bool:
+    """Errors worth retrying in another region (throttles, 5xx, network)."""
+    if isinstance(error, ClientError):
+        return error_code(error) in RETRYABLE_CODES
+    return isinstance(error, (EndpointConnectionError, ConnectTimeoutError, ReadTimeoutError, BotoCoreError))
+
+
+def parse_regions(value: str) -> tuple[list, dict]:
+    """Parse ``"us-west-2:2,us-east-1"`` into (regions, weights)."""
+    regions, weights = [], {}
+    for item in value.split(","):
+        name, _, weight = item.strip().partition(":")
+        if not name:
+            continue
+        regions.append(name)
+        weights[name] = float(weight) if weight else 1.0
+    return regions, weights
+
+
+class RegionState:
+    def __init__(self, name: str, weight: float = 1.0, window: int = 200):
+        self.name = name
+        self.weight = weight
+        self.outstanding = 0
+        self.calls = 0
+        self.errors = 0
+        self.throttles = 0
+        self.consecutive_failures = 0
+        self.consecutive_throttles = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.latency = deque(maxlen=window)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class RegionPool:
+    """Weighted least-outstanding-requests router over several regions."""
+
+    def __init__(self, regions: list, weights: dict = None, eject_sec: float = 10.0,
+                 max_eject_sec: float = 120.0, max_failures: int = 3, rounds: int = 3,
+                 backoff: float = 1.0, max_backoff: float = 20.0):
+        if not regions:
+            raise ValueError("RegionPool needs at least one region")
+        weights = weights or {}
+        self.regions = {r: RegionState(r, weights.get(r, 1.0)) for r in regions}
+        self.eject_sec = eject_sec
+        self.max_eject_sec = max_eject_sec
+        self.max_failures = max_failures
+        self.rounds = max(1, rounds)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+
+    def pick(self, exclude=()) -> str | None:
+        """Choose a region and reserve an outstanding slot on it."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [s for s in self.regions.values() if s.name not in exclude]
+            if not candidates:
+                return None
+            healthy = [s for s in candidates if s.healthy(now)]
+            if healthy:
+                best = min(healthy, key=lambda s: ((s.outstanding + 1) / s.weight, s.calls))
+            else:
+                # Everything ejected: fail open to the region that recovers first
+                best = min(candidates, key=lambda s: s.ejected_until)
+            best.outstanding += 1
+            return best.name
+
+    def release(self, region: str, elapsed: float, error: Exception = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            s = self.regions[region]
+            s.outstanding -= 1
+            s.calls += 1
+            if error is None:
+                s.latency.append(elapsed)
+                s.consecutive_failures = 0
+                s.consecutive_throttles = 0
+                return
+            s.errors += 1
+            if is_throttle(error):
+                s.throttles += 1
+                s.consecutive_throttles += 1
+                cooldown = min(self.max_eject_sec, self.eject_sec * 2 ** (s.consecutive_throttles - 1))
+                self._eject(s, now, cooldown)
+            elif is_retryable(error):
+                s.consecutive_failures += 1
+                if s.consecutive_failures >= self.max_failures:
+                    self._eject(s, now, self.eject_sec)
+
+    def _eject(self, s: RegionState, now: float, cooldown: float) -> None:
+        s.ejected_until = max(s.ejected_until, now + cooldown)
+        s.ejections += 1
+
+    def _backoff(self, round_no: int, error: Exception) -> float:
+        """Full-jitter delay before retry round ``round_no`` (re-raises if the deadline cannot wait)."""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (round_no - 1)))
+        deadline = get_deadline()
+        if deadline is not None and not deadline.can_afford(delay + MIN_CALL_TIMEOUT):
+            raise error
+        current_span().set_attribute("region.backoff_sec", round(delay, 3))
+        return delay
+
+    def call(self, fn):
+        """Run ``fn(region)`` with failover across regions and backoff rounds for retryable errors."""
+        last_error = None
+        for round_no in range(self.rounds):
+            if round_no:
+                time.sleep(self._backoff(round_no, last_error))
+            tried = set()
+            while len(tried) < len(self.regions):
+                region = self.pick(exclude=tried)
+                if region is None:
+                    break
+                tried.add(region)
+                start = time.time()
+                try:
+                    response = fn(region)
+                except Exception as e:
+                    self.release(region, time.time() - start, e)
+                    if not is_retryable(e):
+                        raise
+                    last_error = e
+                    continue
+                self.release(region, time.time() - start)
+                current_span().set_attributes(**{
+                    "cloud.region": region, "region.attempts": round_no * len(self.regions) + len(tried),
+                })
+                return response
+        raise last_error
+
+    async def acall(self, afn):
+        """Async ``call``: ``afn(region)`` is a coroutine function."""
+        last_error = None
+        for round_no in range(self.rounds):
+            if round_no:
+                await asyncio.sleep(self._backoff(round_no, last_error))
+            tried = set()
+            while len(tried) < len(self.regions):
+                region = self.pick(exclude=tried)
+                if region is None:
+                    break
+                tried.add(region)
+                start = time.time()
+                try:
+                    response = await afn(region)
+                except Exception as e:
+                    self.release(region, time.time() - start, e)
+                    if not is_retryable(e):
+                        raise
+                    last_error = e
+                    continue
+                self.release(region, time.time() - start)
+                current_span().set_attributes(**{
+                    "cloud.region": region, "region.attempts": round_no * len(self.regions) + len(tried),
+                })
+                return response
+        raise last_error
+
+    def report(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            out = {}
+            for name, s in self.regions.items():
+                lat = list(s.latency)
+                out[name] = {
+                    "weight": s.weight,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "throttles": s.throttles,
+                    "ejections": s.ejections,
+                    "healthy": s.healthy(now),
+                    "outstanding": s.outstanding,
+                    "p50_sec": round(percentile(lat, 50), 2),
+                    "p95_sec": round(percentile(lat, 95), 2),
+                }
+            return out
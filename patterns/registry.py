@@ -0,0 +1,374 @@
+"""Declarative pattern registry: styles, personas, scenarios, questions, tasks and prompts.
+
+Definitions live in JSON data files (``patterns/data/<kind>.json``) and are read
+on first access, so importing a pattern module or starting a CLI reads nothing.
+Extra catalogues extend or override them without code changes: every directory
+in ``PATTERNS_CATALOG`` (``os.pathsep``-separated) or passed to ``add_catalog``
+may hold ``<kind>.json`` and/or ``<kind>/*.json`` files of the same shape.
+Styles and personas carry a ``tier`` (``basic`` / ``advanced``; catalogue items
+without one are ``extra``): the demos run their tier, while the HTTP server
+can address any key.
+
+Prompts are compiled once per (system, user template) into a ``PromptTemplate``
+that separates the static prefix -- the system prompt plus the user text before
+the first field, which is what a provider-side prompt cache can reuse -- from
+the variable fields. Every rendered ``Prompt`` carries a stable ``content_hash``
+that keys single-flight coalescing and is recorded on spans, ``call.end`` and
+result entries (``prompt_hash``) for lineage.
+
+Usage:
+    python3 -m patterns.registry list personas
+    python3 -m patterns.registry show styles business-formal
+    python3 -m patterns.registry check --catalog my_catalog/
+"""
+
+import argparse
+import copy
+import functools
+import hashlib
+import json
+import os
+import string
+import threading
+import warnings
+from dataclasses import dataclass
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+NEUTRAL = "neutral"
+
+# Fields every definition of a kind must have
+REQUIRED = {
+    "styles": ("name", "system"),
+    "personas": ("name", "system"),
+    "scenarios": ("name", "input", "styles_basic", "styles_advanced"),
+    "questions": ("text_ko",),
+    "tasks": ("name", "criteria", "criteria_keys", "rounds"),
+    "prompts": ("user",),
+}
+
+_catalog_dirs: list[str] = []
+_catalog_lock = threading.Lock()
+
+
+def _extra_dirs() -> list[str]:
+    env = [d for d in os.environ.get("PATTERNS_CATALOG", "").split(os.pathsep) if d]
+    return env + _catalog_dirs
+
+
+# ---------------------------------------------------------------------------
+# Catalogues
+# ---------------------------------------------------------------------------
+class Catalog:
+    """Definitions of one kind, read from the data files on first access."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._items = None
+        self._lock = threading.Lock()
+
+    def files(self) -> list[str]:
+        paths = [os.path.join(DATA_DIR, f"{self.kind}.json")]
+        for base in _extra_dirs():
+            path = os.path.join(base, f"{self.kind}.json")
+            if os.path.isfile(path):
+                paths.append(path)
+            sub = os.path.join(base, self.kind)
+            if os.path.isdir(sub):
+                paths += sorted(os.path.join(sub, n) for n in os.listdir(sub) if n.endswith(".json"))
+        return paths
+
+    def _load(self) -> dict:
+        items = self._items
+        if items is not None:
+            return items
+        with self._lock:
+            if self._items is None:
+                items = {}
+                for path in self.files():
+                    with open(path, encoding="utf-8") as f:
+                        data = json.load(f)
+                    for key, item in data.items():
+                        missing = [k for k in REQUIRED[self.kind] if k not in item]
+                        if missing:
+                            raise ValueError(f"{path}: {self.kind} '{key}' is missing {', '.join(missing)}")
+                        items[key] = item
+                self._items = items
+            return self._items
+
+    def get(self, key: str) -> dict:
+        """Definition for ``key`` (KeyError if unknown)."""
+        return self._load()[key]
+
+    __getitem__ = get
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._load()
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def items(self, tiers: tuple = None) -> dict:
+        """``{key: definition}`` in file order, optionally only the given tiers."""
+        items = self._load()
+        if tiers is None:
+            return dict(items)
+        return {k: v for k, v in items.items() if v.get("tier", "extra") in tiers}
+
+    def keys(self, tiers: tuple = None) -> list[str]:
+        return list(self.items(tiers))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._items = None
+
+
+styles = Catalog("styles")
+personas = Catalog("personas")
+scenarios = Catalog("scenarios")
+questions = Catalog("questions")
+tasks = Catalog("tasks")
+prompts = Catalog("prompts")
+CATALOGS = {c.kind: c for c in (styles, personas, scenarios, questions, tasks, prompts)}
+
+
+def add_catalog(path: str) -> None:
+    """Layer an extra catalogue directory over the built-in definitions."""
+    if not os.path.isdir(path):
+        raise ValueError(f"Catalog directory not found: {path}")
+    with _catalog_lock:
+        _catalog_dirs.append(path)
+    for catalog in CATALOGS.values():
+        catalog.reset()
+    compile_template.cache_clear()
+
+
+def demo_tiers(advanced: bool) -> tuple:
+    return ("basic", "advanced") if advanced else ("basic",)
+
+
+def demo_styles(scenario: dict, advanced: bool) -> list[str]:
+    """Style keys the style-transfer demo runs for a scenario."""
+    return scenario["styles_advanced" if advanced else "styles_basic"]
+
+
+def demo_scenarios(advanced: bool) -> list[str]:
+    """Scenario keys with at least one demo style."""
+    return [k for k, v in scenarios.items().items() if demo_styles(v, advanced)]
+
+
+def demo_personas(advanced: bool) -> dict:
+    """Personas the reverse-neutralization demo asks (besides the neutral baseline)."""
+    return personas.items(demo_tiers(advanced))
+
+
+def demo_questions(advanced: bool) -> list[str]:
+    """Question keys the reverse-neutralization demo asks."""
+    return ["advanced", "microservices"] if advanced else ["basic"]
+
+
+def demo_tasks(advanced: bool) -> list[str]:
+    """Task keys the Self-Refine demo runs."""
+    return ["advanced", "advanced-blog"] if advanced else ["basic"]
+
+
+def demo_units(pattern: str, advanced: bool) -> list[tuple]:
+    """``(pattern, scenario, item)`` for every result entry one demo produces, in run order."""
+    if pattern == "style_transfer":
+        return [(pattern, skey, style_key)
+                for skey in demo_scenarios(advanced) for style_key in demo_styles(scenarios.get(skey), advanced)]
+    if pattern == "reverse_neutralization":
+        return [(pattern, qkey, persona_key)
+                for qkey in demo_questions(advanced) for persona_key in [NEUTRAL, *demo_personas(advanced)]]
+    return [(pattern, tkey, "self-refine") for tkey in demo_tasks(advanced)]
+
+
+def check_references() -> list[str]:
+    """Problems with keys that one definition or the demos expect another catalogue to hold."""
+    problems = []
+    for key, scenario in scenarios.items().items():
+        for field in ("styles_basic", "styles_advanced"):
+            unknown = [s for s in scenario[field] if s not in styles]
+            if unknown:
+                problems.append(f"scenario '{key}' {field} references unknown styles: {', '.join(unknown)}")
+    for key, style in styles.items().items():
+        floor = style.get("min_tokens")
+        if floor is not None and (not isinstance(floor, int) or isinstance(floor, bool) or floor <= 0):
+            problems.append(f"style '{key}' min_tokens must be a positive integer")
+    expected = {
+        personas: [NEUTRAL],
+        questions: demo_questions(True) + demo_questions(False),
+        tasks: demo_tasks(True) + demo_tasks(False),
+        prompts: ["transform", "persona", "draft", "critique", "critique-final", "refine", "judge-preservation"],
+    }
+    for catalog, keys in expected.items():
+        missing = [k for k in dict.fromkeys(keys) if k not in catalog]
+        if missing:
+            problems.append(f"{catalog.kind} is missing {', '.join(missing)}")
+    return problems
+
+
+# ---------------------------------------------------------------------------
+# Prompt templates
+# ---------------------------------------------------------------------------
+_FORMATTER = string.Formatter()
+
+
+def _digest(system: str, user: str) -> str:
+    return hashlib.sha256(f"{system}\x00{user}".encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class Prompt:
+    template: str
+    system: str
+    user: str
+    prefix_hash: str
+    content_hash: str
+
+
+class PromptTemplate:
+    """A system prompt plus a ``str.format``-style user template, parsed once.
+
+    ``prefix`` is the user text before the first field; together with the
+    system prompt it is identical for every render (``prefix_hash``).
+    """
+
+    def __init__(self, name: str, system: str, user: str):
+        self.name = name
+        self.system = system
+        self.user = user
+        self._parts = []
+        for literal, field, spec, conversion in _FORMATTER.parse(user):
+            if field == "" or (field and not field.isidentifier()):
+                raise ValueError(f"Template '{name}': fields must be named, got '{{{field}}}'")
+            self._parts.append((literal, field, spec, conversion))
+        self.fields = tuple(f for _, f, _, _ in self._parts if f is not None)
+        prefix = []
+        for literal, field, _, _ in self._parts:
+            prefix.append(literal)
+            if field is not None:
+                break
+        self.prefix = "".join(prefix)
+        self.prefix_hash = _digest(system, self.prefix)
+
+    def render(self, **values) -> Prompt:
+        out = []
+        for literal, field, spec, conversion in self._parts:
+            out.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion:
+                    value = _FORMATTER.convert_field(value, conversion)
+                out.append(format(value, spec) if spec else str(value))
+        user = "".join(out)
+        return Prompt(self.name, self.system, user, self.prefix_hash, _digest(self.system, user))
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(name: str, system: str, user: str) -> PromptTemplate:
+    """Compiled template, memoized by content."""
+    return PromptTemplate(name, system, user)
+
+
+def prompt_template(name: str, system: str = None) -> PromptTemplate:
+    """Template for a ``prompts`` entry (``system`` overrides the entry's own)."""
+    p = prompts.get(name)
+    return compile_template(name, p.get("system", "") if system is None else system, p["user"])
+
+
+def style_template(key: str) -> PromptTemplate:
+    return compile_template(f"style:{key}", styles.get(key)["system"], prompts.get("transform")["user"])
+
+
+def persona_template(key: str = None) -> PromptTemplate:
+    key = key or NEUTRAL
+    return compile_template(f"persona:{key}", personas.get(key)["system"], prompts.get("persona")["user"])
+
+
+# ---------------------------------------------------------------------------
+# Deprecated module constants
+# ---------------------------------------------------------------------------
+# The dicts the pattern modules defined before the registry, rebuilt from the
+# catalogues so ``from patterns.style_transfer import BASIC_STYLES`` keeps working
+DEPRECATED_CONSTANTS = {
+    "patterns.style_transfer": {
+        "BASIC_STYLES": lambda: styles.items(("basic",)),
+        "ADVANCED_STYLES": lambda: styles.items(("advanced",)),
+        "SCENARIOS": lambda: scenarios.items(),
+        "SCENARIOS_KO": lambda: {k: v.get("input_ko", v["input"]) for k, v in scenarios.items().items()},
+    },
+    "patterns.reverse_neutralization": {
+        "BASIC_PERSONAS": lambda: personas.items(("basic",)),
+        "ADVANCED_PERSONAS": lambda: personas.items(("advanced",)),
+        "QUESTIONS": lambda: questions.items(),
+        "NEUTRAL_SYSTEM": lambda: personas.get(NEUTRAL)["system"],
+    },
+    "patterns.content_optimization": {
+        "TASKS": lambda: tasks.items(),
+    },
+}
+
+
+def deprecated_constant(module: str, name: str):
+    """Module ``__getattr__`` hook: a copy of a pre-registry constant, with a DeprecationWarning."""
+    build = DEPRECATED_CONSTANTS.get(module, {}).get(name)
+    if build is None:
+        raise AttributeError(f"module '{module}' has no attribute '{name}'")
+    warnings.warn(f"{module}.{name} is deprecated; use patterns.registry instead",
+                  DeprecationWarning, stacklevel=3)
+    return copy.deepcopy(build())
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def _templates(kind: str, key: str) -> list[PromptTemplate]:
+    if kind == "styles":
+        return [style_template(key)]
+    if kind == "personas":
+        return [persona_template(key)]
+    if kind == "prompts" and "system_suffix" not in prompts.get(key):
+        return [prompt_template(key)]
+    return []
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Inspect and validate the pattern registry")
+    parser.add_argument("--catalog", action="append", default=[], metavar="DIR",
+                        help="Extra catalogue directory (repeatable; also PATTERNS_CATALOG)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("list", help="List definitions of one kind")
+    p.add_argument("kind", choices=list(CATALOGS))
+    p = sub.add_parser("show", help="Print one definition and its compiled template")
+    p.add_argument("kind", choices=list(CATALOGS))
+    p.add_argument("key")
+    sub.add_parser("check", help="Load every catalogue, compile every template and resolve references")
+    return parser
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    for path in args.catalog:
+        add_catalog(path)
+
+    if args.command == "list":
+        for key, item in CATALOGS[args.kind].items().items():
+            tier = f"[{item['tier']}] " if "tier" in item else ""
+            print(f"  {key:<24} {tier}{item.get('name') or item.get('text_ko', '')[:60]}")
+    elif args.command == "show":
+        print(json.dumps(CATALOGS[args.kind].get(args.key), ensure_ascii=False, indent=2))
+        for t in _templates(args.kind, args.key):
+            print(f"\n  template {t.name}: fields={list(t.fields)} prefix_hash={t.prefix_hash} "
+                  f"prefix={len(t.system) + len(t.prefix)} chars")
+    elif args.command == "check":
+        for kind, catalog in CATALOGS.items():
+            compiled = sum(len(_templates(kind, key)) for key in catalog.keys())
+            print(f"  {kind:<10} {len(catalog):>4} definitions, {compiled} templates  ({len(catalog.files())} files)")
+        problems = check_references()
+        if problems:
+            raise SystemExit("\n".join(f"  {p}" for p in problems))
+        print("  OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Per-role model routing (generate / persona / critique / refine / judge).
+
+Each role can override the model ID, max_tokens and region. Sources, lowest to
+highest precedence: global defaults -> environment -> config file -> CLI.
+
+Environment variables use the role name as suffix, e.g.::
+
+    BEDROCK_MODEL_ID_JUDGE=global.anthropic.claude-haiku-4-5-20251001-v1:0
+    BEDROCK_MAX_TOKENS_JUDGE=200
+    BEDROCK_REGION_CRITIQUE=us-east-1
+
+Config file (JSON)::
+
+    {"roles": {"judge": {"model_id": "...", "max_tokens": 200, "region": "us-east-1"}},
+     "pricing": {"claude-haiku-4-5": [1.0, 5.0]}}
+"""
+
+import json
+import os
+from dataclasses import dataclass
+
+ROLES = ("generate", "persona", "critique", "refine", "judge")
+
+
+@dataclass
+class RoleConfig:
+    model_id: str | None = None
+    max_tokens: int | None = None
+    region: str | None = None
+
+    def update(self, **fields) -> None:
+        for k, v in fields.items():
+            if v is not None:
+                setattr(self, k, v)
+
+
+_roles: dict[str, RoleConfig] = {}
+
+
+def _check_role(role: str) -> None:
+    if role not in ROLES:
+        raise ValueError(f"Unknown role '{role}'. Choose from: {', '.join(ROLES)}")
+
+
+def _from_env(role: str) -> RoleConfig:
+    suffix = role.upper()
+    max_tokens = os.environ.get(f"BEDROCK_MAX_TOKENS_{suffix}")
+    return RoleConfig(
+        model_id=os.environ.get(f"BEDROCK_MODEL_ID_{suffix}") or None,
+        max_tokens=int(max_tokens) if max_tokens else None,
+        region=os.environ.get(f"BEDROCK_REGION_{suffix}") or None,
+    )
+
+
+def get_role_config(role: str) -> RoleConfig:
+    """Return the (lazily env-initialized) config for a role."""
+    _check_role(role)
+    if role not in _roles:
+        _roles[role] = _from_env(role)
+    return _roles[role]
+
+
+def set_role_config(role: str, model_id: str = None, max_tokens: int = None,
+                    region: str = None) -> None:
+    """Override fields of a role's config (None leaves a field unchanged)."""
+    get_role_config(role).update(model_id=model_id, max_tokens=max_tokens, region=region)
+
+
+def load_role_config(path: str) -> dict:
+    """Apply a JSON role config file. Returns the parsed document."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for role, fields in data.get("roles", {}).items():
+        set_role_config(
+            role,
+            model_id=fields.get("model_id"),
+            max_tokens=fields.get("max_tokens"),
+            region=fields.get("region"),
+        )
+    return data
+
+
+def parse_role_assignment(value: str) -> tuple[str, str]:
+    """Parse a CLI ``ROLE=VALUE`` assignment."""
+    role, sep, rest = value.partition("=")
+    role = role.strip().lower()
+    if not sep or not rest.strip():
+        raise ValueError(f"Expected ROLE=VALUE, got '{value}'")
+    _check_role(role)
+    return role, rest.strip()
+
+
+def describe_routing() -> dict:
+    """Return the explicit per-role overrides (for summaries / JSON output)."""
+    out = {}
+    for role in ROLES:
+        cfg = get_role_config(role)
+        fields = {k: v for k, v in vars(cfg).items() if v is not None}
+        if fields:
+            out[role] = fields
+    return out
@@ -0,0 +1,367 @@
+"""HTTP serving mode for the three patterns.
+
+Endpoints (JSON in / JSON out):
+
+    POST /v1/style-transfer  {"text": "...", "style": "business-formal", "evaluate": false}
+    POST /v1/persona         {"question": "...", "persona": "ciso"}   # persona omitted = neutral
+    POST /v1/self-refine     {"task": "basic", "incremental": true}  or  {"task": {task config}}
+    GET  /metrics            latency / queue depth / call stats
+    GET  /healthz
+
+Any POST body may carry ``"deadline_sec"`` (a positive number of seconds) to
+run the job under a time budget; a job that runs out of it gets 504.
+
+Requests go into an asyncio queue drained by ``concurrency`` workers, which is
+also the cap on concurrent Bedrock calls. Once ``queue_size`` jobs are waiting
+on top of the running ones, new requests get 429 (backpressure).
+
+Usage:
+    python3 -m patterns.server --port 8080 --concurrency 8 --queue-size 64
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from patterns.backends import BACKENDS
+from patterns.bedrock import get_backend, get_model_id, get_region_pool, set_backend, set_model_id
+from patterns.content_optimization import run_self_refine
+from patterns.deadline import DeadlineExceeded, deadline_scope
+from patterns.registry import personas, styles, tasks
+from patterns.reverse_neutralization import ask_persona
+from patterns.stats import percentile, stats
+from patterns.style_transfer import transform_style
+from patterns.tracing import span
+
+MAX_BODY_BYTES = 1 << 20
+MAX_ROUNDS = 5  # critique/refine rounds a request-supplied task may ask for
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 429: "Too Many Requests", 500: "Internal Server Error",
+            504: "Gateway Timeout"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Endpoint handlers (sync; run on the worker thread pool)
+# ---------------------------------------------------------------------------
+def _require(body: dict, key: str):
+    if not body.get(key):
+        raise BadRequest(f"'{key}' is required")
+    return body[key]
+
+
+def handle_style_transfer(body: dict) -> dict:
+    text = _require(body, "text")
+    style = _require(body, "style")
+    if not isinstance(style, str) or style not in styles:
+        raise BadRequest(f"Unknown style '{style}'")
+    return transform_style(text, style, evaluate=bool(body.get("evaluate")))
+
+
+def handle_persona(body: dict) -> dict:
+    question = _require(body, "question")
+    persona = body.get("persona")
+    if persona and (not isinstance(persona, str) or persona not in personas):
+        raise BadRequest(f"Unknown persona '{persona}'")
+    return ask_persona(question, persona)
+
+
+def _custom_task(task: dict) -> dict:
+    """A request-supplied task config, checked for everything ``run_self_refine`` reads."""
+    missing = [k for k in ("criteria", "criteria_keys", "rounds") if k not in task]
+    missing += [k for k in ("task", "role") if not (task.get(k) or task.get(f"{k}_ko"))]
+    if missing:
+        raise BadRequest(f"task is missing {', '.join(f'task.{k}' for k in missing)}")
+    keys = task["criteria_keys"]
+    if not isinstance(keys, list) or not keys or not all(isinstance(k, str) for k in keys):
+        raise BadRequest("task.criteria_keys must be a non-empty list of strings")
+    rounds = task["rounds"]
+    if isinstance(rounds, bool) or not isinstance(rounds, int) or not 0 <= rounds <= MAX_ROUNDS:
+        raise BadRequest(f"task.rounds must be an integer from 0 to {MAX_ROUNDS}")
+    return {"name": "custom", **task}
+
+
+def handle_self_refine(body: dict) -> dict:
+    task = _require(body, "task")
+    if isinstance(task, str):
+        if task not in tasks:
+            raise BadRequest(f"Unknown task '{task}'")
+        config = tasks.get(task)
+    elif isinstance(task, dict):
+        config = _custom_task(task)
+    else:
+        raise BadRequest("'task' must be a task name or a task object")
+    round_scores, final_draft = run_self_refine(
+        config, verbose=False, incremental=bool(body.get("incremental")),
+    )
+    return {
+        "task": config["name"],
+        "rounds": config["rounds"],
+        "round_scores": round_scores,
+        "final_draft": final_draft,
+        "elapsed_sec": round(sum(rs.get("elapsed_sec", 0) for rs in round_scores), 2),
+    }
+
+
+def run_handler(handler, body: dict) -> dict:
+    """Run a handler under the request's optional ``deadline_sec`` budget."""
+    seconds = body.get("deadline_sec")
+    if seconds is not None and (isinstance(seconds, bool) or not isinstance(seconds, (int, float))
+                                or not 0 < seconds < math.inf):
+        raise BadRequest("'deadline_sec' must be a positive number")
+    with deadline_scope(seconds) as deadline:
+        result = handler(body)
+    if deadline is not None:
+        result = {**result, "deadline": deadline.report()}
+    return result
+
+
+ROUTES = {
+    "/v1/style-transfer": handle_style_transfer,
+    "/v1/persona": handle_persona,
+    "/v1/self-refine": handle_self_refine,
+}
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+class ServerMetrics:
+    """Request counters and latency windows per endpoint."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)
+        self.latency = defaultdict(lambda: deque(maxlen=window))
+        self.queue_wait = deque(maxlen=window)
+        self.started = time.time()
+
+    def observe(self, path: str, status: int, elapsed: float, queued: float = None) -> None:
+        with self._lock:
+            self.requests[path] += 1
+            if status == 429:
+                self.rejected[path] += 1
+            elif status >= 400:
+                self.errors[path] += 1
+            else:
+                self.latency[path].append(elapsed)
+            if queued is not None:
+                self.queue_wait.append(queued)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            for path in self.requests:
+                lat = list(self.latency[path])
+                endpoints[path] = {
+                    "requests": self.requests[path],
+                    "errors": self.errors[path],
+                    "rejected_429": self.rejected[path],
+                    "p50_sec": round(percentile(lat, 50), 3),
+                    "p95_sec": round(percentile(lat, 95), 3),
+                    "p99_sec": round(percentile(lat, 99), 3),
+                }
+            waits = list(self.queue_wait)
+            return {
+                "uptime_sec": round(time.time() - self.started, 1),
+                "endpoints": endpoints,
+                "queue_wait_p95_sec": round(percentile(waits, 95), 3),
+            }
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+class PatternServer:
+    """Minimal asyncio HTTP/1.1 server with a bounded job queue."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080,
+                 concurrency: int = 8, queue_size: int = 64):
+        self.host = host
+        self.port = port
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.metrics = ServerMetrics()
+        self.in_flight = 0
+        self._admitted = 0
+        self._queue = None
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pattern")
+        self._workers = []
+        self._server = None
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            handler, body, enqueued, future, ctx = await self._queue.get()
+            self.in_flight += 1
+            queued = time.time() - enqueued
+            try:
+                result = await loop.run_in_executor(self._executor, ctx.run, run_handler, handler, body)
+                if not future.done():
+                    future.set_result((result, queued))
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.in_flight -= 1
+                self._admitted -= 1
+                self._queue.task_done()
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs admitted but not yet picked up by a worker."""
+        return self._admitted - self.in_flight
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        """Route a request; returns (status, payload)."""
+        if path == "/healthz":
+            return 200, {"status": "ok"}
+        if path == "/metrics":
+            pool = get_region_pool()
+            return 200, {
+                **self.metrics.snapshot(),
+                "queue_depth": self.queue_depth,
+                "queue_capacity": self.queue_size,
+                "in_flight": self.in_flight,
+                "concurrency": self.concurrency,
+                "model_id": get_model_id(),
+                "call_stats": stats.summary(),
+                "regions": pool.report() if pool is not None else None,
+            }
+
+        handler = ROUTES.get(path)
+        if handler is None:
+            return 404, {"error": f"No route for {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "Body must be a JSON object"}
+
+        if self._admitted >= self.concurrency + self.queue_size:
+            return 429, {"error": "Server saturated, retry later", "queue_depth": self.queue_depth}
+        self._admitted += 1
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((handler, payload, time.time(), future, contextvars.copy_context()))
+
+        try:
+            result, queued = await future
+        except BadRequest as e:
+            return 400, {"error": str(e)}
+        except DeadlineExceeded as e:
+            return 504, {"error": f"Deadline exceeded: {e}"}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+        return 200, {"result": result, "queue_wait_sec": round(queued, 3)}
+
+    async def _handle_connection(self, reader, writer) -> None:
+        start = time.time()
+        path, status = "-", 500
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            path = path.split("?", 1)[0]
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                status, payload = 413, {"error": "Body too large"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                with span("http.request", **{"http.method": method, "http.route": path}):
+                    status, payload = await self.dispatch(method, path, body)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": f"Malformed request: {e}"}
+
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(data)}",
+            "Connection: close",
+        ]
+        if status == 429:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+        if path in ROUTES:
+            self.metrics.observe(path, status, time.time() - start,
+                                 payload.get("queue_wait_sec") if status == 200 else None)
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for w in self._workers:
+            w.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve the output control patterns over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port (default: 8080)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Worker count = max concurrent pattern jobs (default: 8)")
+    parser.add_argument("--queue-size", type=int, default=64,
+                        help="Pending jobs before answering 429 (default: 64)")
+    parser.add_argument("--model", type=str, default=None, help="Override Bedrock model ID")
+    parser.add_argument("--backend", choices=BACKENDS, default=None,
+                        help="LLM backend: bedrock, openai or fake (default: LLM_BACKEND or bedrock)")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.model:
+        set_model_id(args.model)
+    if args.backend:
+        set_backend(args.backend)
+    server = PatternServer(args.host, args.port, args.concurrency, args.queue_size)
+    print(f"  Serving on http://{args.host}:{args.port}  "
+          f"(concurrency={args.concurrency}, queue={args.queue_size}, model={get_model_id()}, "
+          f"backend={get_backend()})")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,489 @@
+"""Sharded multi-process runner for large scenario x style/persona x model x repeat matrices.
+
+The coordinator expands the work matrix into units, groups them into shards
+(one model per shard) and writes them to a SQLite queue. Worker processes --
+local, or on other hosts sharing the queue file -- lease a shard, run its units
+on a small thread pool, renew the lease while working, and write the unit
+results back. Expired leases are picked up again by other workers. When every
+shard is finished the results are merged into one collector output.
+
+Usage:
+    python3 -m patterns.shard run all --advanced --models m1,m2 --repeats 3 --workers 4 --save
+    python3 -m patterns.shard enqueue 1 --advanced --repeats 5 --queue /shared/queue.db
+    python3 -m patterns.shard worker --queue /shared/queue.db --threads 4      # on each host
+    python3 -m patterns.shard status --queue /shared/queue.db
+    python3 -m patterns.shard merge --queue /shared/queue.db --save
+
+The queue relies on SQLite file locking; use a local disk or a filesystem with
+working POSIX locks (not plain NFS) when workers run on several hosts.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+
+from patterns.backends import BACKENDS
+from patterns.bedrock import get_model_id, set_backend, set_model_id
+from patterns.content_optimization import run_self_refine
+from patterns.display import OutputCollector, print_table
+from patterns.registry import NEUTRAL, demo_units, questions, scenarios, tasks
+from patterns.reverse_neutralization import ask_persona
+from patterns.stats import stats
+from patterns.style_transfer import scenario_input, transform_style
+
+PATTERNS = {"1": "style_transfer", "2": "reverse_neutralization", "3": "content_optimization"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS shards (
+    shard_id      INTEGER PRIMARY KEY,
+    model_id      TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    owner         TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    started_at    REAL,
+    finished_at   REAL,
+    stats         TEXT
+);
+CREATE TABLE IF NOT EXISTS units (
+    unit_id     INTEGER PRIMARY KEY,
+    shard_id    INTEGER NOT NULL REFERENCES shards(shard_id),
+    pattern     TEXT NOT NULL,
+    scenario    TEXT NOT NULL,
+    item        TEXT NOT NULL,
+    repeat      INTEGER NOT NULL,
+    result      TEXT,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_shards_status ON shards(status, lease_expires);
+CREATE INDEX IF NOT EXISTS idx_units_shard ON units(shard_id);
+"""
+
+
+# ---------------------------------------------------------------------------
+# Work matrix
+# ---------------------------------------------------------------------------
+def build_matrix(choice: str, advanced: bool, models: list, repeats: int = 1) -> list[dict]:
+    """Expand the demo selection into units, in the same order the demos run."""
+    keys = ["1", "2", "3"] if choice == "all" else [choice]
+    items = [unit for key in keys for unit in demo_units(PATTERNS[key], advanced)]
+    return [
+        {"model_id": model_id, "pattern": pattern, "scenario": scenario, "item": item, "repeat": r}
+        for model_id in models
+        for pattern, scenario, item in items
+        for r in range(repeats)
+    ]
+
+
+def run_unit(unit: dict, advanced: bool, incremental: bool = False, coalesce: bool = None) -> dict:
+    """Run one unit and return the collector fields for it."""
+    pattern, skey, item = unit["pattern"], unit["scenario"], unit["item"]
+    if pattern == "style_transfer":
+        text = scenario_input(scenarios.get(skey))
+        entry = transform_style(text, item, evaluate=advanced, coalesce=coalesce)
+        return {"scenario": scenarios.get(skey)["name"], "label": entry["style"], "input": text,
+                "output": entry["output"], "elapsed_sec": entry["elapsed_sec"],
+                "metrics": entry.get("preservation_scores"),
+                "extra": {k: entry[k] for k in ("tokens", "cache", "truncated", "prompt_hash") if k in entry}}
+    if pattern == "reverse_neutralization":
+        question = questions.get(skey)["text_ko"]
+        entry = ask_persona(question, None if item == NEUTRAL else item, coalesce=coalesce)
+        return {"scenario": skey, "label": entry["persona"], "input": question,
+                "output": entry["output"], "elapsed_sec": entry["elapsed_sec"], "metrics": None,
+                "extra": {k: entry[k] for k in ("tokens", "cache", "truncated", "prompt_hash") if k in entry}}
+    config = tasks.get(skey)
+    round_scores, final_draft = run_self_refine(config, verbose=False, incremental=incremental,
+                                                coalesce=coalesce)
+    tokens = {
+        "input": sum(rs.get("tokens", {}).get("input", 0) for rs in round_scores),
+        "output": sum(rs.get("tokens", {}).get("output", 0) for rs in round_scores),
+    }
+    return {"scenario": config["name"], "label": "self-refine",
+            "input": config.get("task_ko", config.get("task", "")), "output": final_draft,
+            "elapsed_sec": round(sum(rs.get("elapsed_sec", 0) for rs in round_scores), 2),
+            "metrics": {"round_scores": round_scores}, "extra": {"tokens": tokens}}
+
+
+# ---------------------------------------------------------------------------
+# SQLite lease queue
+# ---------------------------------------------------------------------------
+class ShardQueue:
+    """Shards of units in a SQLite file, claimed by workers with expiring leases."""
+
+    def __init__(self, path: str, lease_sec: float = 120.0, max_attempts: int = 3):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _tx(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+
+    def enqueue(self, units: list, shard_size: int, config: dict) -> int:
+        """Split units into shards (never mixing models); returns the shard count."""
+        self._tx()
+        try:
+            if self._conn.execute("SELECT COUNT(*) FROM shards").fetchone()[0]:
+                raise ValueError(f"{self.path} already holds a work matrix")
+            for key, value in config.items():
+                self._conn.execute("INSERT INTO meta VALUES (?, ?)", (key, json.dumps(value)))
+            shard_id, current, count = 0, [], 0
+            for i, unit in enumerate(units):
+                current.append((i, unit))
+                last = i + 1 == len(units) or units[i + 1]["model_id"] != unit["model_id"]
+                if len(current) >= shard_size or last:
+                    shard_id += 1
+                    self._conn.execute("INSERT INTO shards (shard_id, model_id) VALUES (?, ?)",
+                                       (shard_id, unit["model_id"]))
+                    self._conn.executemany(
+                        "INSERT INTO units (unit_id, shard_id, pattern, scenario, item, repeat) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [(uid, shard_id, u["pattern"], u["scenario"], u["item"], u["repeat"])
+                         for uid, u in current],
+                    )
+                    current = []
+                    count += 1
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def config(self) -> dict:
+        return {r["key"]: json.loads(r["value"]) for r in self._conn.execute("SELECT * FROM meta")}
+
+    def lease(self, owner: str) -> dict | None:
+        """Claim the next pending (or lease-expired) shard."""
+        now = time.time()
+        self._tx()
+        try:
+            self._conn.execute(
+                "UPDATE shards SET status = 'failed' WHERE status = 'leased' "
+                "AND lease_expires < ? AND attempts >= ?", (now, self.max_attempts),
+            )
+            row = self._conn.execute(
+                "SELECT shard_id, model_id FROM shards WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_expires < ?) ORDER BY shard_id LIMIT 1", (now,),
+            ).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+            self._conn.execute(
+                "UPDATE shards SET status = 'leased', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, started_at = ? WHERE shard_id = ?",
+                (owner, now + self.lease_sec, now, row["shard_id"]),
+            )
+            units = [dict(u) for u in self._conn.execute(
+                "SELECT unit_id, pattern, scenario, item, repeat FROM units "
+                "WHERE shard_id = ? ORDER BY unit_id", (row["shard_id"],),
+            )]
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return {"shard_id": row["shard_id"], "model_id": row["model_id"], "units": units}
+
+    def renew(self, shard_id: int, owner: str) -> bool:
+        """Extend a lease; False if it was lost to another worker."""
+        cur = self._conn.execute(
+            "UPDATE shards SET lease_expires = ? WHERE shard_id = ? AND owner = ? AND status = 'leased'",
+            (time.time() + self.lease_sec, shard_id, owner),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, shard_id: int, owner: str, results: dict, shard_stats: dict) -> bool:
+        """Write unit results (``{unit_id: (result, error)}``) if the lease is still ours."""
+        self._tx()
+        try:
+            cur = self._conn.execute(
+                "UPDATE shards SET status = 'done', finished_at = ?, stats = ? "
+                "WHERE shard_id = ? AND owner = ? AND status = 'leased'",
+                (time.time(), json.dumps(shard_stats), shard_id, owner),
+            )
+            if cur.rowcount != 1:
+                self._conn.execute("ROLLBACK")
+                return False
+            self._conn.executemany(
+                "UPDATE units SET result = ?, error = ? WHERE unit_id = ?",
+                [(json.dumps(res, ensure_ascii=False) if res is not None else None, err, uid)
+                 for uid, (res, err) in results.items()],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def counts(self) -> dict:
+        rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM shards GROUP BY status")
+        return {r["status"]: r["n"] for r in rows}
+
+    def finished(self) -> bool:
+        counts = self.counts()
+        return counts.get("pending", 0) == 0 and counts.get("leased", 0) == 0
+
+    def shards(self) -> list:
+        return self._conn.execute("SELECT * FROM shards ORDER BY shard_id").fetchall()
+
+    def units(self) -> list:
+        return self._conn.execute(
+            "SELECT u.*, s.model_id FROM units u JOIN shards s USING (shard_id) ORDER BY u.unit_id"
+        ).fetchall()
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+def run_worker(queue_path: str, threads: int = 4, poll_sec: float = 1.0, lease_sec: float = 120.0,
+               owner: str = None) -> int:
+    """Lease and run shards until the queue is drained; returns the shard count handled."""
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    queue = ShardQueue(queue_path, lease_sec=lease_sec)
+    config = queue.config()
+    handled, model_before = 0, get_model_id()
+    try:
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="shard") as executor:
+            while True:
+                shard = queue.lease(owner)
+                if shard is None:
+                    if queue.finished():
+                        break
+                    time.sleep(poll_sec)
+                    continue
+
+                set_model_id(shard["model_id"])
+                stats.reset()
+                started = time.time()
+                coalesce = False if config.get("repeats", 1) > 1 else None
+                futures = {
+                    executor.submit(run_unit, u, config.get("advanced", False),
+                                    config.get("incremental", False), coalesce): u
+                    for u in shard["units"]
+                }
+                pending, lost = set(futures), False
+                while pending:
+                    _, pending = wait(pending, timeout=lease_sec / 3)
+                    if pending and not queue.renew(shard["shard_id"], owner):
+                        lost = True  # another worker took over; let ours finish and drop it
+                if lost:
+                    continue
+
+                results = {}
+                for fut, unit in futures.items():
+                    error = fut.exception()
+                    results[unit["unit_id"]] = (
+                        (None, f"{type(error).__name__}: {error}") if error else (fut.result(), None)
+                    )
+                shard_stats = {"owner": owner, "elapsed_sec": round(time.time() - started, 2),
+                               "units": len(results), "call_stats": stats.summary()}
+                if queue.complete(shard["shard_id"], owner, results, shard_stats):
+                    handled += 1
+    finally:
+        set_model_id(model_before)  # in-process callers keep their own model
+        queue.close()
+    return handled
+
+
+def _worker_process(queue_path: str, threads: int, lease_sec: float, backend: str = None) -> None:
+    if backend:
+        set_backend(backend)
+    run_worker(queue_path, threads=threads, lease_sec=lease_sec)
+
+
+# ---------------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------------
+def merge(queue: ShardQueue) -> OutputCollector:
+    """Rebuild one collector output from the finished shards (matrix order)."""
+    config = queue.config()
+    advanced = config.get("advanced", False)
+    repeats = config.get("repeats", 1)
+    merged = OutputCollector()
+    current = None
+    errors = []
+    for unit in queue.units():
+        if unit["result"] is None:
+            if unit["error"]:
+                errors.append({"unit_id": unit["unit_id"], "pattern": unit["pattern"],
+                               "scenario": unit["scenario"], "item": unit["item"], "error": unit["error"]})
+            continue
+        if current != (unit["model_id"], unit["pattern"]):
+            current = (unit["model_id"], unit["pattern"])
+            merged.start_pattern(unit["pattern"], advanced, model_id=unit["model_id"])
+        res = json.loads(unit["result"])
+        extra = dict(res.get("extra") or {})
+        if repeats > 1:
+            extra["repeat"] = unit["repeat"]
+        merged.add_result(res["scenario"], res["label"], res["input"], res["output"],
+                          res["elapsed_sec"], res.get("metrics"), extra)
+
+    shards = queue.shards()
+    started = [s["started_at"] for s in shards if s["started_at"]]
+    finished = [s["finished_at"] for s in shards if s["finished_at"]]
+    wall = (max(finished) - min(started)) if started and finished else 0.0
+    units_done = sum(1 for u in queue.units() if u["result"] is not None)
+    merged.set_meta("shards", {
+        "config": config,
+        "status": queue.counts(),
+        "workers": sorted({json.loads(s["stats"])["owner"] for s in shards if s["stats"]}),
+        "units_done": units_done,
+        "wall_sec": round(wall, 2),
+        "units_per_sec": round(units_done / wall, 3) if wall else None,
+        "errors": errors,
+        "per_shard": [{"shard_id": s["shard_id"], "model_id": s["model_id"], "status": s["status"],
+                       "attempts": s["attempts"], **(json.loads(s["stats"]) if s["stats"] else {})}
+                      for s in shards],
+    })
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def _default_queue_path() -> str:
+    return os.path.join("results", f"queue_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+
+
+def _add_matrix_args(p) -> None:
+    p.add_argument("pattern", choices=["1", "2", "3", "all"], help="Pattern(s) to run")
+    p.add_argument("--advanced", action="store_true", help="Advanced scenarios, styles and personas")
+    p.add_argument("--incremental", action="store_true", help="Self-Refine incremental critique")
+    p.add_argument("--models", type=str, default=None,
+                   help="Comma-separated model IDs (default: BEDROCK_MODEL_ID / default model)")
+    p.add_argument("--repeats", type=int, default=1, help="Repeats per unit (default: 1)")
+    p.add_argument("--shard-size", type=int, default=4, help="Units per shard (default: 4)")
+
+
+def _add_worker_args(p) -> None:
+    p.add_argument("--threads", type=int, default=4, help="Concurrent units per worker (default: 4)")
+    p.add_argument("--lease-sec", type=float, default=120.0, help="Shard lease length (default: 120)")
+    p.add_argument("--backend", choices=BACKENDS, default=None,
+                   help="LLM backend: bedrock, openai or fake (default: LLM_BACKEND or bedrock)")
+
+
+def _add_output_args(p) -> None:
+    p.add_argument("--output", choices=["text", "json"], default="text", help="Output format")
+    p.add_argument("--save", action="store_true", help="Save the merged output to results/")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Sharded multi-process runner")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="Enqueue, run local workers and merge")
+    _add_matrix_args(p)
+    _add_worker_args(p)
+    _add_output_args(p)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Local worker processes")
+    p.add_argument("--queue", default=None, help="Queue DB path (default: results/queue_<ts>.db)")
+
+    p = sub.add_parser("enqueue", help="Only create the queue (for workers on other hosts)")
+    _add_matrix_args(p)
+    p.add_argument("--queue", required=True, help="Queue DB path")
+
+    p = sub.add_parser("worker", help="Lease and run shards until the queue is drained")
+    _add_worker_args(p)
+    p.add_argument("--queue", required=True, help="Queue DB path")
+
+    p = sub.add_parser("status", help="Show shard progress")
+    p.add_argument("--queue", required=True, help="Queue DB path")
+
+    p = sub.add_parser("merge", help="Merge finished shards into one collector output")
+    _add_output_args(p)
+    p.add_argument("--queue", required=True, help="Queue DB path")
+    return parser
+
+
+def _enqueue(args, queue_path: str) -> ShardQueue:
+    models = [m.strip() for m in (args.models or get_model_id()).split(",") if m.strip()]
+    units = build_matrix(args.pattern, args.advanced, models, args.repeats)
+    queue = ShardQueue(queue_path)
+    n = queue.enqueue(units, args.shard_size, {
+        "pattern": args.pattern, "advanced": args.advanced, "incremental": args.incremental,
+        "models": models, "repeats": args.repeats,
+    })
+    print(f"  Queued {len(units)} units in {n} shards -> {queue_path}", file=sys.stderr)
+    return queue
+
+
+def _print_status(queue: ShardQueue) -> None:
+    rows = []
+    for s in queue.shards():
+        st = json.loads(s["stats"]) if s["stats"] else {}
+        rows.append((s["shard_id"], s["model_id"].split(".")[-1][:28], s["status"], s["attempts"],
+                     s["owner"] or "-", st.get("units", "-"), st.get("elapsed_sec", "-")))
+    print_table(["Shard", "Model", "Status", "Attempts", "Owner", "Units", "Elapsed"], rows)
+    print("  " + ", ".join(f"{k}={v}" for k, v in sorted(queue.counts().items())))
+
+
+def _emit(merged: OutputCollector, args) -> None:
+    model_id = ",".join(merged.meta["shards"]["config"].get("models", [])) or get_model_id()
+    info = merged.meta["shards"]
+    if args.output == "json":
+        merged.print_json(model_id)
+    else:
+        print(f"\n  Merged {info['units_done']} units from {len(info['per_shard'])} shards, "
+              f"{len(info['workers'])} worker(s), {info['wall_sec']}s wall, "
+              f"{info['units_per_sec']} units/s, {len(info['errors'])} error(s)")
+    if args.save:
+        path = merged.save(model_id)
+        print(f"  Results saved: {path}", file=sys.stderr)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "run":
+        queue_path = args.queue or _default_queue_path()
+        _enqueue(args, queue_path).close()
+        # Fresh interpreters: no inherited SQLite connection, client pools or threads
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(target=_worker_process, args=(queue_path, args.threads, args.lease_sec, args.backend))
+            for _ in range(max(1, args.workers))
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        queue = ShardQueue(queue_path)
+        _emit(merge(queue), args)
+        queue.close()
+    elif args.command == "enqueue":
+        _enqueue(args, args.queue).close()
+    elif args.command == "worker":
+        if args.backend:
+            set_backend(args.backend)
+        n = run_worker(args.queue, threads=args.threads, lease_sec=args.lease_sec)
+        print(f"  Worker done: {n} shard(s)", file=sys.stderr)
+    elif args.command == "status":
+        queue = ShardQueue(args.queue)
+        _print_status(queue)
+        queue.close()
+    elif args.command == "merge":
+        queue = ShardQueue(args.queue)
+        _emit(merge(queue), args)
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Near-duplicate input cache (MinHash LSH over character shingles).
+
+Inputs that differ only in whitespace, punctuation or boilerplate map to
+near-identical shingle sets, so a prior output for the same namespace
+(role + model + system prompt, i.e. the same style/persona) can be reused when
+the estimated Jaccard similarity exceeds a threshold. Figures (amounts, dates,
+dosages) must match exactly: an output quoting other numbers is never served.
+Fully offline, bounded memory with LRU eviction.
+"""
+
+import hashlib
+import random
+import re
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_DIGIT_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text: str, boilerplate: list = None) -> str:
+    """Canonical form: NFKC, lowercase, boilerplate removed, numbers/punctuation/whitespace folded."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    for pattern in boilerplate or ():
+        text = pattern.sub(" ", text)
+    text = _DIGIT_RE.sub("0", text)
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def numbers(text: str, boilerplate: list = None) -> tuple:
+    """Digit runs outside boilerplate, in order; a cache hit requires the same ones."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    for pattern in boilerplate or ():
+        text = pattern.sub(" ", text)
+    return tuple(_DIGIT_RE.findall(text))
+
+
+def shingles(text: str, k: int = 5) -> set:
+    """Character k-shingles of a (normalized) string."""
+    if len(text) <= k:
+        return {text}
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def _hash32(s: str) -> int:
+    return struct.unpack("<I", hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest())[0]
+
+
+class MinHasher:
+    """MinHash signatures with ``num_perm`` universal hash permutations."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, items: set) -> tuple:
+        hashes = [_hash32(x) for x in items]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._params
+        )
+
+
+def estimate_similarity(sig_a: tuple, sig_b: tuple) -> float:
+    """Estimated Jaccard similarity from two MinHash signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class SimilarityCache:
+    """In-memory MinHash LSH index of (namespace, input) -> output."""
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 10000,
+                 num_perm: int = 64, bands: int = 16, shingle_size: int = 5,
+                 boilerplate: list = None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.boilerplate = [re.compile(p, re.IGNORECASE) for p in boilerplate or ()]
+        self._hasher = MinHasher(num_perm)
+        self._entries = OrderedDict()   # entry_id -> (namespace, signature, input, output, numbers)
+        self._buckets = {}              # (namespace, band, band_sig) -> set(entry_id)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _signature(self, text: str) -> tuple:
+        return self._hasher.signature(shingles(normalize(text, self.boilerplate), self.shingle_size))
+
+    def _band_keys(self, namespace: str, sig: tuple):
+        for b in range(self.bands):
+            yield (namespace, b, sig[b * self.rows:(b + 1) * self.rows])
+
+    def lookup(self, namespace: str, text: str) -> dict | None:
+        """Return ``{"output", "similarity", "source_input"}`` for the best match above threshold."""
+        sig = self._signature(text)
+        figures = numbers(text, self.boilerplate)
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(namespace, sig):
+                candidates |= self._buckets.get(key, set())
+            best_id, best_sim = None, 0.0
+            for entry_id in candidates:
+                if self._entries[entry_id][4] != figures:
+                    continue
+                sim = estimate_similarity(sig, self._entries[entry_id][1])
+                if sim > best_sim:
+                    best_id, best_sim = entry_id, sim
+            if best_id is None or best_sim < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            _, _, source, output, _ = self._entries[best_id]
+            return {"output": output, "similarity": round(best_sim, 3), "source_input": source}
+
+    def store(self, namespace: str, text: str, output: str) -> None:
+        sig = self._signature(text)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (namespace, sig, text, output, numbers(text, self.boilerplate))
+            for key in self._band_keys(namespace, sig):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        entry_id, (namespace, sig, *_) = self._entries.popitem(last=False)
+        for key in self._band_keys(namespace, sig):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+        self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def report(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+_cache = None
+
+
+def enable_similarity_cache(threshold: float = 0.9, max_entries: int = 10000,
+                            **kwargs) -> SimilarityCache:
+    """Turn on the global near-duplicate cache used by ``converse(..., sim_key=...)``."""
+    global _cache
+    _cache = SimilarityCache(threshold=threshold, max_entries=max_entries, **kwargs)
+    return _cache
+
+
+def disable_similarity_cache() -> None:
+    global _cache
+    _cache = None
+
+
+def get_similarity_cache() -> SimilarityCache | None:
+    return _cache
@@ -0,0 +1,136 @@
+"""Per-role call statistics: latency, tokens, estimated cost and event counters."""
+
+import math
+import threading
+from collections import defaultdict, deque
+
+# USD per 1M tokens (input, output), matched by substring of the model ID.
+MODEL_PRICING = {
+    "claude-opus-4": (15.0, 75.0),
+    "claude-sonnet-4": (3.0, 15.0),
+    "claude-3-7-sonnet": (3.0, 15.0),
+    "claude-3-5-sonnet": (3.0, 15.0),
+    "claude-haiku-4-5": (1.0, 5.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+    "claude-3-haiku": (0.25, 1.25),
+}
+
+
+def set_pricing(pricing: dict) -> None:
+    """Add or override per-model prices: ``{substring: (input_usd, output_usd)}`` per 1M tokens."""
+    MODEL_PRICING.update({k: tuple(v) for k, v in pricing.items()})
+
+
+def estimate_cost(model_id: str, input_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of a call (0 when the model has no known price)."""
+    # Longest match wins so "claude-3-5-haiku" beats "claude-3-haiku"-style prefixes
+    for key in sorted(MODEL_PRICING, key=len, reverse=True):
+        if key in model_id:
+            in_price, out_price = MODEL_PRICING[key]
+            return (input_tokens * in_price + output_tokens * out_price) / 1_000_000
+    return 0.0
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a sequence (0 for an empty one)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class CallStats:
+    """Thread-safe accumulator for LLM call metrics, grouped by role."""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._window = window
+        self.reset()
+
+    def reset(self) -> None:
+        self._roles = defaultdict(lambda: {
+            "calls": 0,
+            "elapsed_sec": 0.0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cost_usd": 0.0,
+            "budget_tokens": 0,
+            "truncated": 0,
+            "discarded": 0,
+            "stop_reasons": defaultdict(int),
+            "models": set(),
+            "recent": deque(maxlen=self._window),
+        })
+        self._counters = defaultdict(int)
+
+    def record_call(self, role: str, model_id: str, elapsed: float,
+                    input_tokens: int = 0, output_tokens: int = 0,
+                    max_tokens: int = None, stop_reason: str = None) -> None:
+        with self._lock:
+            r = self._roles[role]
+            r["calls"] += 1
+            r["elapsed_sec"] += elapsed
+            r["input_tokens"] += input_tokens
+            r["output_tokens"] += output_tokens
+            r["cost_usd"] += estimate_cost(model_id, input_tokens, output_tokens)
+            r["models"].add(model_id)
+            r["recent"].append(elapsed)
+            if max_tokens:
+                r["budget_tokens"] += max_tokens
+            if stop_reason:
+                r["stop_reasons"][stop_reason] += 1
+                if stop_reason == "max_tokens":
+                    r["truncated"] += 1
+
+    def record_discarded(self, role: str, model_id: str, input_tokens: int = 0, output_tokens: int = 0) -> None:
+        """Tokens and cost of a request whose result was thrown away (a hedge loser)."""
+        with self._lock:
+            r = self._roles[role]
+            r["discarded"] += 1
+            r["input_tokens"] += input_tokens
+            r["output_tokens"] += output_tokens
+            r["cost_usd"] += estimate_cost(model_id, input_tokens, output_tokens)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def latency_percentile(self, role: str, pct: float) -> float | None:
+        """Percentile over the recent latency window of a role (None if no samples)."""
+        with self._lock:
+            recent = list(self._roles[role]["recent"]) if role in self._roles else []
+        return percentile(recent, pct) if recent else None
+
+    def sample_count(self, role: str) -> int:
+        with self._lock:
+            return len(self._roles[role]["recent"]) if role in self._roles else 0
+
+    def summary(self) -> dict:
+        with self._lock:
+            roles = {}
+            for role, r in self._roles.items():
+                if not r["calls"]:
+                    continue
+                recent = list(r["recent"])
+                roles[role] = {
+                    "calls": r["calls"],
+                    "models": sorted(r["models"]),
+                    "total_sec": round(r["elapsed_sec"], 2),
+                    "avg_sec": round(r["elapsed_sec"] / r["calls"], 2),
+                    "p50_sec": round(percentile(recent, 50), 2),
+                    "p95_sec": round(percentile(recent, 95), 2),
+                    "input_tokens": r["input_tokens"],
+                    "output_tokens": r["output_tokens"],
+                    "cost_usd": round(r["cost_usd"], 6),
+                    "truncated": r["truncated"],
+                    "discarded": r["discarded"],
+                    "budget_used": (round(r["output_tokens"] / r["budget_tokens"], 3)
+                                    if r["budget_tokens"] else None),
+                    "stop_reasons": dict(r["stop_reasons"]),
+                }
+            return {"roles": roles, "counters": dict(self._counters)}
+
+
+# Global stats instance
+stats = CallStats()
@@ -0,0 +1,457 @@
+"""Queryable SQLite results store across runs.
+
+Tables:
+    runs          one row per demo run (live or imported from results/run_*.json)
+    calls         one row per LLM call (role, model, region, latency, tokens)
+    metrics       long format: one row per (result entry, metric name) -- elapsed_sec,
+                  chars, preservation scores, Self-Refine final average
+    round_scores  one row per Self-Refine round
+
+A live run ingests incrementally through ``patterns.events``; existing JSON runs
+are loaded with ``import_json``. Query CLI:
+
+    python3 -m patterns.store import results/run_*.json
+    python3 -m patterns.store runs
+    python3 -m patterns.store latency --pattern reverse_neutralization --since 30
+    python3 -m patterns.store scores
+    python3 -m patterns.store sql "SELECT role, COUNT(*) FROM calls GROUP BY role"
+
+A live run records the collector timestamp as its ``run_key``; importing the
+JSON saved from the same run (``--store --save``) is skipped, as is a file
+imported before. All stored timestamps are local ISO 8601 to the second.
+"""
+
+import argparse
+import glob
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from patterns.display import print_table
+from patterns.events import subscribe, unsubscribe
+from patterns.stats import percentile
+
+DEFAULT_DB_PATH = os.path.join("results", "results.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  TEXT NOT NULL,
+    finished_at TEXT,
+    model_id    TEXT,
+    source      TEXT UNIQUE,
+    meta        TEXT,
+    run_key     TEXT
+);
+CREATE TABLE IF NOT EXISTS calls (
+    run_id        INTEGER NOT NULL REFERENCES runs(run_id),
+    ts            TEXT NOT NULL,
+    role          TEXT,
+    model_id      TEXT,
+    region        TEXT,
+    elapsed_sec   REAL,
+    input_tokens  INTEGER,
+    output_tokens INTEGER,
+    stop_reason   TEXT,
+    coalesced     INTEGER,
+    cache_hit     INTEGER,
+    max_tokens    INTEGER
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id   INTEGER NOT NULL REFERENCES runs(run_id),
+    ts       TEXT NOT NULL,
+    model_id TEXT,
+    pattern  TEXT,
+    advanced INTEGER,
+    scenario TEXT,
+    label    TEXT,
+    name     TEXT NOT NULL,
+    value    REAL
+);
+CREATE TABLE IF NOT EXISTS round_scores (
+    run_id        INTEGER NOT NULL REFERENCES runs(run_id),
+    ts            TEXT NOT NULL,
+    model_id      TEXT,
+    pattern       TEXT,
+    scenario      TEXT,
+    round         INTEGER,
+    type          TEXT,
+    avg           REAL,
+    elapsed_sec   REAL,
+    input_tokens  INTEGER,
+    output_tokens INTEGER,
+    scores        TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_model ON runs(model_id);
+CREATE INDEX IF NOT EXISTS idx_calls_run ON calls(run_id);
+CREATE INDEX IF NOT EXISTS idx_calls_model_role ON calls(model_id, role, ts);
+CREATE INDEX IF NOT EXISTS idx_metrics_run ON metrics(run_id);
+CREATE INDEX IF NOT EXISTS idx_metrics_lookup ON metrics(pattern, label, name, ts);
+CREATE INDEX IF NOT EXISTS idx_metrics_model ON metrics(model_id, pattern, scenario, ts);
+CREATE INDEX IF NOT EXISTS idx_rounds_run ON round_scores(run_id);
+CREATE INDEX IF NOT EXISTS idx_rounds_model ON round_scores(model_id, pattern, scenario, type, ts);
+"""
+
+# Entry fields stored as numeric metrics
+_NUMERIC_FIELDS = ("elapsed_sec", "chars_original", "chars_transformed", "chars", "avg_sentence_len")
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _ts(value: str | None) -> str:
+    """An ISO timestamp in the stored form (to the second); now if missing or unparseable."""
+    try:
+        return datetime.fromisoformat(value).isoformat(timespec="seconds")
+    except (TypeError, ValueError):
+        return _now()
+
+
+def entry_metrics(entry: dict) -> list[tuple]:
+    """(name, value) pairs extracted from one collector entry."""
+    out = []
+    for name in _NUMERIC_FIELDS:
+        if isinstance(entry.get(name), (int, float)):
+            out.append((name, entry[name]))
+    if "input" in entry and "chars_original" not in entry:
+        out.append(("chars_input", len(entry["input"] or "")))
+    if "output" in entry and "chars_transformed" not in entry:
+        out.append(("chars_output", len(entry["output"] or "")))
+    for key, value in (entry.get("tokens") or {}).items():
+        out.append((f"tokens.{key}", value))
+    metrics = entry.get("metrics") or {}
+    for key, value in metrics.items():
+        if isinstance(value, (int, float)):
+            out.append((f"preservation.{key}", value))
+    rounds = metrics.get("round_scores") or []
+    finals = [r for r in rounds if r.get("type") == "final" and not r.get("stale")]
+    if finals and isinstance(finals[-1].get("avg"), (int, float)):
+        out.append(("final_avg", finals[-1]["avg"]))
+    if (entry.get("cache") or {}).get("hit"):
+        out.append(("cache_hit", 1))
+    return out
+
+
+class ResultStore:
+    """SQLite-backed store; safe to share across threads."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+        self._live_run = None
+        self._handlers = {}
+
+    def close(self) -> None:
+        self.detach()
+        self._conn.close()
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a database was created."""
+        columns = {r["name"] for r in self._conn.execute("PRAGMA table_info(calls)")}
+        if "max_tokens" not in columns:
+            self._conn.execute("ALTER TABLE calls ADD COLUMN max_tokens INTEGER")
+        columns = {r["name"] for r in self._conn.execute("PRAGMA table_info(runs)")}
+        if "run_key" not in columns:
+            self._conn.execute("ALTER TABLE runs ADD COLUMN run_key TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_key ON runs(run_key)")
+
+    # -- writes -------------------------------------------------------------
+    def begin_run(self, model_id: str, started_at: str = None, source: str = None,
+                  meta: dict = None, run_key: str = None) -> int:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO runs (started_at, model_id, source, meta, run_key) VALUES (?, ?, ?, ?, ?)",
+                (started_at or _now(), model_id, source, json.dumps(meta or {}, ensure_ascii=False), run_key),
+            )
+            return cur.lastrowid
+
+    def finish_run(self, run_id: int, meta: dict = None, finished_at: str = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, meta = ? WHERE run_id = ?",
+                (finished_at or _now(), json.dumps(meta or {}, ensure_ascii=False, default=str), run_id),
+            )
+
+    def add_call(self, run_id: int, ts: str = None, **call) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO calls (run_id, ts, role, model_id, region, elapsed_sec, input_tokens, "
+                "output_tokens, stop_reason, coalesced, cache_hit, max_tokens) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, ts or _now(), call.get("role"), call.get("model_id"), call.get("region"),
+                 call.get("elapsed_sec"), call.get("input_tokens"), call.get("output_tokens"),
+                 call.get("stop_reason"), int(bool(call.get("coalesced"))),
+                 int(bool(call.get("cache_hit"))), call.get("max_tokens")),
+            )
+
+    def add_entry(self, run_id: int, pattern: str, entry: dict, model_id: str = None,
+                  advanced: bool = False, ts: str = None) -> None:
+        """Store one collector entry as metric rows (+ Self-Refine round rows)."""
+        ts = ts or _now()
+        scenario, label = entry.get("scenario"), entry.get("label")
+        metric_rows = [
+            (run_id, ts, model_id, pattern, int(bool(advanced)), scenario, label, name, value)
+            for name, value in entry_metrics(entry)
+        ]
+        round_rows = [
+            (run_id, ts, model_id, pattern, scenario, r.get("round"), r.get("type"), r.get("avg"),
+             r.get("elapsed_sec"), (r.get("tokens") or {}).get("input"),
+             (r.get("tokens") or {}).get("output"), json.dumps(r.get("scores", {}), ensure_ascii=False))
+            for r in (entry.get("metrics") or {}).get("round_scores") or []
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", metric_rows)
+            self._conn.executemany(
+                "INSERT INTO round_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", round_rows,
+            )
+
+    # -- live ingest --------------------------------------------------------
+    def attach(self, model_id: str, meta: dict = None, run_key: str = None) -> int:
+        """Start a live run and ingest calls/results as they are emitted.
+
+        ``run_key`` is the collector timestamp, so a later import of the saved JSON is skipped.
+        """
+        self.detach()
+        run_id = self.begin_run(model_id, meta=meta, source=None, run_key=run_key)
+        self._live_run = run_id
+        self._handlers = {
+            "call.end": lambda **call: self.add_call(run_id, **call),
+            "result.add": lambda pattern, advanced, model_id, entry: self.add_entry(
+                run_id, pattern, entry, model_id, advanced),
+        }
+        for event, fn in self._handlers.items():
+            subscribe(event, fn)
+        return run_id
+
+    def detach(self, meta: dict = None) -> None:
+        """Stop live ingest and close out the live run."""
+        for event, fn in self._handlers.items():
+            unsubscribe(event, fn)
+        self._handlers = {}
+        if self._live_run is not None:
+            self.finish_run(self._live_run, meta)
+            self._live_run = None
+
+    # -- import -------------------------------------------------------------
+    def import_json(self, path: str) -> int | None:
+        """Load a ``collector.save`` file; returns the run id, or None if already stored.
+
+        A run is already stored when the same file was imported or when it was
+        ingested live (same collector timestamp).
+        """
+        source = os.path.abspath(path)
+        with self._lock:
+            row = self._conn.execute("SELECT run_id FROM runs WHERE source = ?", (source,)).fetchone()
+        if row is not None:
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        run_key = data.get("timestamp")
+        if run_key:
+            with self._lock:
+                row = self._conn.execute("SELECT run_id FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+            if row is not None:
+                return None
+        ts = _ts(run_key)
+        run_model = data.get("model_id")
+        meta = {k: v for k, v in data.items() if k not in ("patterns", "model_id", "timestamp")}
+        run_id = self.begin_run(run_model, started_at=ts, source=source, meta=meta, run_key=run_key)
+        for p in data.get("patterns", []):
+            for entry in p.get("scenarios", []):
+                self.add_entry(run_id, p.get("pattern"), entry, p.get("model_id", run_model),
+                               p.get("advanced", False), ts)
+        self.finish_run(run_id, meta, finished_at=ts)
+        return run_id
+
+    # -- queries ------------------------------------------------------------
+    def query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def runs(self, limit: int = 20) -> list:
+        return self.query(
+            "SELECT r.run_id, r.started_at, r.model_id, COALESCE(r.source, 'live') AS source, "
+            "(SELECT COUNT(*) FROM calls c WHERE c.run_id = r.run_id) AS calls, "
+            "(SELECT COUNT(DISTINCT scenario || '|' || label) FROM metrics m "
+            " WHERE m.run_id = r.run_id) AS entries "
+            "FROM runs r ORDER BY r.started_at DESC LIMIT ?", (limit,),
+        )
+
+    def latency(self, pattern: str = None, label: str = None, model_id: str = None,
+                since_days: float = None, metric: str = "elapsed_sec") -> list[dict]:
+        """p50/p95 of an entry metric grouped by (model, pattern, label)."""
+        where, params = ["name = ?"], [metric]
+        for column, value in (("pattern", pattern), ("label", label), ("model_id", model_id)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since_days is not None:
+            where.append("ts >= ?")
+            params.append((datetime.now() - timedelta(days=since_days)).isoformat(timespec="seconds"))
+        rows = self.query(
+            f"SELECT model_id, pattern, label, value FROM metrics WHERE {' AND '.join(where)} "
+            "ORDER BY model_id, pattern, label", tuple(params),
+        )
+        groups = {}
+        for row in rows:
+            groups.setdefault((row["model_id"], row["pattern"], row["label"]), []).append(row["value"])
+        return [
+            {"model_id": m, "pattern": p, "label": l, "n": len(v),
+             "p50": percentile(v, 50), "p95": percentile(v, 95), "mean": sum(v) / len(v)}
+            for (m, p, l), v in groups.items()
+        ]
+
+    def final_scores(self, since_days: float = None) -> list:
+        """Average final Self-Refine score per model and task."""
+        where, params = ["type = 'final'"], []
+        if since_days is not None:
+            where.append("ts >= ?")
+            params.append((datetime.now() - timedelta(days=since_days)).isoformat(timespec="seconds"))
+        return self.query(
+            "SELECT model_id, scenario, COUNT(*) AS n, AVG(avg) AS mean_avg, MIN(avg) AS min_avg "
+            f"FROM round_scores WHERE {' AND '.join(where)} GROUP BY model_id, scenario "
+            "ORDER BY model_id, scenario", tuple(params),
+        )
+
+    def call_summary(self, since_days: float = None) -> list[dict]:
+        """Per (model, role) call count, latency percentiles and tokens."""
+        where, params = "", ()
+        if since_days is not None:
+            where = "WHERE ts >= ?"
+            params = ((datetime.now() - timedelta(days=since_days)).isoformat(timespec="seconds"),)
+        rows = self.query(
+            f"SELECT model_id, role, elapsed_sec, input_tokens, output_tokens, stop_reason, max_tokens "
+            f"FROM calls {where} "
+            "ORDER BY model_id, role", params,
+        )
+        groups = {}
+        for row in rows:
+            groups.setdefault((row["model_id"], row["role"]), []).append(row)
+        return [
+            {"model_id": m, "role": r, "calls": len(v),
+             "p50": percentile([x["elapsed_sec"] for x in v], 50),
+             "p95": percentile([x["elapsed_sec"] for x in v], 95),
+             "input_tokens": sum(x["input_tokens"] or 0 for x in v),
+             "output_tokens": sum(x["output_tokens"] or 0 for x in v),
+             "truncated": sum(1 for x in v if x["stop_reason"] == "max_tokens"),
+             "p95_budget_used": percentile([x["output_tokens"] / x["max_tokens"]
+                                            for x in v if x["max_tokens"]], 95)}
+            for (m, r), v in groups.items()
+        ]
+
+
+def read_query(path: str, sql: str, params: tuple = ()) -> list:
+    """Run ``sql`` on a read-only connection (writes fail with ``sqlite3.OperationalError``)."""
+    conn = sqlite3.connect(f"{pathlib.Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+_store = None
+
+
+def enable_store(path: str = DEFAULT_DB_PATH) -> ResultStore:
+    """Open the global results store used by ``demo.py --store``."""
+    global _store
+    _store = ResultStore(path)
+    return _store
+
+
+def get_store() -> ResultStore | None:
+    return _store
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+def _short(model_id: str | None) -> str:
+    return (model_id or "-").split(".")[-1][:28]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Query the SQLite results store")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help=f"Database path (default: {DEFAULT_DB_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="Import saved JSON runs (already imported files are skipped)")
+    p.add_argument("paths", nargs="*", help="run_*.json files (default: results/run_*.json)")
+
+    p = sub.add_parser("runs", help="List recent runs")
+    p.add_argument("--limit", type=int, default=20)
+
+    p = sub.add_parser("latency", help="p50/p95 of an entry metric per model/pattern/label")
+    p.add_argument("--pattern", help="style_transfer | reverse_neutralization | content_optimization")
+    p.add_argument("--label", help="Style or persona label (e.g. 'Security Expert (CISO)')")
+    p.add_argument("--model", help="Model ID")
+    p.add_argument("--metric", default="elapsed_sec", help="Metric name (default: elapsed_sec)")
+    p.add_argument("--since", type=float, default=None, metavar="DAYS", help="Only the last N days")
+
+    p = sub.add_parser("scores", help="Average final Self-Refine score per model/task")
+    p.add_argument("--since", type=float, default=None, metavar="DAYS")
+
+    p = sub.add_parser("calls", help="LLM call latency/tokens per model/role")
+    p.add_argument("--since", type=float, default=None, metavar="DAYS")
+
+    p = sub.add_parser("sql", help="Run an arbitrary read query")
+    p.add_argument("statement")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "sql":
+        try:
+            rows = read_query(args.db, args.statement)
+        except sqlite3.Error as e:
+            raise SystemExit(f"  {e}")
+        if rows:
+            print_table(list(rows[0].keys()), [tuple(r) for r in rows])
+        return
+    store = ResultStore(args.db)
+
+    if args.command == "import":
+        paths = args.paths or sorted(glob.glob(os.path.join("results", "run_*.json")))
+        imported = 0
+        for path in paths:
+            if store.import_json(path) is not None:
+                imported += 1
+        print(f"  Imported {imported} run(s), skipped {len(paths) - imported} into {args.db}")
+    elif args.command == "runs":
+        print_table(["Run", "Started", "Model", "Calls", "Entries", "Source"],
+                    [(r["run_id"], r["started_at"], _short(r["model_id"]), r["calls"], r["entries"],
+                      os.path.basename(r["source"])) for r in store.runs(args.limit)])
+    elif args.command == "latency":
+        rows = store.latency(args.pattern, args.label, args.model, args.since, args.metric)
+        print_table(["Model", "Pattern", "Label", "N", "P50", "P95", "Mean"],
+                    [(_short(r["model_id"]), r["pattern"], r["label"], r["n"],
+                      f"{r['p50']:.2f}", f"{r['p95']:.2f}", f"{r['mean']:.2f}") for r in rows])
+    elif args.command == "scores":
+        print_table(["Model", "Task", "N", "Mean final", "Min final"],
+                    [(_short(r["model_id"]), r["scenario"], r["n"], f"{r['mean_avg']:.2f}",
+                      f"{r['min_avg']:.2f}") for r in store.final_scores(args.since)])
+    elif args.command == "calls":
+        print_table(["Model", "Role", "Calls", "P50", "P95", "InTok", "OutTok", "Trunc", "P95 budget"],
+                    [(_short(r["model_id"]), r["role"], r["calls"], f"{r['p50']:.2f}s",
+                      f"{r['p95']:.2f}s", r["input_tokens"], r["output_tokens"], r["truncated"],
+                      f"{r['p95_budget_used']:.0%}")
+                     for r in store.call_summary(args.since)])
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Lightweight tracing: nested spans (run -> pattern -> scenario -> call) with pluggable exporters.
+
+Spans are only recorded after ``enable_tracing()``; otherwise ``span()`` is a no-op.
+The default exporter writes OTLP/JSON files that standard trace viewers can load
+without a live collector.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A single timed operation with attributes."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = {k: v for k, v in attributes.items() if v is not None}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "ok"
+        self.error = None
+
+    def set_attribute(self, key: str, value) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attrs) -> None:
+        for k, v in attrs.items():
+            self.set_attribute(k, v)
+
+    @property
+    def duration_sec(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e9
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_sec": round(self.duration_sec, 4),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span stand-in used while tracing is disabled."""
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def set_attributes(self, **attrs) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+class InMemoryExporter:
+    """Keep exported spans in a list (useful for tests and ad-hoc inspection)."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans: list) -> None:
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list, service_name: str = "output-control-patterns-demo") -> dict:
+    """Convert spans to an OTLP/JSON ``ExportTraceServiceRequest`` document."""
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": service_name}}],
+            },
+            "scopeSpans": [{
+                "scope": {"name": "patterns.tracing"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                        "attributes": [
+                            {"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()
+                        ],
+                        "status": (
+                            {"code": 2, "message": s.error or ""} if s.status == "error" else {"code": 1}
+                        ),
+                    }
+                    for s in spans
+                ],
+            }],
+        }],
+    }
+
+
+class JsonFileExporter:
+    """Write spans to a local OTLP/JSON file on shutdown (default exporter)."""
+
+    def __init__(self, path: str = None, output_dir: str = "results"):
+        if path is None:
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(output_dir, f"trace_{ts}.json")
+        self.path = path
+        self._spans = []
+
+    def export(self, spans: list) -> None:
+        self._spans.extend(spans)
+
+    def shutdown(self) -> None:
+        if not self._spans:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(to_otlp(self._spans), f, ensure_ascii=False)
+
+
+# ---------------------------------------------------------------------------
+# Tracer
+# ---------------------------------------------------------------------------
+class Tracer:
+    """Collect finished spans and hand them to the exporter."""
+
+    def __init__(self):
+        self.enabled = False
+        self.exporter = None
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def finish(self, s: Span) -> None:
+        with self._lock:
+            self._pending.append(s)
+
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._pending = self._pending, []
+        if self.exporter is not None and spans:
+            self.exporter.export(spans)
+
+    def shutdown(self) -> None:
+        self.flush()
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+_tracer = Tracer()
+
+
+def enable_tracing(exporter=None) -> None:
+    """Start recording spans. Defaults to a ``JsonFileExporter`` under results/."""
+    _tracer.exporter = exporter if exporter is not None else JsonFileExporter()
+    _tracer.enabled = True
+
+
+def tracing_enabled() -> bool:
+    return _tracer.enabled
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans to the exporter and stop recording."""
+    _tracer.shutdown()
+    _tracer.enabled = False
+
+
+def current_span():
+    """Return the active span (a no-op span if none/disabled)."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Open a child span of the current span for the duration of the block."""
+    if not _tracer.enabled:
+        yield _NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    trace_id = parent.trace_id if parent else uuid.uuid4().hex
+    s = Span(name, trace_id, parent.span_id if parent else None, attributes)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current_span.reset(token)
+        _tracer.finish(s)
+
+
+def traced(name: str, **attributes):
+    """Decorator form of ``span()`` (for plain and ``async def`` functions)."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
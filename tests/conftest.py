@@ -0,0 +1,17 @@
+import pytest
+
+from patterns import bedrock
+from patterns.stats import stats
+
+
+@pytest.fixture(autouse=True)
+def offline_backend():
+    """Every test starts on the fake backend with empty clients, stats and no hedging."""
+    bedrock.set_backend("fake")
+    bedrock.set_client_factory(None)
+    bedrock.disable_hedging()
+    stats.reset()
+    yield
+    bedrock.set_client_factory(None)
+    bedrock.disable_hedging()
+    stats.reset()
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from patterns import bedrock
+from patterns.backends import client_error
+from patterns.content_optimization import ademo_content_optimization
+from patterns.display import collector
+from patterns.fake import FakeBedrockClient
+from patterns.registry import personas, styles, tasks
+from patterns.reverse_neutralization import ademo_reverse_neutralization, ask_persona
+from patterns.style_transfer import ademo_style_transfer, atransform_style, transform_style
+
+
+class _FailingFake(FakeBedrockClient):
+    """Fake backend that fails every call whose system prompt contains ``marker``."""
+
+    def __init__(self, marker: str):
+        super().__init__(latency=0.0, jitter=0.0)
+        self.marker = marker
+
+    def _check(self, kwargs):
+        if self.marker in kwargs["system"][0]["text"]:
+            raise client_error("ValidationException", "bad request (fake)", 400)
+
+    def converse(self, **kwargs):
+        self._check(kwargs)
+        return super().converse(**kwargs)
+
+    async def aconverse(self, **kwargs):
+        self._check(kwargs)
+        return await super().aconverse(**kwargs)
+
+
+@pytest.fixture(autouse=True)
+def fresh_collector(monkeypatch):
+    monkeypatch.setattr(collector, "results", [])
+
+
+def _fail_on(marker: str) -> None:
+    fake = _FailingFake(marker)
+    bedrock.set_client_factory(lambda region: fake)
+
+
+def test_run_steps_and_arun_steps_agree():
+    entry = transform_style("서버가 또 터졌어요.", "business-formal", coalesce=False)
+    aentry = asyncio.run(atransform_style("서버가 또 터졌어요.", "business-formal", coalesce=False))
+    assert entry["output"] == aentry["output"]
+    assert entry["style"] == aentry["style"] == styles.get("business-formal")["name"]
+
+
+def test_run_steps_raises_call_errors():
+    _fail_on(personas.get("neutral")["system"])
+    with pytest.raises(Exception, match="bad request"):
+        ask_persona("질문입니다.")
+
+
+def test_async_style_transfer_keeps_answers_around_a_failed_call():
+    _fail_on(styles.get("tech-report")["system"])
+    result = asyncio.run(ademo_style_transfer(json_mode=True))
+    labels = [o["style"] for s in result["scenarios"] for o in s["outputs"]]
+    assert labels and styles.get("tech-report")["name"] not in labels
+    assert {f["label"] for f in result["failures"]} == {"tech-report"}
+    assert "bad request" in result["failures"][0]["error"]
+    assert len(collector.results[-1]["scenarios"]) == len(labels)
+
+
+def test_async_reverse_neutralization_reports_failed_persona():
+    _fail_on(personas.get("neutral")["system"])
+    result = asyncio.run(ademo_reverse_neutralization(json_mode=True))
+    assert [f["label"] for f in result["failures"]] == ["neutral"]
+    assert all(s["outputs"] for s in result["scenarios"])
+
+
+def test_async_self_refine_keeps_the_task_that_finished():
+    _fail_on(tasks.get("advanced-blog")["role_ko"])
+    result = asyncio.run(ademo_content_optimization(advanced=True, json_mode=True))
+    assert [t["task"] for t in result["tasks"]] == [tasks.get("advanced")["name"]]
+    assert [f["scenario"] for f in result["failures"]] == [tasks.get("advanced-blog")["name"]]
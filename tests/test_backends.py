@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from patterns import bedrock
+from patterns.backends import BACKENDS, ClientError, OpenAICompatBackend, create_backend
+from patterns.fake import FakeBedrockClient
+from patterns.metrics import parse_preservation, preservation_request
+from patterns.regions import is_throttle
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+def test_backend_from_env(monkeypatch):
+    monkeypatch.setattr(bedrock, "_backend", None)
+    monkeypatch.setenv("LLM_BACKEND", "openai")
+    assert bedrock.get_backend() == "openai"
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError, match="unknown backend"):
+        bedrock.set_backend("nope")
+    with pytest.raises(ValueError):
+        create_backend("nope", "us-west-2")
+
+
+def test_non_bedrock_backends_need_no_boto3():
+    assert isinstance(create_backend("fake", "r1"), FakeBedrockClient)
+    assert isinstance(create_backend("openai", "r1"), OpenAICompatBackend)
+    assert set(BACKENDS) == {"bedrock", "openai", "fake"}
+
+
+# ---------------------------------------------------------------------------
+# Fake
+# ---------------------------------------------------------------------------
+def test_fake_converse_end_to_end():
+    result = bedrock.converse("You are terse.", "hello there", max_tokens=64, role="generate")
+    assert result["text"].startswith("[fake:You are terse.]")
+    assert result["stop_reason"] == "end_turn"
+    assert result["input_tokens"] > 0 and result["output_tokens"] > 0
+
+
+def test_fake_throttle_is_a_client_error():
+    fake = FakeBedrockClient(latency=0.0, jitter=0.0, throttle_rate=1.0)
+    bedrock.set_client_factory(lambda region: fake)
+    with pytest.raises(ClientError) as info:
+        bedrock.converse("s", "u", coalesce=False)
+    assert is_throttle(info.value)
+
+
+def test_fake_judge_scores_parse():
+    result = bedrock.converse(**preservation_request("원문입니다.", "Transformed text."))
+    assert result["stop_reason"] == "stop_sequence"
+    assert parse_preservation(result) == {"preservation": 5, "no_distortion": 4, "tone_shift": 5}
+
+
+# ---------------------------------------------------------------------------
+# OpenAI-compatible
+# ---------------------------------------------------------------------------
+class _ChatHandler(BaseHTTPRequestHandler):
+    """Answers like llama.cpp: a matched stop string is dropped and finish_reason is "stop"."""
+
+    status = 200
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.payloads.append(payload)
+        if self.status != 200:
+            body = b'{"error": "slow down"}'
+        else:
+            text = json.dumps({"preservation": 4, "no_distortion": 5, "tone_shift": 3})
+            for stop in payload.get("stop", []):
+                text = text.split(stop)[0]
+            body = json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 11, "completion_tokens": 7},
+            }).encode("utf-8")
+        self.send_response(self.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def chat_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    server.payloads = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _openai(server, **kwargs):
+    return OpenAICompatBackend(base_url=f"http://127.0.0.1:{server.server_port}/v1", model="local", **kwargs)
+
+
+def test_openai_judge_sync_and_async(chat_server):
+    client = _openai(chat_server)
+    bedrock.set_client_factory(lambda region: client)
+    request = preservation_request("원문입니다.", "Transformed text.")
+    expected = {"preservation": 4, "no_distortion": 5, "tone_shift": 3}
+
+    result = bedrock.converse(**request)
+    assert result["stop_reason"] == "end_turn"
+    assert (result["input_tokens"], result["output_tokens"]) == (11, 7)
+    assert parse_preservation(result) == expected
+    assert parse_preservation(asyncio.run(bedrock.aconverse(**request))) == expected
+
+    payload = chat_server.payloads[0]
+    assert payload["model"] == "local"
+    assert payload["stop"] == ["}"]
+    assert payload["messages"][0]["role"] == "system"
+
+
+def test_openai_throttle_maps_to_throttling_exception(chat_server, monkeypatch):
+    monkeypatch.setattr(_ChatHandler, "status", 429)
+    client = _openai(chat_server, max_attempts=1)
+    with pytest.raises(ClientError) as info:
+        client.converse(modelId="m", system=[{"text": "s"}], messages=[{"role": "user", "content": [{"text": "u"}]}])
+    assert is_throttle(info.value)
+    with pytest.raises(ClientError):
+        asyncio.run(client.aconverse(modelId="m", system=[], messages=[{"role": "user", "content": [{"text": "u"}]}]))
+
+
+def test_openai_named_stop_string_is_stop_sequence():
+    data = {"choices": [{"message": {"content": '{"a": 1'}, "finish_reason": "stop", "stop_reason": "}"}]}
+    assert OpenAICompatBackend._response(data, 0, 0.1)["stopReason"] == "stop_sequence"
+    data["choices"][0].pop("stop_reason")
+    assert OpenAICompatBackend._response(data, 0, 0.1)["stopReason"] == "end_turn"
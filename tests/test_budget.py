@@ -0,0 +1,32 @@
+import pytest
+
+from patterns.budget import MIN_BUDGET, output_budget
+from patterns.registry import scenarios, styles
+
+SHORT = "서버가 느려요."
+
+
+def test_budget_scales_with_input_and_is_capped():
+    short = output_budget("Rewrite the text.", source_text=SHORT)
+    long = output_budget("Rewrite the text.", source_text=SHORT * 40)
+    assert short == MIN_BUDGET
+    assert short < long == 1024
+
+
+def test_stated_constraint_wins_over_input_length():
+    assert output_budget("Answer in 3 sentences.", source_text=SHORT * 40) == int((3 * 60 + 64) * 1.5)
+    assert output_budget("No limits stated.") == 1024
+
+
+def test_floor_raises_short_inputs_but_not_the_cap():
+    assert output_budget("Rewrite.", source_text=SHORT, floor=900) == 900
+    assert output_budget("Rewrite.", source_text=SHORT, floor=4000) == 1024
+    assert output_budget("Rewrite.", source_text=SHORT, floor=None) == MIN_BUDGET
+
+
+@pytest.mark.parametrize("style_key", ["medical-opinion", "legal-opinion"])
+def test_long_form_styles_get_their_floor_on_every_scenario(style_key):
+    style = styles.get(style_key)
+    for key in scenarios.keys():
+        text = scenarios.get(key)["input"]
+        assert output_budget(style["system"], source_text=text, floor=style.get("min_tokens")) >= 900
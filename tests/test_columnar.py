@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from patterns.columnar import export_data, read_entries  # noqa: E402
+
+RUN = {
+    "timestamp": "2026-01-02T03:04:05.123456",
+    "model_id": "model-a",
+    "patterns": [{"pattern": "style_transfer", "scenarios": [
+        {"scenario": "it-incident", "label": "Business Formal", "input": "a", "output": "b", "elapsed_sec": 1.2},
+    ]}],
+}
+
+
+def test_export_skips_a_run_present_in_the_other_format(tmp_path):
+    out = str(tmp_path)
+    assert export_data(RUN, "run_1", out, "arrow")
+    assert export_data(RUN, "run_1", out, "parquet") is None
+    assert read_entries(out).num_rows == 1
+
+
+def test_mixed_format_directory_is_rejected(tmp_path):
+    out = str(tmp_path)
+    export_data(RUN, "run_1", out, "parquet")
+    with pytest.raises(ValueError, match="already holds parquet"):
+        export_data(RUN, "run_2", out, "arrow")
+    (tmp_path / "entries" / "run_3.arrow").write_bytes(b"")
+    with pytest.raises(ValueError, match="mixes arrow and parquet"):
+        read_entries(out)
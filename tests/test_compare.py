@@ -0,0 +1,33 @@
+import json
+
+from patterns.compare import main
+
+
+def _run(path, output: str, input_tokens: int) -> str:
+    entry = {"scenario": "it-incident", "label": "Business Formal", "output": output, "elapsed_sec": 1.0,
+             "tokens": {"input": input_tokens, "output": 50}}
+    path.write_text(json.dumps({"patterns": [{"pattern": "style_transfer", "scenarios": [entry]}]}))
+    return str(path)
+
+
+def _strict(text: str) -> dict:
+    def reject(name):
+        raise ValueError(f"non-standard JSON constant {name}")
+    return json.loads(text, parse_constant=reject)
+
+
+def test_change_from_zero_is_null_in_json(tmp_path, capsys):
+    base = _run(tmp_path / "a.json", "same", 0)
+    cand = _run(tmp_path / "b.json", "same", 120)
+    assert main([base, cand, "--output", "json"]) == 1
+    rows = {r["metric"]: r for r in _strict(capsys.readouterr().out)["rows"]}
+    assert rows["tokens.input"]["delta_pct"] is None
+    assert rows["tokens.input"]["regression"] is True
+    assert rows["tokens.output"]["delta_pct"] == 0.0
+
+
+def test_change_from_zero_in_text_report(tmp_path, capsys):
+    base = _run(tmp_path / "a.json", "same", 0)
+    cand = _run(tmp_path / "b.json", "same", 120)
+    main([base, cand])
+    assert "n/a" in capsys.readouterr().out
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from patterns import content_optimization, reverse_neutralization
+from patterns.compare import entry_values
+from patterns.display import collector
+from patterns.registry import personas, tasks
+
+
+@pytest.fixture(autouse=True)
+def fresh_collector(monkeypatch):
+    monkeypatch.setattr(collector, "results", [])
+
+
+def _skip_only(action: str, **match):
+    def should_skip(skipped_action, role, **detail):
+        return skipped_action == action and all(detail.get(k) == v for k, v in match.items())
+    return should_skip
+
+
+def test_skipped_neutral_baseline_keeps_the_persona_answers(monkeypatch):
+    monkeypatch.setattr(reverse_neutralization, "should_skip", _skip_only("persona", persona="neutral"))
+    neutral = personas.get("neutral")["name"]
+    for result in (reverse_neutralization.demo_reverse_neutralization(json_mode=True),
+                   asyncio.run(reverse_neutralization.ademo_reverse_neutralization(json_mode=True))):
+        answered = [o["persona"] for s in result["scenarios"] for o in s["outputs"]]
+        assert answered and neutral not in answered
+
+
+def test_skipped_final_evaluation_is_marked_stale(monkeypatch):
+    monkeypatch.setattr(content_optimization, "should_skip", _skip_only("final_evaluation"))
+    round_scores, _ = content_optimization.run_self_refine(tasks.get("advanced"), verbose=False)
+    final = round_scores[-1]
+    assert final["type"] == "final" and final["stale"] is True
+    assert final["carried_from"] == round_scores[-2]["round"]
+    assert final["scores"] == round_scores[-2]["scores"]
+    assert "round.final.avg" not in entry_values({"metrics": {"round_scores": round_scores}})
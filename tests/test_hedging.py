@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+from patterns import bedrock
+from patterns.fake import FakeBedrockClient
+from patterns.hedging import Hedger
+from patterns.stats import stats
+
+MODEL = "global.anthropic.claude-sonnet-4-5-20250929-v1:0"
+KWARGS = {"modelId": MODEL, "system": [{"text": "s"}], "messages": [{"role": "user", "content": [{"text": "u"}]}]}
+
+
+def _fake(**kwargs) -> FakeBedrockClient:
+    return FakeBedrockClient(**{"latency": 0.01, "jitter": 0.0, "outlier_latency": 0.15, "seed": 7, **kwargs})
+
+
+def _run(hedger: Hedger, fake: FakeBedrockClient, n: int) -> None:
+    for _ in range(n):
+        hedger.run("generate", lambda: fake.converse(**KWARGS), MODEL)
+
+
+def test_no_hedge_without_outliers():
+    hedger = Hedger(min_samples=5, min_delay=0.02, max_rate=1.0)
+    _run(hedger, _fake(), 40)
+    assert hedger.report()["fired"] == 0
+
+
+def test_hedge_fires_on_ten_percent_outliers():
+    # p95 of the primaries is the outlier latency itself; the median cap keeps hedging useful
+    hedger = Hedger(min_samples=5, min_delay=0.02, max_rate=0.5)
+    fake = _fake(outlier_rate=0.1)
+    _run(hedger, fake, 60)
+    report = hedger.report()
+    assert report["fired"] >= 2
+    assert report["won"] >= 1
+    assert hedger.threshold("generate") < 0.15
+
+
+def test_hedge_rate_is_capped():
+    hedger = Hedger(min_samples=5, min_delay=0.02, max_rate=0.2)
+    fake = _fake()
+    _run(hedger, fake, 10)
+    fake.outlier_rate = 1.0
+    _run(hedger, fake, 10)
+    report = hedger.report()
+    assert 1 <= report["fired"] <= 0.2 * report["calls"]
+
+
+def test_queueing_for_a_worker_does_not_trigger_hedges():
+    # Queued callers wait ~0.1-0.2s for the single worker, well past the 0.06s hedge delay
+    hedger = Hedger(min_samples=5, min_delay=0.06, max_rate=1.0, max_workers=1)
+    fake = _fake(latency=0.03)
+    _run(hedger, fake, 10)
+    threads = [threading.Thread(target=_run, args=(hedger, fake, 2)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert hedger.report()["fired"] == 0
+
+
+def test_discarded_request_usage_is_recorded():
+    fake = _fake(outlier_rate=0.2)
+    bedrock.set_client_factory(lambda region: fake)
+    hedger = bedrock.enable_hedging(Hedger(min_samples=5, min_delay=0.02, max_rate=1.0))
+    per_call = bedrock.converse("s", "u", coalesce=False)["input_tokens"]
+    for _ in range(30):
+        bedrock.converse("s", "u", coalesce=False)
+    assert hedger.report()["fired"] > 0
+    time.sleep(0.3)  # losing primaries finish in the background
+    role = stats.summary()["roles"]["generate"]
+    assert role["calls"] == 31
+    assert role["discarded"] == hedger.report()["fired"]
+    assert role["input_tokens"] == (role["calls"] + role["discarded"]) * per_call
+
+
+def test_async_hedge_fires_and_cancels_loser():
+    hedger = Hedger(min_samples=5, min_delay=0.02, max_rate=0.5)
+    fake = _fake(outlier_rate=0.1)
+
+    async def main():
+        for _ in range(60):
+            await hedger.arun("generate", lambda: fake.aconverse(**KWARGS), MODEL)
+
+    asyncio.run(main())
+    report = hedger.report()
+    assert report["fired"] >= 2 and report["won"] >= 1
+
+
+def test_converse_with_hedging_on_fake_backend():
+    fake = _fake(outlier_rate=0.1)
+    bedrock.set_client_factory(lambda region: fake)
+    hedger = bedrock.enable_hedging(Hedger(min_samples=5, min_delay=0.02, max_rate=0.5))
+    for i in range(40):
+        bedrock.converse("s", f"u{i}", coalesce=False)
+    assert hedger.report()["calls"] == 40
+    assert stats.summary()["roles"]["generate"]["calls"] == 40
@@ -0,0 +1,62 @@
+from patterns import bedrock
+from patterns.fake import FakeBedrockClient
+from patterns.loadtest import PromptCycle, build_prompt_mix, print_report, recommend, run_closed_step, summarize_step
+
+
+def _step(level, rps, throttle=0.0, retried=0.0, errors=0.0, p90=1.0):
+    return {"mode": "concurrency", "level": level, "requests": 10, "attempts": 10, "ok": 10,
+            "throughput_rps": rps, "p50_sec": p90 / 2, "p90_sec": p90, "p99_sec": p90,
+            "throttle_pct": throttle, "retried_pct": retried, "error_pct": errors,
+            "input_tokens_per_sec": 0.0, "output_tokens_per_sec": 0.0}
+
+
+def _sample(outcome, attempts=1, throttles=0):
+    return {"outcome": outcome, "latency": 0.5, "retries": 0, "attempts": attempts, "throttles": throttles,
+            "input_tokens": 10, "output_tokens": 5, "end": 1.0}
+
+
+def test_throttles_count_once_per_logical_request():
+    samples = [_sample("ok"), _sample("ok", attempts=5, throttles=4), _sample("throttled", attempts=9, throttles=9),
+               _sample("ok")]
+    step = summarize_step("concurrency", 8, samples, elapsed=1.0)
+    assert (step["requests"], step["attempts"], step["ok"]) == (4, 16, 3)
+    assert step["throttle_pct"] == 50.0
+    assert step["throttled_attempts_pct"] == 81.2
+
+
+def test_recommend_picks_smallest_level_near_the_best_healthy_throughput():
+    steps = [_step(1, 2.0), _step(2, 3.8), _step(4, 7.3), _step(8, 7.9), _step(16, 12.0, throttle=40.0)]
+    rec = recommend(steps)
+    assert rec["healthy"] and rec["level"] == 4
+    assert (rec["best_level"], rec["best_throughput_rps"]) == (8, 7.9)
+
+
+def test_recommend_applies_latency_and_retry_limits():
+    steps = [_step(1, 2.0), _step(2, 3.9, retried=0.6), _step(4, 7.0, retried=0.6), _step(8, 7.5, p90=30.0)]
+    assert recommend(steps, max_p90_sec=10)["level"] == 4
+    assert recommend(steps, max_throttle_pct=0.5, max_p90_sec=10)["level"] == 1
+
+
+def test_recommend_without_a_healthy_step_suggests_starting_lower():
+    rec = recommend([_step(4, 5.0, throttle=10.0), _step(2, 3.0, errors=5.0)])
+    assert not rec["healthy"] and rec["level"] == 2
+    assert recommend([])["level"] is None
+
+
+def test_capacity_curve_marks_only_the_recommended_step(capsys):
+    steps = [_step(1, 2.0), _step(4, 7.3), _step(8, 7.9, throttle=6.7)]
+    print_report(steps, recommend(steps))
+    curve = capsys.readouterr().out.split("Capacity curve")[1].splitlines()
+    marked = [line for line in curve if "<- recommended" in line]
+    assert len(marked) == 1 and marked[0].strip().startswith("4 |")
+    assert any("(throttled 6.7% of requests)" in line for line in curve)
+
+
+def test_closed_step_resends_throttled_requests_as_attempts():
+    fake = FakeBedrockClient(latency=0.05, jitter=0.0, max_inflight=2)
+    bedrock.set_client_factory(lambda region: fake)
+    samples, _ = run_closed_step(PromptCycle(build_prompt_mix()), concurrency=4, duration=0.4)
+    step = summarize_step("concurrency", 4, samples, elapsed=0.4)
+    assert step["attempts"] > step["requests"]
+    assert step["ok"] + sum(1 for s in samples if s["outcome"] != "ok") == step["requests"]
+    assert all(s["throttles"] == s["attempts"] - 1 for s in samples if s["outcome"] == "ok")
@@ -0,0 +1,36 @@
+import io
+
+from patterns import bedrock
+from patterns.events import emit
+from patterns.fake import FakeBedrockClient
+from patterns.progress import ProgressDashboard
+from patterns.regions import RegionPool
+
+
+def _dashboard() -> ProgressDashboard:
+    return ProgressDashboard(stream=io.StringIO(), interval=3600).attach()
+
+
+def test_retries_alone_are_not_throttles():
+    progress = _dashboard()
+    try:
+        emit("call.end", call_id=1, elapsed_sec=0.1, retries=2, throttled=0)
+        emit("call.end", call_id=2, elapsed_sec=0.1, retries=1, throttled=1)
+    finally:
+        progress.detach()
+    assert progress.snapshot()["throttle_pct"] == 50.0
+
+
+def test_failover_from_a_throttled_region_is_counted(monkeypatch):
+    clients = {"r1": FakeBedrockClient(latency=0.0, jitter=0.0, throttle_rate=1.0),
+               "r2": FakeBedrockClient(latency=0.0, jitter=0.0)}
+    pool = RegionPool(["r1", "r2"], weights={"r1": 1000.0, "r2": 0.001})  # r1 is always tried first
+    bedrock.set_client_factory(lambda region: clients[region])
+    monkeypatch.setattr(bedrock, "get_region_pool", lambda: pool)
+    progress = _dashboard()
+    try:
+        bedrock.converse("s", "u", coalesce=False)
+    finally:
+        progress.detach()
+    snap = progress.snapshot()
+    assert snap["completed"] == 1 and snap["throttle_pct"] == 100.0
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+
+from patterns.backends import client_error
+from patterns.deadline import deadline_scope
+from patterns.regions import RegionPool, is_throttle
+
+
+class _Quota:
+    """Every region shares one quota that throttles the first ``throttled`` attempts."""
+
+    def __init__(self, throttled: int):
+        self.throttled = throttled
+        self.attempts = []
+
+    def __call__(self, region):
+        self.attempts.append(region)
+        if len(self.attempts) <= self.throttled:
+            raise client_error("ThrottlingException", "Rate exceeded", 429)
+        return {"region": region}
+
+    async def acall(self, region):
+        return self(region)
+
+
+def _pool(**kwargs) -> RegionPool:
+    return RegionPool(["r1", "r2"], **{"backoff": 0.02, "max_backoff": 0.05, **kwargs})
+
+
+def test_all_regions_throttled_backs_off_and_retries():
+    quota = _Quota(throttled=2)
+    assert _pool().call(quota) in ({"region": "r1"}, {"region": "r2"})
+    assert len(quota.attempts) == 3
+
+
+def test_all_regions_throttled_every_round_raises_after_all_rounds():
+    quota = _Quota(throttled=100)
+    with pytest.raises(Exception) as info:
+        _pool(rounds=3).call(quota)
+    assert is_throttle(info.value)
+    assert len(quota.attempts) == 6
+
+
+def test_async_all_regions_throttled_backs_off_and_retries():
+    quota = _Quota(throttled=2)
+    assert asyncio.run(_pool().acall(quota.acall))
+    assert len(quota.attempts) == 3
+
+
+def test_backoff_that_misses_the_deadline_raises_at_once():
+    quota = _Quota(throttled=100)
+    start = time.monotonic()
+    with deadline_scope(0.5), pytest.raises(Exception) as info:
+        _pool(backoff=5.0, max_backoff=5.0).call(quota)
+    assert is_throttle(info.value)
+    assert time.monotonic() - start < 0.5
+
+
+def test_non_retryable_error_is_not_retried():
+    attempts = []
+
+    def bad(region):
+        attempts.append(region)
+        raise client_error("ValidationException", "bad", 400)
+
+    with pytest.raises(Exception):
+        _pool().call(bad)
+    assert len(attempts) == 1
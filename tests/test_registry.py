@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from patterns import registry
+
+
+@pytest.fixture
+def catalog_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "_catalog_dirs", [])
+    yield tmp_path
+    for catalog in registry.CATALOGS.values():
+        catalog.reset()
+
+
+def test_builtin_catalogues_resolve():
+    assert registry.check_references() == []
+
+
+def test_check_reports_unknown_basic_style(catalog_dir):
+    (catalog_dir / "scenarios.json").write_text(json.dumps({"extra": {
+        "name": "Extra", "input": "x", "styles_basic": ["no-such-style"], "styles_advanced": [],
+    }}))
+    registry.add_catalog(str(catalog_dir))
+    assert registry.check_references() == [
+        "scenario 'extra' styles_basic references unknown styles: no-such-style",
+    ]
+
+
+def test_check_reports_bad_style_floor(catalog_dir):
+    (catalog_dir / "styles.json").write_text(json.dumps({"terse": {
+        "name": "Terse", "system": "Be terse.", "min_tokens": "lots",
+    }}))
+    registry.add_catalog(str(catalog_dir))
+    assert registry.check_references() == ["style 'terse' min_tokens must be a positive integer"]
+
+
+def test_pre_registry_constants_are_deprecated_aliases():
+    with pytest.deprecated_call():
+        from patterns.style_transfer import BASIC_STYLES, SCENARIOS_KO
+    with pytest.deprecated_call():
+        from patterns.reverse_neutralization import NEUTRAL_SYSTEM
+    assert list(BASIC_STYLES) == ["business-formal", "tech-report", "customer-service"]
+    assert SCENARIOS_KO["it-incident"].startswith("서버가 또 터졌어요")
+    assert NEUTRAL_SYSTEM == "You are an AI assistant. Answer objectively."
+
+    with pytest.deprecated_call():
+        from patterns import content_optimization
+        tasks = content_optimization.TASKS
+    tasks["basic"]["rounds"] = 99  # a copy: the catalogue is unchanged
+    assert registry.tasks.get("basic")["rounds"] == 1
+    with pytest.raises(AttributeError):
+        content_optimization.NO_SUCH_CONSTANT
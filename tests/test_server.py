@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+
+from patterns import server
+from patterns.deadline import DeadlineExceeded
+from patterns.server import PatternServer
+
+CUSTOM_TASK = {
+    "task": "Summarize Amazon Bedrock in 2 sentences.",
+    "role": "You are a technical writer.",
+    "criteria": "1. Clarity (1-5): Clear?\n2. Brevity (1-5): Short?",
+    "criteria_keys": ["Clarity", "Brevity"],
+    "rounds": 1,
+}
+
+
+def _post(path: str, body) -> tuple[int, dict]:
+    async def go():
+        server = PatternServer(port=0, concurrency=2, queue_size=4)
+        await server.start()
+        try:
+            return await server.dispatch("POST", path, json.dumps(body).encode("utf-8"))
+        finally:
+            await server.stop()
+    return asyncio.run(go())
+
+
+def test_custom_task_runs():
+    status, payload = _post("/v1/self-refine", {"task": CUSTOM_TASK})
+    assert status == 200
+    assert payload["result"]["task"] == "custom"
+    assert payload["result"]["final_draft"]
+
+
+@pytest.mark.parametrize("task, message", [
+    ({k: v for k, v in CUSTOM_TASK.items() if k not in ("task", "role", "criteria_keys")},
+     "task is missing task.criteria_keys, task.task, task.role"),
+    ({**CUSTOM_TASK, "criteria_keys": "Clarity"}, "task.criteria_keys must be a non-empty list"),
+    ({**CUSTOM_TASK, "rounds": "2"}, "task.rounds must be an integer from 0 to 5"),
+    ({**CUSTOM_TASK, "rounds": 1000}, "task.rounds must be an integer from 0 to 5"),
+    (["basic"], "'task' must be a task name or a task object"),
+    ("no-such-task", "Unknown task 'no-such-task'"),
+])
+def test_bad_task_is_400(task, message):
+    status, payload = _post("/v1/self-refine", {"task": task})
+    assert status == 400
+    assert payload["error"].startswith(message)
+
+
+@pytest.mark.parametrize("deadline", ["soon", -5, 0, True, float("nan")])
+def test_bad_deadline_is_400(deadline):
+    status, payload = _post("/v1/persona", {"question": "What is Bedrock?", "deadline_sec": deadline})
+    assert status == 400
+    assert payload["error"] == "'deadline_sec' must be a positive number"
+
+
+def test_deadline_is_reported():
+    status, payload = _post("/v1/persona", {"question": "What is Bedrock?", "deadline_sec": 30})
+    assert status == 200
+    assert payload["result"]["deadline"]["budget_sec"] == 30
+
+
+def test_unknown_style_and_persona_are_400():
+    status, payload = _post("/v1/style-transfer", {"text": "hi", "style": "no-such-style"})
+    assert (status, payload["error"]) == (400, "Unknown style 'no-such-style'")
+    status, payload = _post("/v1/persona", {"question": "hi", "persona": ["ciso"]})
+    assert (status, payload["error"]) == (400, "Unknown persona '['ciso']'")
+
+
+def test_key_error_inside_the_call_is_500(monkeypatch):
+    def broken(*args, **kwargs):
+        raise KeyError("usage")
+
+    monkeypatch.setattr(server, "transform_style", broken)
+    status, payload = _post("/v1/style-transfer", {"text": "hi", "style": "business-formal"})
+    assert status == 500
+    assert payload["error"] == "KeyError: 'usage'"
+
+
+def test_deadline_exceeded_is_504(monkeypatch):
+    def late(*args, **kwargs):
+        raise DeadlineExceeded("no time left for persona")
+
+    monkeypatch.setattr(server, "ask_persona", late)
+    status, payload = _post("/v1/persona", {"question": "What is Bedrock?", "deadline_sec": 5})
+    assert status == 504
+    assert payload["error"] == "Deadline exceeded: no time left for persona"
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from patterns import bedrock
+from patterns.registry import demo_units
+from patterns.shard import ShardQueue, build_matrix, merge, run_worker
+
+MODELS = ["model-a", "model-b"]
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def _enqueue(path: str, choice: str = "1", repeats: int = 1, shard_size: int = 2, **kwargs) -> ShardQueue:
+    queue = ShardQueue(path, **kwargs)
+    units = build_matrix(choice, False, MODELS, repeats)
+    queue.enqueue(units, shard_size, {"pattern": choice, "advanced": False, "models": MODELS, "repeats": repeats})
+    return queue
+
+
+def test_matrix_follows_the_demo_order():
+    units = build_matrix("all", False, MODELS, repeats=2)
+    per_model = sum(len(demo_units(p, False)) for p in ("style_transfer", "reverse_neutralization",
+                                                         "content_optimization"))
+    assert len(units) == per_model * len(MODELS) * 2
+    assert [u["model_id"] for u in units] == sorted(u["model_id"] for u in units)
+
+
+def test_shards_never_mix_models(queue_path):
+    queue = _enqueue(queue_path, shard_size=100)
+    assert [s["model_id"] for s in queue.shards()] == MODELS
+    with pytest.raises(ValueError, match="already holds"):
+        queue.enqueue(build_matrix("1", False, MODELS), 2, {})
+
+
+def test_expired_lease_moves_to_another_worker(queue_path):
+    queue = _enqueue(queue_path, lease_sec=0.05)
+    first = queue.lease("a")
+    assert queue.renew(first["shard_id"], "a")
+    time.sleep(0.1)
+    # pending shards go first; drain them so the expired lease is next
+    while (shard := queue.lease("b")) and shard["shard_id"] != first["shard_id"]:
+        pass
+    assert shard["shard_id"] == first["shard_id"]
+    assert not queue.renew(first["shard_id"], "a")
+    assert not queue.complete(first["shard_id"], "a", {}, {"owner": "a"})
+    assert queue.complete(first["shard_id"], "b", {}, {"owner": "b"})
+
+
+def test_shard_fails_after_max_attempts(queue_path):
+    queue = _enqueue(queue_path, choice="3", shard_size=100, lease_sec=0.01, max_attempts=2)
+    for owner in ("a", "b"):
+        while queue.lease(owner):
+            pass
+        time.sleep(0.02)
+    assert queue.lease("c") is None
+    assert queue.counts() == {"failed": len(MODELS)}
+    assert queue.finished()
+
+
+def test_worker_and_merge_on_the_fake_backend(queue_path):
+    model_before = bedrock.get_model_id()
+    _enqueue(queue_path, repeats=2).close()
+    assert run_worker(queue_path, threads=2, poll_sec=0.01) > 0
+
+    queue = ShardQueue(queue_path)
+    merged = merge(queue)
+    queue.close()
+    assert bedrock.get_model_id() == model_before
+    assert [p["model_id"] for p in merged.results] == MODELS
+    per_model = len(demo_units("style_transfer", False)) * 2
+    assert all(len(p["scenarios"]) == per_model for p in merged.results)
+    assert {e["repeat"] for p in merged.results for e in p["scenarios"]} == {0, 1}
+    info = merged.meta["shards"]
+    assert info["units_done"] == per_model * len(MODELS) and info["errors"] == []
@@ -0,0 +1,26 @@
+from patterns.simcache import SimilarityCache, numbers
+
+INPUT = "서버가 또 터졌어요. 빨리 확인해주세요. 어제도 같은 문제였는데 아직도 안 고쳐진 거예요? 장애 시간은 30분입니다."
+
+
+def test_whitespace_and_punctuation_variants_hit():
+    cache = SimilarityCache(threshold=0.8)
+    cache.store("ns", INPUT, "out")
+    hit = cache.lookup("ns", INPUT.replace(". ", "!  ").replace("?", ""))
+    assert hit is not None and hit["output"] == "out"
+    assert cache.lookup("other-ns", INPUT) is None
+
+
+def test_different_figures_never_hit():
+    cache = SimilarityCache(threshold=0.8)
+    cache.store("ns", INPUT, "out")
+    assert cache.lookup("ns", INPUT.replace("30분", "45분")) is None
+    assert cache.lookup("ns", INPUT.replace("30분", "3분")) is None
+    assert cache.report()["misses"] == 2
+
+
+def test_numbers_inside_boilerplate_are_ignored():
+    cache = SimilarityCache(threshold=0.8, boilerplate=[r"ticket #\d+"])
+    cache.store("ns", "Ticket #123 " + INPUT, "out")
+    assert cache.lookup("ns", "Ticket #987 " + INPUT) is not None
+    assert numbers("Dose 2.5mg, ticket #9", cache.boilerplate) == ("2", "5")
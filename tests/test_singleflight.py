@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+from patterns import bedrock
+from patterns.bedrock import SingleFlight
+from patterns.fake import FakeBedrockClient
+from patterns.regions import RegionPool
+from patterns.stats import stats
+
+
+def _concurrently(n: int, fn) -> list:
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def run(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_sampled_calls_are_not_coalesced_by_default():
+    bedrock.set_client_factory(lambda region: FakeBedrockClient(latency=0.05, jitter=0.0))
+    results = _concurrently(4, lambda: bedrock.converse("s", "u", temperature=0.7))
+    assert not any(r.get("coalesced") for r in results)
+    assert stats.summary()["roles"]["generate"]["calls"] == 4
+
+
+def test_deterministic_followers_share_the_leaders_region(monkeypatch):
+    fake = FakeBedrockClient(latency=0.05, jitter=0.0)
+    pool = RegionPool(["r1", "r2"])
+    bedrock.set_client_factory(lambda region: fake)
+    monkeypatch.setattr(bedrock, "get_region_pool", lambda: pool)
+    results = _concurrently(4, lambda: bedrock.converse("s", "u", temperature=0))
+    followers = [r for r in results if r.get("coalesced")]
+    assert followers and len(followers) < 4
+    leader = next(r for r in results if not r.get("coalesced"))
+    assert {r["region"] for r in results} == {leader["region"]} and leader["region"] in ("r1", "r2")
+
+
+def test_sync_caller_on_a_loop_thread_does_not_wait_on_a_flight():
+    flights = SingleFlight()
+
+    async def main():
+        release = asyncio.Event()
+
+        async def leader():
+            await release.wait()
+            return "leader"
+
+        task = asyncio.ensure_future(flights.ado("k", leader))
+        await asyncio.sleep(0)
+        # Following here would block the loop that has to finish the leader
+        own = flights.do("k", lambda: "own")
+        release.set()
+        return own, await task
+
+    assert asyncio.run(main()) == (("own", False), ("leader", False))
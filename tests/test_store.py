@@ -0,0 +1,51 @@
+import re
+import sqlite3
+
+import pytest
+
+from patterns.display import OutputCollector
+from patterns.store import ResultStore, read_query
+
+ENTRY = ("it-incident", "Business Formal", "서버가 또 터졌어요.", "Server outage report.")
+
+
+def _live_run(store: ResultStore, tmp_path) -> str:
+    """A live-ingested run saved as JSON, like ``demo.py --store --save``."""
+    collector = OutputCollector()
+    store.attach("model-a", run_key=collector.timestamp)
+    collector.start_pattern("style_transfer")
+    collector.add_result(*ENTRY, elapsed=1.5)
+    store.detach()
+    return collector.save("model-a", str(tmp_path))
+
+
+def test_import_skips_a_run_stored_live(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    path = _live_run(store, tmp_path)
+    assert store.import_json(path) is None
+    assert len(store.runs()) == 1
+    assert len(store.query("SELECT * FROM metrics WHERE name = 'elapsed_sec'")) == 1
+    store.close()
+
+
+def test_import_is_idempotent_and_timestamps_match_live(tmp_path):
+    live = ResultStore(str(tmp_path / "live.db"))
+    path = _live_run(live, tmp_path)
+    store = ResultStore(str(tmp_path / "imported.db"))
+    assert store.import_json(path) is not None
+    assert store.import_json(path) is None
+    second = re.compile(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d$")
+    for db in (live, store):
+        run = db.query("SELECT started_at, finished_at FROM runs")[0]
+        metric = db.query("SELECT ts FROM metrics")[0]
+        assert all(second.match(v) for v in (run["started_at"], run["finished_at"], metric["ts"]))
+    live.close()
+    store.close()
+
+
+def test_sql_is_read_only(tmp_path):
+    db = str(tmp_path / "results.db")
+    ResultStore(db).close()
+    assert read_query(db, "SELECT COUNT(*) AS n FROM runs")[0]["n"] == 0
+    with pytest.raises(sqlite3.OperationalError):
+        read_query(db, "DELETE FROM runs")